@@ -0,0 +1,2 @@
+# Micro-benchmarks da solução RPA
+# Execute a partir da raiz do projeto, por exemplo: python -m benchmarks.bench_caller_info
@@ -0,0 +1,77 @@
+# benchmarks/bench_bulk_insert.py
+# Compara a carga linha a linha (execute_query com commit por linha) com
+# DBManager.bulk_insert via execute_values e via COPY, em um Postgres local.
+#
+# Usa as variáveis DB_* do .env (o banco precisa estar acessível).
+# Uso: python -m benchmarks.bench_bulk_insert [--rows N] [--legacy-rows N] [--chunk-size N]
+
+import argparse
+import datetime
+import time
+
+from src.infra.db.db_manager import get_db_manager
+
+TABLE = "rpa_bench.bulk_items"
+COLUMNS = ['id', 'name', 'amount', 'created_on']
+
+
+def make_rows(count):
+    today = datetime.date.today()
+    for i in range(count):
+        yield (i, f"item {i}\tcom tab", i * 0.5, today)
+
+
+def reset_table(db_manager):
+    db_manager.execute_query("CREATE SCHEMA IF NOT EXISTS rpa_bench", commit=True)
+    db_manager.execute_query(f"DROP TABLE IF EXISTS {TABLE}", commit=True)
+    db_manager.execute_query(f"""
+        CREATE TABLE {TABLE} (id INTEGER, name TEXT, amount FLOAT, created_on DATE)
+    """, commit=True)
+
+
+def run_legacy(db_manager, count):
+    """Caminho anterior: um INSERT e um commit por linha"""
+    sql = f"INSERT INTO {TABLE} ({', '.join(COLUMNS)}) VALUES (%s, %s, %s, %s)"
+    start = time.perf_counter()
+    for row in make_rows(count):
+        db_manager.execute_query(sql, row, commit=True)
+    return count / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de cargas em massa no Postgres")
+    parser.add_argument('--rows', type=int, default=200000)
+    parser.add_argument('--legacy-rows', type=int, default=2000,
+                        help="Linhas para o caminho linha a linha (lento; a taxa é extrapolada)")
+    parser.add_argument('--chunk-size', type=int, default=10000)
+    args = parser.parse_args()
+
+    db_manager = get_db_manager()
+    if not db_manager.connect():
+        print("Banco indisponível; configure DB_HOST/DB_USER/DB_PASSWORD")
+        return 1
+
+    results = {}
+    reset_table(db_manager)
+    results['execute_query por linha (antes)'] = run_legacy(db_manager, args.legacy_rows)
+
+    for method in ('values', 'copy'):
+        reset_table(db_manager)
+        success, stats = db_manager.bulk_insert(TABLE, COLUMNS, make_rows(args.rows),
+                                                method=method, chunk_size=args.chunk_size)
+        if not success:
+            print(f"{method}: falhou ({stats})")
+            return 1
+        results[f"bulk_insert method={method}"] = stats['rows_per_second']
+
+    db_manager.execute_query("DROP SCHEMA rpa_bench CASCADE", commit=True)
+    db_manager.close()
+
+    baseline = results['execute_query por linha (antes)']
+    for name, rate in results.items():
+        print(f"{name:<34} {rate:>12,.0f} linhas/s  ({rate / baseline:.1f}x)")
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,66 @@
+# benchmarks/bench_caller_info.py
+# Compara a resolução do chamador via inspect.getframeinfo (implementação
+# anterior) com o caminho rápido por sys._getframe + cache por code object.
+#
+# Uso: python -m benchmarks.bench_caller_info [--calls N]
+
+import argparse
+import inspect
+import os
+import time
+
+from src.utils.logger import EnhancedLogger
+
+
+def legacy_get_caller_info(depth=3):
+    """Implementação anterior de EnhancedLogger._get_caller_info"""
+    try:
+        frame = inspect.currentframe()
+        for _ in range(depth):
+            if frame.f_back is None:
+                break
+            frame = frame.f_back
+        if frame:
+            frame_info = inspect.getframeinfo(frame)
+            return os.path.basename(frame_info.filename), frame_info.function
+    except Exception:
+        pass
+    return "unknown.py", "unknown"
+
+
+def run(resolver, calls):
+    """Simula a profundidade real: bot -> log_info -> log_entry -> _get_caller_info"""
+    def log_entry():
+        return resolver()
+
+    def log_info():
+        return log_entry()
+
+    start = time.perf_counter()
+    for _ in range(calls):
+        log_info()
+    elapsed = time.perf_counter() - start
+    return calls / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de _get_caller_info")
+    parser.add_argument('--calls', type=int, default=100000)
+    args = parser.parse_args()
+
+    # Instância sem setup_logging: _get_caller_info não depende de estado
+    logger = object.__new__(EnhancedLogger)
+
+    results = {
+        'inspect.getframeinfo (antes)': run(legacy_get_caller_info, args.calls),
+        'sys._getframe + cache (depois)': run(lambda: logger._get_caller_info(depth=3), args.calls),
+        'capture_caller=False': run(lambda: "", args.calls),
+    }
+
+    baseline = results['inspect.getframeinfo (antes)']
+    for name, rate in results.items():
+        print(f"{name:<32} {rate:>14,.0f} chamadas/s  ({rate / baseline:.1f}x)")
+
+
+if __name__ == '__main__':
+    main()
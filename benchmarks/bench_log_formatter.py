@@ -0,0 +1,78 @@
+# benchmarks/bench_log_formatter.py
+# Compara a montagem coluna a coluna das linhas da tabela de log (implementação
+# anterior de log_entry) com o LogTableFormatter pré-compilado.
+#
+# Uso: python -m benchmarks.bench_log_formatter [--entries N]
+
+import argparse
+import textwrap
+import time
+
+from src.utils.log_formatter import LogTableFormatter
+
+COL_WIDTHS = {
+    'timestamp': 25,
+    'task': 15,
+    'function': 30,
+    'file': 25,
+    'message': 50,
+    'process_type': 15,
+    'status': 15
+}
+PADDING = 1
+
+SHORT = ("2024-01-01 12:00:00", "bot", "main", "main.py", "Iniciando extração de dados", "business", "information")
+LONG = ("2024-01-01 12:00:00", "bot", "main", "main.py", "Registro processado com sucesso " * 5, "business", "success")
+
+
+def legacy_format(values, critical=False):
+    """Implementação anterior: loop por coluna + textwrap em toda mensagem"""
+    message_lines = textwrap.wrap(values[4], width=COL_WIDTHS['message']) or [""]
+    names = list(COL_WIDTHS)
+    contents = {name: values[i][:COL_WIDTHS[name]] for i, name in enumerate(names)}
+    contents['message'] = message_lines[0]
+
+    log_line = "|"
+    for name, width in COL_WIDTHS.items():
+        content = contents[name]
+        log_line += " " * PADDING + content + " " * (width - len(content) + PADDING) + "|"
+    lines = [log_line]
+    for i in range(1, len(message_lines)):
+        cont_line = "|"
+        for name, width in COL_WIDTHS.items():
+            if name == 'message':
+                content = message_lines[i]
+                cont_line += " " * PADDING + content + " " * (width - len(content) + PADDING) + "|"
+            else:
+                cont_line += " " * (width + PADDING * 2) + "|"
+        lines.append(cont_line)
+    if critical:
+        separator = "+"
+        for width in COL_WIDTHS.values():
+            separator += "-" * (width + PADDING * 2) + "+"
+        lines.append(separator)
+    return "\n".join(lines) + "\n"
+
+
+def run(format_fn, values, entries):
+    start = time.perf_counter()
+    for _ in range(entries):
+        format_fn(values)
+    return entries / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark da formatação da tabela de log")
+    parser.add_argument('--entries', type=int, default=100000)
+    args = parser.parse_args()
+
+    formatter = LogTableFormatter(COL_WIDTHS, PADDING)
+    for label, values in (('mensagem curta', SHORT), ('mensagem longa (4 linhas)', LONG)):
+        assert formatter.format_entry(values) == legacy_format(values)
+        before = run(legacy_format, values, args.entries)
+        after = run(formatter.format_entry, values, args.entries)
+        print(f"{label:<28} antes {before:>12,.0f} linhas/s   depois {after:>12,.0f} linhas/s  ({after / before:.1f}x)")
+
+
+if __name__ == '__main__':
+    main()
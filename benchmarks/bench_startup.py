@@ -0,0 +1,74 @@
+# benchmarks/bench_startup.py
+# Custo de importação dos pontos de entrada da aplicação, medido com
+# `python -X importtime` em um interpretador novo a cada execução.
+#
+# Também lista quais dependências pesadas (psycopg2, psutil, pandas...) cada
+# importação carregou, para acompanhar regressões nos imports tardios.
+#
+# Uso: python -m benchmarks.bench_startup [--repeat N] [--top N] [modulo ...]
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_MODULES = ['src', 'src.config', 'src.utils.logger', 'src.infra.db.db_manager', 'src.initializer']
+HEAVY_MODULES = ('psycopg2', 'psutil', 'pandas', 'selenium', 'asyncio', 'multiprocessing', 'dotenv')
+
+
+def parse_importtime(stderr):
+    """Converte a saída do -X importtime em [(nome, próprio_us, cumulativo_us)] na ordem impressa"""
+    entries = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        entries.append((name.strip(), int(self_us), int(cumulative_us)))
+    return entries
+
+
+def measure(module):
+    """Importa `module` em um processo novo; retorna (entradas do importtime, pesados carregados)"""
+    code = (f"import sys, {module}; "
+            f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))")
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', code],
+                            cwd=ROOT, capture_output=True, text=True)
+    if result.returncode:
+        raise RuntimeError(f"Falha ao importar {module}:\n{result.stderr[-2000:]}")
+    lines = result.stdout.strip().splitlines()
+    heavy = lines[-1].split(',') if lines and lines[-1] else []
+    return parse_importtime(result.stderr), heavy
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tempo de importação dos pontos de entrada")
+    parser.add_argument('modules', nargs='*', default=DEFAULT_MODULES)
+    parser.add_argument('--repeat', type=int, default=5, help="Execuções por módulo (a primeira aquece os .pyc)")
+    parser.add_argument('--top', type=int, default=8, help="Módulos mais caros listados por ponto de entrada")
+    args = parser.parse_args()
+
+    report = []
+    for module in args.modules:
+        measure(module)  # Aquecimento: compila os .pyc
+        totals = []
+        for _ in range(max(1, args.repeat)):
+            entries, heavy = measure(module)
+            totals.append(next(cumulative for name, _, cumulative in reversed(entries) if name == module))
+        report.append((module, totals, heavy, entries))
+
+    print(f"{'módulo':<28} {'mediana (ms)':>12} {'mín (ms)':>10}  dependências pesadas carregadas")
+    for module, totals, heavy, _ in report:
+        print(f"{module:<28} {statistics.median(totals) / 1000:>12.1f} {min(totals) / 1000:>10.1f}  "
+              f"{', '.join(heavy) or '-'}")
+
+    for module, _, _, entries in report:
+        print(f"\nMais caros em {module} (tempo próprio, última execução):")
+        for name, self_us, _ in sorted(entries, key=lambda entry: entry[1], reverse=True)[:args.top]:
+            print(f"  {name:<40} {self_us / 1000:>8.1f} ms")
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -1,10 +1,24 @@
 # Esse arquivo torna o diretório src um pacote Python
 # Adicionar este código permite importações mais limpas
 
-# Permitir importação direta dos módulos principais
-from src.config.settings import Settings
-from src.modules.workflow import Workflow
-from src.utils.logger import EnhancedLogger, ProcessType, LogStatus
+import importlib
 
-# Inicializar configurações globais (opcional)
-settings = Settings()
\ No newline at end of file
+# Importação direta dos módulos principais (`from src import Settings`), resolvida
+# sob demanda: importar qualquer submódulo de src não carrega logger nem configurações
+_EXPORTS = {
+    'Settings': 'src.config.settings',
+    'Workflow': 'src.modules.workflow',
+    'EnhancedLogger': 'src.utils.logger',
+    'ProcessType': 'src.utils.logger',
+    'LogStatus': 'src.utils.logger',
+}
+
+
+def __getattr__(name):
+    # Configurações globais: instância única criada no primeiro acesso
+    if name == 'settings':
+        from src.config.settings import get_settings
+        return get_settings()
+    if name in _EXPORTS:
+        return getattr(importlib.import_module(_EXPORTS[name]), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
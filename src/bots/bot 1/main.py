@@ -21,49 +21,37 @@ def main():
     logger, db_manager = initialize_app()
     
     # Log de início
-    logger.log_info("main", f"Iniciando processo RPA no ambiente {settings.ENVIRONMENT.upper()}", ProcessType.ROBOTIC)
-    logger.log_info("main", f"Bot: {settings.BOT_NAME}", ProcessType.SYSTEM)
+    logger.log_info("main", f"Iniciando processo RPA no ambiente {settings.ENVIRONMENT.upper()}",
+                    process_type=ProcessType.ROBOTIC)
+    logger.log_info("main", f"Bot: {settings.BOT_NAME}", process_type=ProcessType.SYSTEM)
     
     try:
         # Execução do workflow principal
-        logger.log_info("main", "Inicializando workflow", ProcessType.ROBOTIC)
-        workflow = Workflow()
+        logger.log_info("main", "Inicializando workflow", process_type=ProcessType.ROBOTIC)
+        workflow = Workflow(logger=logger)
         
-        # Etapa 1: Extração de dados
-        logger.log_info("main", "Iniciando extração de dados", ProcessType.BUSINESS)
-        workflow.step1_data_extraction()
-        logger.log_success("main", "Extração de dados concluída", ProcessType.BUSINESS)
-        
-        # Etapa 2: Transformação de dados
-        logger.log_info("main", "Iniciando transformação de dados", ProcessType.BUSINESS)
-        workflow.step2_data_transformation()
-        logger.log_success("main", "Transformação de dados concluída", ProcessType.BUSINESS)
-        
-        # Etapa 3: Carregamento de dados
-        logger.log_info("main", "Iniciando carregamento de dados", ProcessType.BUSINESS)
-        workflow.step3_data_loading()
-        logger.log_success("main", "Carregamento de dados concluído", ProcessType.BUSINESS)
-        
-        # Executa o workflow completo
+        # Executa as etapas (extração, transformação e carregamento) uma única vez,
+        # em ordem de dependência; cada etapa é registrada com sua duração
         result = workflow.execute_workflow()
-        logger.log_success("main", f"Workflow concluído com status: {result['status']}", ProcessType.PROCESS)
+        logger.log_success("main", f"Workflow concluído com status: {result['status']}",
+                           process_type=ProcessType.PROCESS)
         
     except Exception as e:
         # Captura e registra detalhes do erro
         error_message = str(e)
         error_traceback = traceback.format_exc()
         
-        logger.log_critical("main", f"Erro crítico no processo RPA: {error_message}", ProcessType.SYSTEM)
+        logger.log_critical("main", f"Erro crítico no processo RPA: {error_message}", process_type=ProcessType.SYSTEM)
         
         # Registra o traceback em modo debug
         if settings.SETTINGS['debug_mode']:
-            logger.log_error("main", f"Traceback: {error_traceback}", ProcessType.SYSTEM)
+            logger.log_error("main", f"Traceback: {error_traceback}", process_type=ProcessType.SYSTEM)
         
         # Aqui você pode adicionar notificações (email, Slack, etc)
         
         return 1  # Código de erro
     
-    logger.log_info("main", "Processo RPA concluído com sucesso", ProcessType.ROBOTIC)
+    logger.log_info("main", "Processo RPA concluído com sucesso", process_type=ProcessType.ROBOTIC)
     return 0  # Código de sucesso
 
 if __name__ == '__main__':
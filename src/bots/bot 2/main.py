@@ -15,24 +15,9 @@ def main():
     try:
         # Example workflow execution
         logger.log_info("main", "Initializing workflow", process_type="robotic")
-        workflow = Workflow()
+        workflow = Workflow(logger=logger)
         
-        # Step 1: Data Extraction
-        logger.log_info("main", "Starting data extraction", process_type="business")
-        workflow.step1_data_extraction()
-        logger.log_success("main", "Data extraction completed", process_type="business")
-        
-        # Step 2: Data Transformation
-        logger.log_info("main", "Starting data transformation", process_type="business")
-        workflow.step2_data_transformation()
-        logger.log_success("main", "Data transformation completed", process_type="business")
-        
-        # Step 3: Data Loading
-        logger.log_info("main", "Starting data loading", process_type="business")
-        workflow.step3_data_loading()
-        logger.log_success("main", "Data loading completed", process_type="business")
-        
-        # Complete workflow
+        # Runs extraction, transformation and loading once each, in dependency order
         result = workflow.execute_workflow()
         logger.log_success("main", f"Workflow completed with status: {result['status']}", process_type="process")
         
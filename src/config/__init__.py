@@ -1,7 +1,17 @@
-from .settings import Settings
+from . import settings as _settings_module
+from .settings import Settings, get_settings
+
+# `src.config.settings` é a instância de configurações (não o submódulo), como antes;
+# o import acima define o atributo do submódulo, removido aqui para que __getattr__
+# crie a instância no primeiro acesso
+globals().pop('settings', None)
+
+
+def __getattr__(name):
+    if name == 'settings':
+        return _settings_module.get_settings()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
-# Instancia as configurações
-settings = Settings()
 
 # Exporta a instância para uso em qualquer lugar
-__all__ = ['settings']
\ No newline at end of file
+__all__ = ['settings', 'Settings', 'get_settings']
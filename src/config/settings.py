@@ -1,20 +1,26 @@
 # src/config/settings.py
 import os
-import sys
-from dotenv import load_dotenv
+import threading
+import types
 
-# Certifique-se de que as variáveis de ambiente estão carregadas
-from src.utils.environment_loader import environment
+from src.utils.environment_loader import get_environment
+
+# Instância compartilhada (get_settings)
+_settings = None
+_settings_lock = threading.Lock()
 
 class Settings:
     """
     Configurações centralizadas para a solução RPA.
     Carrega configurações de variáveis de ambiente e valores padrão.
+    
+    A aplicação usa a instância única e somente leitura de get_settings();
+    Settings() cria uma cópia independente e alterável (útil em testes).
     """
     
     def __init__(self):
-        # Ambiente atual (já definido pelo environment_loader)
-        self.ENVIRONMENT = environment
+        # Ambiente atual (carrega .env/--env na primeira vez)
+        self.ENVIRONMENT = get_environment()
         
         # Nome do bot (usado por vários módulos)
         self.BOT_NAME = os.getenv('BOT_NAME', 'ModelViewer')
@@ -38,9 +44,49 @@ class Settings:
         self.SETTINGS = {
             'retry_attempts': int(os.getenv('APP_RETRY_ATTEMPTS', 3)),
             'timeout_seconds': int(os.getenv('APP_TIMEOUT_SECONDS', 30)),
+            # Conexão com o banco em background no initialize_app (o bot começa sem esperar)
+            'db_connect_background': os.getenv('APP_DB_CONNECT_BACKGROUND', 'true').lower() in ('true', '1', 'yes'),
             'debug_mode': os.getenv('DEBUG_MODE', 'false').lower() in ('true', '1', 'yes')
         }
 
+        # Configurações de log
+        self.LOG_CONFIG = {
+            # Formato do arquivo: table (tabela formatada), jsonl (JSON Lines) ou both
+            'file_format': os.getenv('LOG_FILE_FORMAT', 'table').lower(),
+            # Arquivo de log: handle persistente com flush periódico e rotação
+            'file_max_bytes': int(os.getenv('LOG_FILE_MAX_BYTES', 0)),  # 0 desativa rotação por tamanho
+            'file_rotate_daily': os.getenv('LOG_FILE_ROTATE_DAILY', 'false').lower() in ('true', '1', 'yes'),
+            'file_flush_interval': float(os.getenv('LOG_FILE_FLUSH_INTERVAL', 1.0)),
+            'file_flush_bytes': int(os.getenv('LOG_FILE_FLUSH_BYTES', 65536)),
+            'file_compress': os.getenv('LOG_FILE_COMPRESS', 'true').lower() in ('true', '1', 'yes'),
+            # Descobre o arquivo chamador de cada log (desative para economizar a inspeção da stack)
+            'capture_caller': os.getenv('LOG_CAPTURE_CALLER', 'true').lower() in ('true', '1', 'yes'),
+            # Nível mínimo por destino (DEBUG, INFO, WARNING, ERROR, CRITICAL)
+            'file_level': os.getenv('LOG_FILE_LEVEL', 'DEBUG').upper(),
+            'console_level': os.getenv('LOG_CONSOLE_LEVEL', 'DEBUG').upper(),
+            'db_level': os.getenv('LOG_DB_LEVEL', 'DEBUG').upper(),
+            # Amostragem por ponto de chamada: 1 a cada N e/ou no máximo M registros por intervalo
+            'sample_every_n': int(os.getenv('LOG_SAMPLE_EVERY_N', 1)),
+            'rate_limit': int(os.getenv('LOG_RATE_LIMIT', 0)),  # 0 desativa
+            'rate_interval': float(os.getenv('LOG_RATE_INTERVAL', 1.0)),
+            'summary_interval': float(os.getenv('LOG_SUMMARY_INTERVAL', 30.0)),
+            # Métricas de CPU/memória amostradas em background (intervalo em segundos)
+            'metrics_enabled': os.getenv('LOG_METRICS_ENABLED', 'true').lower() in ('true', '1', 'yes'),
+            'metrics_interval': float(os.getenv('LOG_METRICS_INTERVAL', 1.0)),
+            # Multiprocesso: um processo escritor recebe os registros de todos os workers
+            'multiprocess': os.getenv('LOG_MULTIPROCESS', 'false').lower() in ('true', '1', 'yes'),
+            # Tabela de logs particionada por mês e retenção (em meses) usada pelo job de limpeza
+            'db_partitioned': os.getenv('LOG_DB_PARTITIONED', 'true').lower() in ('true', '1', 'yes'),
+            'retention_months': int(os.getenv('LOG_RETENTION_MONTHS', 0)),  # 0 mantém tudo
+            # Sink em background para o banco (fila limitada + INSERTs em lote)
+            'db_async': os.getenv('LOG_DB_ASYNC', 'false').lower() in ('true', '1', 'yes'),
+            'db_queue_size': int(os.getenv('LOG_DB_QUEUE_SIZE', 10000)),
+            'db_batch_size': int(os.getenv('LOG_DB_BATCH_SIZE', 500)),
+            'db_flush_interval': float(os.getenv('LOG_DB_FLUSH_INTERVAL', 1.0)),
+            'db_overflow_policy': os.getenv('LOG_DB_OVERFLOW_POLICY', 'drop').lower(),  # block, drop ou spill
+            'db_spill_dir': os.getenv('LOG_DB_SPILL_DIR', self.APP_PATHS['temp_folder'])
+        }
+
         # Configurações de banco de dados - carregadas diretamente do .env
         self.DB_CONFIG = {
             'enabled': True,  # Por padrão vamos assumir que DB está habilitado
@@ -49,7 +95,48 @@ class Settings:
             'database': os.getenv('DB_NAME', 'postgres'),
             'user': os.getenv('DB_USER', ''),
             'password': os.getenv('DB_PASSWORD', ''),
-            'schema': os.getenv('DB_SCHEMA', self.PROJECT_INFO['name'])
+            'schema': os.getenv('DB_SCHEMA', self.PROJECT_INFO['name']),
+            # Linhas por fetchmany nas consultas em streaming (cursor no servidor)
+            'stream_batch_size': int(os.getenv('DB_STREAM_BATCH_SIZE', 5000)),
+            # Cargas em massa: linhas por commit e método padrão (copy ou values)
+            'bulk_chunk_size': int(os.getenv('DB_BULK_CHUNK_SIZE', 10000)),
+            'bulk_method': os.getenv('DB_BULK_METHOD', 'copy').lower()
+        }
+
+        # Pool de conexões do DBManager (tempos em segundos; 0 desativa idle_timeout/max_lifetime)
+        self.DB_POOL_CONFIG = {
+            'min_size': int(os.getenv('DB_POOL_MIN_SIZE', 1)),
+            'max_size': int(os.getenv('DB_POOL_MAX_SIZE', 10)),
+            'idle_timeout': float(os.getenv('DB_POOL_IDLE_TIMEOUT', 300)),
+            'max_lifetime': float(os.getenv('DB_POOL_MAX_LIFETIME', 3600)),
+            'checkout_timeout': float(os.getenv('DB_POOL_CHECKOUT_TIMEOUT', 30)),
+            'health_check_interval': float(os.getenv('DB_POOL_HEALTH_CHECK_INTERVAL', 30))
+        }
+
+        # Cache de leituras do execute_query(cache=True): entradas máximas (LRU) e validade em segundos
+        self.DB_CACHE_CONFIG = {
+            'max_entries': int(os.getenv('DB_CACHE_MAX_ENTRIES', 1000)),
+            'default_ttl': float(os.getenv('DB_CACHE_TTL', 300))
+        }
+
+        # Outbox local (SQLite): logs e escritas com outbox=True guardados enquanto o banco está
+        # inacessível e reenviados em lotes quando a conexão volta
+        self.OUTBOX_CONFIG = {
+            'enabled': os.getenv('OUTBOX_ENABLED', 'true').lower() in ('true', '1', 'yes'),
+            'path': os.getenv('OUTBOX_PATH', os.path.join(self.APP_PATHS['temp_folder'], 'outbox.sqlite3')),
+            'batch_size': int(os.getenv('OUTBOX_BATCH_SIZE', 500))
+        }
+
+        # Workflow: etapas independentes rodam em paralelo em até max_workers threads ou processos
+        self.WORKFLOW_CONFIG = {
+            'max_workers': int(os.getenv('WORKFLOW_MAX_WORKERS', 4)),  # 1 executa em sequência
+            'executor': os.getenv('WORKFLOW_EXECUTOR', 'thread').lower(),  # thread ou process
+            # Com run_id, as saídas das etapas concluídas ficam em checkpoint_dir/run_id e uma nova
+            # execução com o mesmo run_id pula essas etapas; vazio desativa os checkpoints
+            'run_id': os.getenv('WORKFLOW_RUN_ID', ''),
+            'checkpoint_dir': os.getenv('WORKFLOW_CHECKPOINT_DIR', os.path.join(self.APP_PATHS['temp_folder'], 'workflow')),
+            # Modo streaming: blocos em espera entre duas etapas (limita a memória); 0 encadeia como geradores
+            'stream_queue_size': int(os.getenv('WORKFLOW_STREAM_QUEUE_SIZE', 4))
         }
 
         # Validar configurações de DB
@@ -60,6 +147,19 @@ class Settings:
         if self.SETTINGS['debug_mode']:
             self._print_settings_summary()
 
+    def __setattr__(self, name, value):
+        if getattr(self, '_frozen', False):
+            raise AttributeError("Configurações compartilhadas são somente leitura; use Settings() para uma cópia")
+        super().__setattr__(name, value)
+    
+    def freeze(self):
+        """Torna esta instância somente leitura (seções viram mapeamentos imutáveis)"""
+        for name, value in vars(self).items():
+            if isinstance(value, dict):
+                super().__setattr__(name, types.MappingProxyType(value))
+        super().__setattr__('_frozen', True)
+        return self
+    
     def get_db_connection_string(self):
         """Gera string de conexão PostgreSQL a partir das configurações"""
         if not self.DB_CONFIG['enabled']:
@@ -80,4 +180,14 @@ class Settings:
             print(f"  - Banco: {self.DB_CONFIG['database']}")
             print(f"  - Usuário: {self.DB_CONFIG['user']}")
             print(f"  - Schema: {self.DB_CONFIG['schema']}")
-        print("="*50 + "\n")
\ No newline at end of file
+        print("="*50 + "\n")
+
+
+def get_settings():
+    """Configurações da aplicação: uma instância, criada no primeiro acesso e somente leitura"""
+    global _settings
+    if _settings is None:
+        with _settings_lock:
+            if _settings is None:
+                _settings = Settings().freeze()
+    return _settings
@@ -0,0 +1,168 @@
+# src/infra/db/async_db_manager.py
+# Acesso ao banco para bots asyncio sem bloquear o event loop
+
+import asyncio
+import concurrent.futures
+import functools
+
+import psycopg2
+
+from src.config.settings import get_settings
+from src.infra.db.connection_pool import ConnectionPool
+from src.infra.db.db_manager import write_chunks
+from src.utils.logger import ProcessType
+
+
+class AsyncDBManager:
+    """
+    Contraparte assíncrona do DBManager: `await fetch/fetchone/execute/copy`.
+
+    Usa o mesmo ConnectionPool (configurado por DB_POOL_CONFIG) e os mesmos
+    parâmetros de DB_CONFIG. Cada operação roda inteira (checkout, query,
+    commit e devolução) em uma thread de um executor próprio, dimensionado
+    pelo tamanho máximo do pool, e o loop apenas aguarda o resultado.
+
+    O psycopg2 não tem modo assíncrono utilizável no loop padrão do Windows
+    (ProactorEventLoop não suporta add_reader), por isso o executor em vez de
+    sockets não bloqueantes.
+
+    Uso:
+        db = AsyncDBManager()
+        await db.connect()
+        rows = await db.fetch("SELECT id FROM rpa.items WHERE status = %s", ('novo',))
+        await db.close()
+    """
+
+    def __init__(self, settings=None, logger=None):
+        self.settings = settings or get_settings()
+        self.pool = None
+        self._logger = logger
+        self._executor = None
+
+    @property
+    def logger(self):
+        """Logger da aplicação (o mesmo do DBManager), criado na primeira utilização"""
+        if self._logger is None:
+            from src.infra.db.db_manager import get_db_manager
+            self._logger = get_db_manager().initialize_logging()
+        return self._logger
+
+    def _open_connection(self):
+        db_config = self.settings.DB_CONFIG
+        return psycopg2.connect(
+            host=db_config['host'],
+            port=db_config['port'],
+            database=db_config['database'],
+            user=db_config['user'],
+            password=db_config['password'],
+            connect_timeout=self.settings.SETTINGS['timeout_seconds']
+        )
+
+    async def _call(self, func, *args):
+        """Executa uma função bloqueante no executor e aguarda sem bloquear o loop"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, functools.partial(func, *args))
+
+    async def connect(self):
+        """Cria o pool e abre as conexões iniciais; retorna o status da conexão"""
+        if self.pool is not None and not self.pool.closed:
+            return True
+        if not self.settings.DB_CONFIG['enabled']:
+            self.logger.log_warning("async_db_connect", "Conexão com banco de dados desabilitada nas configurações",
+                                    process_type=ProcessType.SYSTEM)
+            return False
+
+        pool_config = self.settings.DB_POOL_CONFIG
+        self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=pool_config['max_size'],
+                                                               thread_name_prefix='async-db')
+        self.pool = ConnectionPool(self._open_connection, **pool_config)
+        try:
+            await self._call(self.pool.open)
+        except Exception as e:
+            self.logger.log_error("async_db_connect", "Falha ao conectar ao banco de dados: %s", e,
+                                  process_type=ProcessType.SYSTEM)
+            await self.close()
+            return False
+        self.logger.log_success("async_db_connect", "Pool assíncrono criado (max=%d)",
+                                pool_config['max_size'], process_type=ProcessType.SYSTEM)
+        return True
+
+    def run_blocking(self, func):
+        """Executa func(conn) com uma conexão do pool na thread atual (bloqueante)"""
+        with self.pool.connection() as conn:
+            return func(conn)
+
+    async def run(self, func):
+        """Executa func(conn) com uma conexão do pool em uma thread do executor
+
+        Permite agrupar vários comandos na mesma conexão/transação:
+            await db.run(lambda conn: ...)
+        """
+        if (self.pool is None or self.pool.closed) and not await self.connect():
+            raise RuntimeError("Não foi possível conectar ao banco de dados")
+        return await self._call(self.run_blocking, func)
+
+    async def _run_logged(self, name, func):
+        try:
+            return await self.run(func)
+        except Exception as e:
+            self.logger.log_error(name, "Erro ao executar query: %s", e, process_type=ProcessType.SYSTEM)
+            raise
+
+    async def fetch(self, query, params=None):
+        """Executa uma leitura e retorna todas as linhas"""
+        def work(conn):
+            cursor = conn.cursor()
+            try:
+                cursor.execute(query, params)
+                return cursor.fetchall()
+            finally:
+                cursor.close()
+        return await self._run_logged("async_fetch", work)
+
+    async def fetchone(self, query, params=None):
+        """Executa uma leitura e retorna a primeira linha (ou None)"""
+        def work(conn):
+            cursor = conn.cursor()
+            try:
+                cursor.execute(query, params)
+                return cursor.fetchone()
+            finally:
+                cursor.close()
+        return await self._run_logged("async_fetchone", work)
+
+    async def execute(self, query, params=None):
+        """Executa um comando com commit e retorna a quantidade de linhas afetadas"""
+        def work(conn):
+            cursor = conn.cursor()
+            try:
+                cursor.execute(query, params)
+                conn.commit()
+                return cursor.rowcount
+            finally:
+                cursor.close()
+        return await self._run_logged("async_execute", work)
+
+    async def copy(self, table, columns, rows, chunk_size=None, method='copy'):
+        """Carga em massa com COPY (ou execute_values), com commit por bloco; retorna as linhas gravadas
+
+        `rows` é consumido na thread do executor; evite geradores que dependam do loop.
+        """
+        chunk_size = chunk_size or self.settings.DB_CONFIG['bulk_chunk_size']
+        return await self._run_logged(
+            "async_copy",
+            lambda conn: sum(write_chunks(conn, table, columns, rows, method, chunk_size))
+        )
+
+    def stats(self):
+        """Contadores do pool (ver ConnectionPool.stats) ou None se desconectado"""
+        return self.pool.stats() if self.pool else None
+
+    async def close(self):
+        """Fecha o pool e encerra o executor"""
+        if self.pool is not None:
+            await self._call(self.pool.close)
+            self.pool = None
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
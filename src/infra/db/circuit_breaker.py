@@ -0,0 +1,119 @@
+# src/infra/db/circuit_breaker.py
+# Circuit breaker e backoff exponencial com jitter para a conexão com o banco
+
+import random
+import threading
+import time
+
+
+class DatabaseUnavailableError(RuntimeError):
+    """Não há conexão com o banco (desabilitado ou falha ao conectar)"""
+
+
+class CircuitOpenError(DatabaseUnavailableError):
+    """O circuito está aberto: o banco foi considerado indisponível e não é contatado"""
+
+
+def backoff_delay(attempt, base=0.5, cap=30.0):
+    """Espera antes da tentativa `attempt` (0, 1, 2...): exponencial com jitter total
+
+    Sorteia entre 0 e min(cap, base * 2**attempt), o que espalha as
+    reconexões de vários bots/threads em vez de sincronizá-las.
+    """
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+class CircuitBreaker:
+    """
+    Máquina de estados da conexão: closed -> open -> half_open -> closed.
+
+    - closed: chamadas liberadas; `failure_threshold` falhas seguidas abrem o circuito
+    - open: `allow()` retorna False sem nenhum I/O até o fim do período de espera,
+      que dobra a cada nova abertura seguida (com jitter), até `max_reset_timeout`
+    - half_open: uma única chamada de teste é liberada; sucesso fecha o
+      circuito, falha o abre novamente
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, failure_threshold=3, reset_timeout=1.0, max_reset_timeout=30.0):
+        self.failure_threshold = max(1, int(failure_threshold))
+        self.reset_timeout = float(reset_timeout)
+        self.max_reset_timeout = max(float(max_reset_timeout), self.reset_timeout)
+        self._state = self.CLOSED
+        self._failures = 0
+        self._trips = 0
+        self._retry_at = 0.0
+        self._trial_running = False
+        self._trial_started = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        with self._lock:
+            if self._state == self.OPEN and time.monotonic() >= self._retry_at:
+                return self.HALF_OPEN
+            return self._state
+
+    @property
+    def retry_in(self):
+        """Segundos até a próxima tentativa liberada (0 se o circuito não está aberto)"""
+        with self._lock:
+            if self._state != self.OPEN:
+                return 0.0
+            return max(0.0, self._retry_at - time.monotonic())
+
+    def allow(self):
+        """Indica se uma chamada ao banco pode ser feita agora"""
+        if self._state == self.CLOSED:
+            return True  # Caminho rápido sem lock
+        with self._lock:
+            if self._state == self.CLOSED:
+                return True
+            now = time.monotonic()
+            if self._state == self.OPEN and now >= self._retry_at:
+                self._state = self.HALF_OPEN
+                self._trial_running = False
+            # Libera um novo teste se o anterior não reportou resultado a tempo
+            if self._state == self.HALF_OPEN and (not self._trial_running
+                                                  or now - self._trial_started >= self.max_reset_timeout):
+                self._trial_running = True
+                self._trial_started = now
+                return True
+            return False
+
+    def record_success(self):
+        """Registra uma resposta do banco; retorna True se havia falhas registradas (o banco voltou)"""
+        if self._state == self.CLOSED and not self._failures:
+            return False
+        with self._lock:
+            recovered = self._state != self.CLOSED or self._failures > 0
+            self._state = self.CLOSED
+            self._failures = 0
+            self._trips = 0
+            self._trial_running = False
+            return recovered
+
+    def record_failure(self):
+        """Registra uma falha de conexão; retorna True se o circuito acabou de abrir"""
+        with self._lock:
+            self._failures += 1
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                self._open()
+                return True
+            return False
+
+    def trip(self):
+        """Abre o circuito imediatamente (ex.: após esgotar as tentativas de conexão)"""
+        with self._lock:
+            self._open()
+
+    def _open(self):
+        self._trips += 1
+        timeout = min(self.max_reset_timeout, self.reset_timeout * (2 ** (self._trips - 1)))
+        self._state = self.OPEN
+        self._retry_at = time.monotonic() + random.uniform(timeout / 2, timeout)
+        self._failures = 0
+        self._trial_running = False
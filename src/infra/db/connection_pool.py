@@ -0,0 +1,311 @@
+# src/infra/db/connection_pool.py
+# Pool de conexões thread-safe com checkout em escopo, health check e estatísticas
+
+import collections
+import contextlib
+import logging
+import os
+import threading
+import time
+
+import psycopg2
+from psycopg2 import extensions
+
+
+class PoolTimeoutError(RuntimeError):
+    """Nenhuma conexão ficou disponível dentro do tempo de checkout"""
+
+
+class PoolClosedError(RuntimeError):
+    """O pool já foi fechado"""
+
+
+class _PooledConnection:
+    __slots__ = ('connection', 'created_at', 'last_used')
+
+    def __init__(self, connection, now):
+        self.connection = connection
+        self.created_at = now
+        self.last_used = now
+
+
+class ConnectionPool:
+    """
+    Pool de conexões psycopg2 para uso a partir de várias threads.
+
+    - min_size: conexões abertas em `open()` e mantidas mesmo ociosas
+    - max_size: limite de conexões abertas (ociosas + em uso); acima dele o
+      checkout espera até `checkout_timeout` segundos e levanta PoolTimeoutError
+    - idle_timeout: conexões ociosas há mais tempo são fechadas (respeitando min_size)
+    - max_lifetime: conexões mais antigas são fechadas ao voltar ao pool
+    - health_check_interval: no checkout, conexões ociosas há mais tempo que
+      isso são testadas com SELECT 1 (0 testa sempre); conexões fechadas são
+      sempre descartadas
+
+    Use `with pool.connection() as conn:`; ao devolver, transações não
+    confirmadas são desfeitas (rollback) para que a próxima thread receba a
+    conexão limpa.
+    """
+
+    def __init__(self, connect, min_size=1, max_size=10, idle_timeout=300.0, max_lifetime=3600.0,
+                 checkout_timeout=30.0, health_check_interval=30.0):
+        self._connect = connect
+        self.min_size = max(0, int(min_size))
+        self.max_size = max(1, int(max_size), self.min_size)
+        self.idle_timeout = float(idle_timeout or 0)
+        self.max_lifetime = float(max_lifetime or 0)
+        self.checkout_timeout = checkout_timeout
+        self.health_check_interval = float(health_check_interval)
+
+        self._idle = collections.deque()
+        self._in_use = {}
+        self._opening = 0
+        self._checking = 0  # Retiradas de _idle e em health check (fora do lock)
+        self._waiting = 0
+        self._closed = False
+        self._pid = os.getpid()
+        self._cond = threading.Condition()
+        self._stats = {
+            'created': 0, 'closed': 0, 'checkouts': 0, 'waits': 0, 'timeouts': 0,
+            'failed_health_checks': 0, 'checkout_time_total': 0.0, 'checkout_time_max': 0.0
+        }
+
+    def open(self):
+        """Abre as `min_size` conexões iniciais; erros de conexão são propagados"""
+        with self._cond:
+            missing = self.min_size - self._size()
+            self._opening += max(missing, 0)
+        for _ in range(max(missing, 0)):
+            try:
+                entry = self._create()
+            except Exception:
+                with self._cond:
+                    self._opening -= 1
+                    self._cond.notify()
+                raise
+            with self._cond:
+                self._opening -= 1
+                self._idle.append(entry)
+                self._cond.notify()
+        return self
+
+    def _size(self):
+        return len(self._idle) + len(self._in_use) + self._opening + self._checking
+
+    def _create(self):
+        connection = self._connect()
+        with self._cond:
+            self._stats['created'] += 1
+        return _PooledConnection(connection, time.monotonic())
+
+    def _discard(self, entry):
+        """Fecha uma conexão que saiu do pool (chamado fora do lock)"""
+        try:
+            if not entry.connection.closed:
+                entry.connection.close()
+        except Exception:
+            pass
+        with self._cond:
+            self._stats['closed'] += 1
+            self._cond.notify()  # Abre vaga para quem espera por uma conexão nova
+
+    def _expired(self, entry, now):
+        return self.max_lifetime and now - entry.created_at >= self.max_lifetime
+
+    def _healthy(self, entry, now):
+        if entry.connection.closed:
+            return False
+        if now - entry.last_used < self.health_check_interval:
+            return True
+        try:
+            cursor = entry.connection.cursor()
+            cursor.execute('SELECT 1')
+            cursor.close()
+            entry.connection.rollback()
+            return True
+        except Exception:
+            return False
+
+    def acquire(self, timeout=None):
+        """Retira uma conexão do pool (prefira `connection()`, que sempre devolve)
+
+        Args:
+            timeout (float, optional): Segundos de espera; padrão checkout_timeout
+
+        Raises:
+            PoolTimeoutError: Nenhuma conexão disponível no tempo de espera
+            PoolClosedError: O pool foi fechado
+        """
+        if os.getpid() != self._pid:
+            raise PoolClosedError("Pool criado em outro processo; crie um novo pool após o fork")
+        timeout = self.checkout_timeout if timeout is None else timeout
+        started = time.monotonic()
+        deadline = None if timeout is None else started + timeout
+        waited = False
+
+        while True:
+            stale = []
+            entry = None
+            create = False
+            with self._cond:
+                while True:
+                    if self._closed:
+                        raise PoolClosedError("Pool de conexões fechado")
+                    now = time.monotonic()
+                    # Descarta ociosas expiradas; a mais recente (mais "quente") é usada primeiro
+                    while self._idle:
+                        candidate = self._idle.pop()
+                        if self._expired(candidate, now):
+                            stale.append(candidate)
+                            continue
+                        entry = candidate
+                        break
+                    if entry is not None:
+                        # Continua contando no tamanho do pool durante o health check
+                        self._checking += 1
+                        break
+                    if self._size() < self.max_size:
+                        self._opening += 1
+                        create = True
+                        break
+                    if not waited:
+                        waited = True
+                        self._stats['waits'] += 1
+                    remaining = None if deadline is None else deadline - now
+                    if remaining is not None and remaining <= 0:
+                        self._stats['timeouts'] += 1
+                        raise PoolTimeoutError(f"Nenhuma conexão disponível em {timeout}s "
+                                               f"(max_size={self.max_size})")
+                    self._waiting += 1
+                    try:
+                        self._cond.wait(remaining)
+                    finally:
+                        self._waiting -= 1
+
+            for old in stale:
+                self._discard(old)
+
+            if create:
+                try:
+                    entry = self._create()
+                except Exception:
+                    with self._cond:
+                        self._opening -= 1
+                        self._cond.notify()
+                    raise
+            elif not self._healthy(entry, time.monotonic()):
+                with self._cond:
+                    self._checking -= 1
+                    self._stats['failed_health_checks'] += 1
+                self._discard(entry)
+                continue
+
+            elapsed = time.monotonic() - started
+            with self._cond:
+                if create:
+                    self._opening -= 1
+                else:
+                    self._checking -= 1
+                self._in_use[id(entry.connection)] = entry
+                self._stats['checkouts'] += 1
+                self._stats['checkout_time_total'] += elapsed
+                if elapsed > self._stats['checkout_time_max']:
+                    self._stats['checkout_time_max'] = elapsed
+            return entry.connection
+
+    def release(self, connection, discard=False):
+        """Devolve uma conexão ao pool (discard=True fecha em vez de reutilizar)"""
+        with self._cond:
+            entry = self._in_use.pop(id(connection), None)
+        if entry is None:
+            return
+
+        now = time.monotonic()
+        if not (discard or self._closed or connection.closed or self._expired(entry, now)):
+            try:
+                # Não deixa transação aberta (e locks) para a próxima thread
+                if connection.get_transaction_status() != extensions.TRANSACTION_STATUS_IDLE:
+                    connection.rollback()
+            except Exception:
+                discard = True
+        else:
+            discard = True
+
+        if discard:
+            self._discard(entry)
+            return
+
+        entry.last_used = now
+        with self._cond:
+            self._idle.append(entry)
+            self._cond.notify()
+        self._prune_idle(now)
+
+    def _prune_idle(self, now):
+        """Fecha as conexões ociosas há mais de idle_timeout, mantendo min_size"""
+        if not self.idle_timeout:
+            return
+        stale = []
+        with self._cond:
+            # As mais antigas ficam no início da fila
+            while (self._idle and self._size() > self.min_size
+                   and now - self._idle[0].last_used >= self.idle_timeout):
+                stale.append(self._idle.popleft())
+        for entry in stale:
+            self._discard(entry)
+
+    @contextlib.contextmanager
+    def connection(self, timeout=None):
+        """Checkout em escopo: `with pool.connection() as conn:`
+
+        Em exceção a transação é desfeita; erros de conexão (OperationalError,
+        InterfaceError) descartam a conexão em vez de devolvê-la ao pool.
+        """
+        connection = self.acquire(timeout)
+        discard = False
+        try:
+            yield connection
+        except (psycopg2.OperationalError, psycopg2.InterfaceError):
+            discard = True
+            raise
+        except BaseException:
+            try:
+                connection.rollback()
+            except Exception:
+                discard = True
+            raise
+        finally:
+            self.release(connection, discard=discard)
+
+    def stats(self):
+        """Retorna os contadores do pool
+
+        Returns:
+            dict: size, idle, in_use, waiting, created, closed, checkouts, waits,
+                  timeouts, failed_health_checks, avg_checkout_ms, max_checkout_ms
+        """
+        with self._cond:
+            stats = dict(self._stats)
+            stats['size'] = self._size()
+            stats['idle'] = len(self._idle)
+            stats['in_use'] = len(self._in_use)
+            stats['waiting'] = self._waiting
+        total = stats.pop('checkout_time_total')
+        stats['avg_checkout_ms'] = total * 1000.0 / stats['checkouts'] if stats['checkouts'] else 0.0
+        stats['max_checkout_ms'] = stats.pop('checkout_time_max') * 1000.0
+        return stats
+
+    @property
+    def closed(self):
+        return self._closed
+
+    def close(self):
+        """Fecha as conexões ociosas; as em uso são fechadas ao serem devolvidas"""
+        with self._cond:
+            self._closed = True
+            idle, self._idle = list(self._idle), collections.deque()
+            self._cond.notify_all()
+        for entry in idle:
+            self._discard(entry)
+        if self._in_use:
+            logging.warning(f"Connection pool closed with {len(self._in_use)} connection(s) still checked out")
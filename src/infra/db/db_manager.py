@@ -1,17 +1,127 @@
 # src/infra/db/db_manager.py
+import concurrent.futures
+import contextlib
+import io
+import itertools
+import json
 import logging
+import threading
+import time
+import uuid
+import datetime
 import psycopg2
-from src.config.settings import Settings
+from psycopg2.extras import Json, execute_values
+from src.config.settings import get_settings
 from src.utils.logger import EnhancedLogger, ProcessType, LogStatus
+from src.utils.log_multiprocess import LogWriterProcess, get_writer_address, is_child_process
+from src.infra.db.connection_pool import ConnectionPool
+from src.infra.db.outbox import LocalOutbox
+from src.infra.db.query_cache import QueryCache
+from src.infra.db.transaction import Transaction, _CURRENT_TRANSACTION, current_transaction
+from src.infra.db.circuit_breaker import (CircuitBreaker, CircuitOpenError, DatabaseUnavailableError,
+                                          backoff_delay)
+
+# Objetos herdados via fork que não devem ser finalizados no processo filho
+_FORK_INHERITED = []
+
+
+def _no_phase(name):
+    """Substitui StartupTimer.phase quando não há timer"""
+    return contextlib.nullcontext()
+
+# Métodos aceitos por DBManager.bulk_insert
+BULK_METHODS = ('copy', 'values')
+
+# Escapes do formato texto do COPY (NULL é \N)
+_COPY_ESCAPES = str.maketrans({'\\': '\\\\', '\t': '\\t', '\n': '\\n', '\r': '\\r'})
+
+
+def _array_literal(values):
+    """Lista/tupla no formato de array do PostgreSQL ({1,2,"a b"}), como o INSERT grava ARRAY[...]"""
+    items = []
+    for value in values:
+        if value is None:
+            items.append('NULL')
+        elif isinstance(value, (list, tuple)):
+            items.append(_array_literal(value))
+        else:
+            if isinstance(value, (datetime.date, datetime.time)):
+                value = value.isoformat()
+            elif isinstance(value, (bytes, bytearray, memoryview)):
+                value = '\\x' + bytes(value).hex()
+            text = str(value).replace('\\', '\\\\').replace('"', '\\"')
+            items.append(f'"{text}"')
+    return '{' + ','.join(items) + '}'
+
+
+def _copy_value(value):
+    """Converte um valor Python para um campo do COPY em formato texto
+
+    Gera o mesmo valor que o INSERT (execute_values) grava: bytes viram bytea
+    em hex, listas/tuplas viram arrays e dicts (ou Json) viram texto JSON.
+    """
+    if value is None:
+        return '\\N'
+    if isinstance(value, str):
+        return value.translate(_COPY_ESCAPES)
+    if isinstance(value, (datetime.date, datetime.time)):
+        return value.isoformat()
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        # "\x..." no banco; a barra é escapada por ser caractere de escape do COPY
+        return '\\\\x' + bytes(value).hex()
+    if isinstance(value, (dict, Json)):
+        return json.dumps(value.adapted if isinstance(value, Json) else value).translate(_COPY_ESCAPES)
+    if isinstance(value, (list, tuple)):
+        return _array_literal(value).translate(_COPY_ESCAPES)
+    return str(value).translate(_COPY_ESCAPES)
+
+
+
+def write_chunks(connection, table, columns, rows, method='copy', chunk_size=10000, page_size=1000):
+    """Grava `rows` em blocos confirmados um a um; gera a quantidade de linhas de cada bloco
+    
+    Base de DBManager.bulk_insert e AsyncDBManager.copy. method é 'copy'
+    (COPY ... FROM STDIN em formato texto) ou 'values' (execute_values).
+    """
+    if method not in BULK_METHODS:
+        raise ValueError(f"Método de carga inválido: {method}")
+    chunk_size = max(1, int(chunk_size))
+    column_list = ', '.join(columns)
+    cursor = connection.cursor()
+    try:
+        iterator = iter(rows)
+        while True:
+            chunk = list(itertools.islice(iterator, chunk_size))
+            if not chunk:
+                break
+            if method == 'copy':
+                buffer = io.StringIO()
+                buffer.writelines('\t'.join(map(_copy_value, row)) + '\n' for row in chunk)
+                buffer.seek(0)
+                cursor.copy_expert(f"COPY {table} ({column_list}) FROM STDIN", buffer)
+            else:
+                execute_values(cursor, f"INSERT INTO {table} ({column_list}) VALUES %s",
+                               chunk, page_size=page_size)
+            connection.commit()
+            yield len(chunk)
+    finally:
+        cursor.close()
+
 
 class DBManager:
     """
     Singleton para gerenciar a conexão com o banco de dados.
     Responsável por estabelecer e manter a conexão com o Supabase.
+    
+    Consultas de negócio usam o pool (`with db_manager.connection() as conn:`),
+    seguro para várias threads. A conexão dedicada (`get_connection`) fica
+    reservada ao logger e a scripts de manutenção.
     """
     _instance = None
     _connection = None
+    _pool = None
     _logger = None
+    _log_writer = None
     
     def __new__(cls):
         if cls._instance is None:
@@ -21,37 +131,160 @@ class DBManager:
     
     def _initialize(self):
         """Inicializa o gerenciador de banco de dados"""
-        self.settings = Settings()
+        self.settings = get_settings()
         self._connection = None
+        self._pool = None
+        self._connect_lock = threading.RLock()  # Serializa connect() (inclusive o de background)
+        self._query_cache = QueryCache(**self.settings.DB_CACHE_CONFIG)
+        outbox_config = self.settings.OUTBOX_CONFIG
+        self.outbox = (LocalOutbox(outbox_config['path'], outbox_config['batch_size'])
+                       if outbox_config['enabled'] and self.settings.DB_CONFIG['enabled'] else None)
+        # Após retry_attempts falhas seguidas o banco é dado como indisponível por até timeout_seconds
+        self._breaker = CircuitBreaker(
+            failure_threshold=self.settings.SETTINGS['retry_attempts'],
+            reset_timeout=1.0,
+            max_reset_timeout=self.settings.SETTINGS['timeout_seconds']
+        )
         
     def initialize_logging(self):
         """Inicializa o logger antes de conectar ao banco de dados"""
         if not DBManager._logger:
             proj_name = self.settings.PROJECT_INFO['name']
-            DBManager._logger = EnhancedLogger(proj_name)
+            log_config = self.settings.LOG_CONFIG
+            logger_options = {
+                'file_options': {
+                    'max_bytes': log_config['file_max_bytes'],
+                    'rotate_daily': log_config['file_rotate_daily'],
+                    'flush_interval': log_config['file_flush_interval'],
+                    'flush_bytes': log_config['file_flush_bytes'],
+                    'compress': log_config['file_compress']
+                },
+                'metrics_options': {
+                    'enabled': log_config['metrics_enabled'],
+                    'interval': log_config['metrics_interval']
+                },
+                'file_format': log_config['file_format']
+            }
+            sink_options = {
+                'max_queue_size': log_config['db_queue_size'],
+                'batch_size': log_config['db_batch_size'],
+                'flush_interval': log_config['db_flush_interval'],
+                'overflow_policy': log_config['db_overflow_policy'],
+                'spill_dir': log_config['db_spill_dir']
+            }
+            
+            # Modo multiprocesso: workers enviam os registros ao processo escritor
+            forward_to = None
+            if is_child_process() and get_writer_address():
+                forward_to = get_writer_address()
+            elif log_config['multiprocess'] and not is_child_process():
+                db_config = self.settings.DB_CONFIG
+                db_params = None
+                if db_config['enabled']:
+                    db_params = {key: db_config[key] for key in ('host', 'port', 'database', 'user', 'password')}
+                DBManager._log_writer = LogWriterProcess(proj_name, logger_options, db_params, sink_options)
+                forward_to = DBManager._log_writer.start()
+            
+            DBManager._logger = EnhancedLogger(proj_name, forward_to=forward_to, **logger_options)
             DBManager._logger.debug_mode = self.settings.SETTINGS['debug_mode']
+            DBManager._logger.capture_caller = log_config['capture_caller']
+            DBManager._logger.partitioned_logs = log_config['db_partitioned']
+            DBManager._logger.set_levels(
+                file=log_config['file_level'],
+                console=log_config['console_level'],
+                db=log_config['db_level']
+            )
+            DBManager._logger.enable_sampling(
+                every_n=log_config['sample_every_n'],
+                max_per_interval=log_config['rate_limit'],
+                interval=log_config['rate_interval'],
+                summary_interval=log_config['summary_interval']
+            )
+            
+            # Registros que não chegarem ao banco vão para o outbox local
+            if self.outbox and not forward_to:
+                DBManager._logger.enable_outbox(self.outbox)
+            
+            # Habilita o sink de logs em background se configurado
+            if log_config['db_async'] and not forward_to:
+                DBManager._logger.enable_db_sink(**sink_options)
         return DBManager._logger
     
-    def connect(self):
-        """Conecta ao banco de dados Supabase e retorna o status da conexão"""
-        logger = self.initialize_logging()
+    def shutdown_logging(self):
+        """Encerra o processo escritor de logs (modo multiprocesso), gravando o que estiver pendente"""
+        if DBManager._log_writer:
+            if DBManager._logger:
+                DBManager._logger.forwarder.close()
+            DBManager._log_writer.stop()
+            DBManager._log_writer = None
+    
+    @classmethod
+    def reset_after_fork(cls):
+        """Descarta, no processo filho, o singleton e o logger herdados do pai via fork
         
-        # Se já estiver conectado, verifica se a conexão ainda está ativa
-        if self._connection:
+        As instâncias herdadas são mantidas referenciadas (sem close) para que a
+        finalização não encerre a conexão e o canal que continuam em uso pelo pai.
+        """
+        _FORK_INHERITED.append((cls._instance, cls._logger, cls._log_writer))
+        cls._instance = None
+        cls._logger = None
+        cls._log_writer = None
+    
+    def connect(self, timer=None):
+        """Conecta ao banco de dados Supabase e retorna o status da conexão
+        
+        Uma conexão já aberta é considerada ativa sem consultar o banco: quedas
+        são detectadas pelos erros do driver nas operações seguintes. Cada
+        conexão nova é tentada até SETTINGS['retry_attempts'] vezes, com
+        backoff exponencial e jitter, dentro de SETTINGS['timeout_seconds'].
+        Com o circuito aberto (banco indisponível) retorna False de imediato.
+        Chamadas concorrentes esperam a que estiver em andamento.
+        
+        Args:
+            timer (StartupTimer, optional): Registra as fases db_connect, db_check,
+                                            db_pool e db_log_schema
+        """
+        with self._connect_lock:
+            return self._connect(timer)
+    
+    def connect_in_background(self, timer=None, on_done=None):
+        """Executa connect() em uma thread; retorna um Future com o resultado
+        
+        Operações no banco feitas antes do término aguardam a conexão em
+        andamento em vez de abrir outra. `on_done(connected)` roda na mesma
+        thread antes de o Future ser concluído.
+        """
+        future = concurrent.futures.Future()
+        
+        def run():
             try:
-                cursor = self._connection.cursor()
-                cursor.execute('SELECT 1')
-                cursor.close()
-                logger.log_info("db_connect", "Usando conexão existente com o banco de dados", ProcessType.SYSTEM)
-                return True
-            except Exception:
-                # Conexão inativa, fecha para reconectar
-                self._connection = None
-                logger.log_warning("db_connect", "Conexão perdida, tentando reconectar", ProcessType.SYSTEM)
+                connected = self.connect(timer)
+                if on_done:
+                    on_done(connected)
+                future.set_result(connected)
+            except BaseException as e:
+                future.set_exception(e)
+        
+        threading.Thread(target=run, name="db-connect", daemon=True).start()
+        return future
+    
+    def _connect(self, timer):
+        logger = self.initialize_logging()
+        phase = timer.phase if timer else _no_phase
+        
+        # Liveness detectada pelos erros do driver, sem SELECT 1 a cada chamada
+        if (self._connection is not None and not self._connection.closed
+                and self._pool is not None and not self._pool.closed):
+            return True
         
         # Verifica se o banco de dados está habilitado nas configurações
         if not self.settings.DB_CONFIG['enabled']:
-            logger.log_warning("db_connect", "Conexão com banco de dados desabilitada nas configurações", ProcessType.SYSTEM)
+            logger.log_warning("db_connect", "Conexão com banco de dados desabilitada nas configurações",
+                               process_type=ProcessType.SYSTEM)
+            return False
+        
+        # Circuito aberto: falha em microssegundos, sem tentativa de rede
+        if not self._breaker.allow():
             return False
         
         # Tenta estabelecer a conexão com o Supabase
@@ -63,51 +296,275 @@ class DBManager:
             if self.settings.SETTINGS['debug_mode']:
                 logger.log_info("db_connect", 
                                f"Tentando conectar ao banco: {db_config['host']}:{db_config['port']}/{db_config['database']} "
-                               f"com usuário {db_config['user']}", 
-                               ProcessType.SYSTEM)
-            
-            # Estabelece a conexão
-            self._connection = psycopg2.connect(
-                host=db_config['host'],
-                port=db_config['port'],
-                database=db_config['database'],
-                user=db_config['user'],
-                password=db_config['password']
-            )
+                               f"com usuário {db_config['user']}", process_type=ProcessType.SYSTEM)
             
-            # Testando a conexão
-            cursor = self._connection.cursor()
-            cursor.execute('SELECT version()')
-            version = cursor.fetchone()[0]
-            cursor.close()
+            # Estabelece a conexão dedicada (logger e manutenção)
+            with phase("db_connect"):
+                self._connection = self._connect_with_retry()
             
-            logger.log_success("db_connect", f"Conectado com sucesso ao Supabase: {version}", ProcessType.SYSTEM)
-            
-            # Configura o schema se necessário
-            if db_config.get('schema'):
+            # Testando a conexão e verificando o schema na mesma consulta (sem DDL se já existir)
+            with phase("db_check"):
                 cursor = self._connection.cursor()
-                cursor.execute(f"CREATE SCHEMA IF NOT EXISTS {db_config['schema']}")
+                cursor.execute('SELECT version(), EXISTS (SELECT 1 FROM pg_namespace WHERE nspname = %s)',
+                               (db_config.get('schema') or '',))
+                version, schema_exists = cursor.fetchone()
+                
+                logger.log_success("db_connect", f"Conectado com sucesso ao Supabase: {version}",
+                                   process_type=ProcessType.SYSTEM)
+                
+                # Cria o schema apenas se ainda não existir
+                if db_config.get('schema') and not schema_exists:
+                    cursor.execute(f"CREATE SCHEMA IF NOT EXISTS {db_config['schema']}")
+                    logger.log_success("db_connect", f"Schema '{db_config['schema']}' criado",
+                                       process_type=ProcessType.SYSTEM)
                 self._connection.commit()
                 cursor.close()
-                logger.log_success("db_connect", f"Schema '{db_config['schema']}' verificado/criado", ProcessType.SYSTEM)
+            
+            # Pool para as consultas de negócio, separado da conexão do logger
+            if self._pool is None or self._pool.closed:
+                pool_config = self.settings.DB_POOL_CONFIG
+                with phase("db_pool"):
+                    self._pool = ConnectionPool(self._open_connection, **pool_config).open()
+                logger.log_info("db_connect",
+                                f"Pool de conexões criado (min={pool_config['min_size']}, max={pool_config['max_size']})",
+                                process_type=ProcessType.SYSTEM)
             
             # Cria a tabela de logs se o logger precisar
             if hasattr(logger, 'connect_to_db'):
-                logger.connect_to_db(self._connection)
+                with phase("db_log_schema"):
+                    logger.connect_to_db(self._connection)
             
+            self._breaker.record_success()
+            self._schedule_outbox_replay()
             return True
+        except (psycopg2.OperationalError, psycopg2.InterfaceError) as e:
+            # Banco inacessível: abre o circuito para as próximas chamadas falharem sem rede
+            self._breaker.trip()
+            logger.log_error("db_connect", "Falha ao conectar ao banco de dados: %s (nova tentativa em %.1fs)",
+                             str(e).strip(), self._breaker.retry_in, process_type=ProcessType.SYSTEM)
+            return False
         except Exception as e:
-            error_msg = str(e)
-            logger.log_error("db_connect", f"Falha ao conectar ao banco de dados: {error_msg}", ProcessType.SYSTEM)
+            # Banco acessível, mas a preparação falhou (permissão, schema...)
+            self._breaker.record_success()
+            # Sem o pool o próximo connect() abre outra conexão dedicada: fecha esta para não vazar
+            if self._connection is not None:
+                try:
+                    self._connection.close()
+                except Exception:
+                    pass
+                self._connection = None
+            logger.log_error("db_connect", f"Falha ao conectar ao banco de dados: {e}", process_type=ProcessType.SYSTEM)
             return False
     
+    def _schedule_outbox_replay(self):
+        """Reenvia o outbox local em background se houver entradas pendentes"""
+        if self.outbox and self.outbox.pending():
+            threading.Thread(target=self.replay_outbox, name="outbox-replay", daemon=True).start()
+    
+    def replay_outbox(self):
+        """Reenvia ao banco os logs e escritas guardados no outbox local
+        
+        Returns:
+            dict: applied, duplicates e failed (ver LocalOutbox.replay) ou None
+                  se não houver outbox, o banco falhar ou outro reenvio estiver em andamento
+        """
+        if not self.outbox:
+            return None
+        logger = self.initialize_logging()
+        try:
+            totals = self.outbox.replay(self, self.settings.PROJECT_INFO['name'])
+        except Exception as e:
+            logger.log_error("outbox_replay", "Falha ao reenviar o outbox local: %s", e,
+                             process_type=ProcessType.SYSTEM)
+            return None
+        if totals and any(totals.values()):
+            log = logger.log_warning if totals['failed'] else logger.log_success
+            log("outbox_replay", "Outbox local reenviado: %d aplicadas, %d já aplicadas, %d com erro",
+                totals['applied'], totals['duplicates'], totals['failed'], process_type=ProcessType.SYSTEM)
+        return totals
+    
+    def _connect_with_retry(self):
+        """Abre a conexão dedicada com backoff exponencial e jitter, limitado por retry_attempts/timeout_seconds"""
+        attempts = max(1, self.settings.SETTINGS['retry_attempts'])
+        timeout = self.settings.SETTINGS['timeout_seconds']
+        deadline = time.monotonic() + timeout
+        for attempt in range(attempts):
+            remaining = deadline - time.monotonic()
+            try:
+                return self._open_connection(connect_timeout=max(1, int(remaining)))
+            except psycopg2.OperationalError:
+                delay = backoff_delay(attempt, cap=timeout)
+                if attempt == attempts - 1 or time.monotonic() + delay >= deadline:
+                    raise
+                time.sleep(delay)
+    
+    def _open_connection(self, connect_timeout=None):
+        """Abre uma nova conexão psycopg2 com os parâmetros das configurações"""
+        db_config = self.settings.DB_CONFIG
+        return psycopg2.connect(
+            host=db_config['host'],
+            port=db_config['port'],
+            database=db_config['database'],
+            user=db_config['user'],
+            password=db_config['password'],
+            connect_timeout=connect_timeout or self.settings.SETTINGS['timeout_seconds']
+        )
+    
+    def _connection_lost(self, error):
+        """Registra uma falha de conexão detectada pelo driver"""
+        if self._breaker.record_failure():
+            self.initialize_logging().log_error(
+                "db_connection", "Banco de dados indisponível (%s); novas tentativas em %.1fs",
+                str(error).strip(), self._breaker.retry_in, process_type=ProcessType.SYSTEM
+            )
+    
+    def _record_success(self):
+        """Registra que o banco respondeu; na volta após uma queda, chama _recover em background"""
+        if self._breaker.record_success():
+            threading.Thread(target=self._recover, name="db-recover", daemon=True).start()
+    
+    def _recover(self):
+        """Depois de uma queda: abre uma nova conexão dedicada, a associa ao logger e reenvia o outbox
+        
+        O logger para de gravar no banco quando a conexão dedicada cai
+        (db_connection = None) e o pool volta sozinho, então sem isso os logs
+        iriam para o outbox até o fim da execução. A conexão anterior não é
+        testada daqui: ela pode estar em uso pela thread do DatabaseLogSink, e
+        um SELECT/commit desta thread se misturaria ao lote em andamento.
+        """
+        logger = self.initialize_logging()
+        with self._connect_lock:
+            if self._pool is None or self._pool.closed:
+                return  # Encerrado ou ainda não conectado: connect() faz a associação
+            try:
+                previous, self._connection = self._connection, self._open_connection()
+            except (psycopg2.OperationalError, psycopg2.InterfaceError) as e:
+                self._connection_lost(e)
+                return
+            if hasattr(logger, 'connect_to_db') and logger.connect_to_db(self._connection):
+                logger.log_info("db_connection", "Conexão com o banco restabelecida",
+                                process_type=ProcessType.SYSTEM)
+            # Fechada só depois que o logger passou para a conexão nova (o sink antigo já foi encerrado)
+            if previous is not None:
+                try:
+                    previous.close()
+                except Exception:
+                    pass
+        # Reenvia o que foi guardado no outbox durante a queda
+        if self.outbox and self.outbox.pending():
+            self.replay_outbox()
+    
+    @property
+    def connection_state(self):
+        """'connected', 'disconnected', 'open' (banco indisponível) ou 'half_open' (testando)"""
+        state = self._breaker.state
+        if state != CircuitBreaker.CLOSED:
+            return state
+        return 'connected' if self._pool is not None and not self._pool.closed else 'disconnected'
+    
     def get_connection(self):
-        """Retorna a conexão ativa ou tenta reconectar"""
-        if not self._connection:
+        """Retorna a conexão dedicada ou tenta reconectar
+        
+        A conexão dedicada não é segura para uso concorrente; em threads use connection().
+        """
+        if self._connection is None or self._connection.closed:
             self.connect()
         return self._connection
     
-    def execute_query(self, query, params=None, commit=False):
+    @contextlib.contextmanager
+    def connection(self, timeout=None):
+        """Checkout de uma conexão do pool: `with db_manager.connection() as conn:`
+        
+        A conexão volta ao pool ao sair do bloco; transações não confirmadas
+        (sem conn.commit()) são desfeitas. Erros de conexão do driver contam
+        para o circuit breaker.
+        
+        Args:
+            timeout (float, optional): Espera máxima por uma conexão livre;
+                                       padrão DB_POOL_CHECKOUT_TIMEOUT
+        
+        Raises:
+            CircuitOpenError: Banco considerado indisponível (sem tentativa de rede)
+            DatabaseUnavailableError: Banco desabilitado ou falha ao conectar
+            PoolTimeoutError: Nenhuma conexão livre no tempo de espera
+        """
+        if self._pool is None or self._pool.closed:
+            if not self.connect():
+                if self._breaker.state != CircuitBreaker.CLOSED:
+                    raise CircuitOpenError(f"Banco de dados indisponível; nova tentativa em "
+                                           f"{self._breaker.retry_in:.1f}s")
+                raise DatabaseUnavailableError("Não foi possível conectar ao banco de dados")
+        elif not self._breaker.allow():
+            raise CircuitOpenError(f"Banco de dados indisponível; nova tentativa em {self._breaker.retry_in:.1f}s")
+        
+        conn = None
+        try:
+            with self._pool.connection(timeout) as conn:
+                yield conn
+        except (psycopg2.OperationalError, psycopg2.InterfaceError) as e:
+            # Só conta como queda se a conexão morreu (ou nem foi aberta), não em timeouts de query
+            if conn is None or conn.closed:
+                self._connection_lost(e)
+            else:
+                self._record_success()
+            raise
+        except BaseException:
+            self._record_success()  # O banco respondeu (erro de SQL, do chamador...)
+            raise
+        self._record_success()
+    
+    @contextlib.contextmanager
+    def transaction(self, commit_every=None, timeout=None):
+        """Unidade de trabalho: `with db_manager.transaction() as tx:`
+        
+        Os comandos do bloco (tx.execute ou execute_query, mesmo com
+        commit=True) usam a mesma conexão e são confirmados em um único commit
+        ao sair; uma exceção desfaz tudo o que não foi confirmado. Um
+        transaction() dentro de outro vira um savepoint da transação externa.
+        
+        Args:
+            commit_every (int, optional): Confirma a cada N comandos, para cargas
+                                          muito longas (perde a atomicidade do bloco)
+            timeout (float, optional): Espera máxima por uma conexão do pool
+        
+        Uso:
+            with db_manager.transaction() as tx:
+                for item in items:
+                    try:
+                        with tx.savepoint():
+                            tx.execute("INSERT INTO ...", item)
+                    except psycopg2.Error:
+                        ...  # Só o item é desfeito; os demais seguem
+        """
+        outer = current_transaction()
+        if outer is not None:
+            with outer.savepoint():
+                yield outer
+            return
+        
+        with self.connection(timeout) as conn:
+            tx = Transaction(conn, commit_every, on_commit=self._invalidate_tables)
+            token = _CURRENT_TRANSACTION.set(tx)
+            try:
+                yield tx
+                tx.commit()
+            except BaseException:
+                with contextlib.suppress(psycopg2.Error):
+                    tx.rollback()
+                raise
+            finally:
+                _CURRENT_TRANSACTION.reset(token)
+    
+    def _invalidate_tables(self, tables):
+        for table in tables:
+            self._query_cache.invalidate(table)
+    
+    def get_pool_stats(self):
+        """Retorna os contadores do pool (in_use, waits, avg_checkout_ms, ...) ou None sem pool"""
+        return self._pool.stats() if self._pool else None
+    
+    def execute_query(self, query, params=None, commit=False, cache=False, cache_ttl=None, cache_tables=None,
+                      outbox=False):
         """
         Executa uma query no banco de dados
         
@@ -115,44 +572,241 @@ class DBManager:
             query (str): Query SQL a ser executada
             params (tuple, optional): Parâmetros para a query
             commit (bool, optional): Se deve fazer commit após a execução
+            cache (bool, optional): Reaproveita o resultado de uma leitura igual
+                                    (mesmo SQL normalizado e parâmetros) ainda válida
+            cache_ttl (float, optional): Validade do resultado em segundos; padrão DB_CACHE_TTL
+            cache_tables (list, optional): Tabelas lidas pela query, quando a detecção
+                                           automática pelo SQL não for suficiente
+            outbox (bool, optional): Com commit=True, guarda o comando no outbox local
+                                     se o banco estiver indisponível; é reenviado quando
+                                     a conexão voltar e o retorno é (True, None)
             
         Returns:
             tuple: (success, result/error_message)
+        
+        Escritas com commit=True invalidam as leituras em cache das tabelas que tocam.
+        Dentro de transaction() o comando usa a conexão da transação, não faz
+        commit próprio nem usa o cache, e erros são relançados para desfazer o bloco.
         """
         logger = self.initialize_logging()
         
-        if not self._connection and not self.connect():
-            return False, "Não foi possível conectar ao banco de dados"
+        tx = current_transaction()
+        if tx is not None:
+            try:
+                result = tx.execute(query, params) if commit else tx.fetchall(query, params)
+            except Exception as e:
+                logger.log_error("execute_query", "Erro ao executar query na transação: %s", e,
+                                 process_type=ProcessType.SYSTEM)
+                raise
+            return True, result
+        
+        cache_key = None
+        if cache and not commit:
+            try:
+                cache_key = self._query_cache.make_key(query, params)
+                hit, result = self._query_cache.get(cache_key)
+            except TypeError:
+                cache_key, hit = None, False  # Parâmetros não hasheáveis: consulta sem cache
+            if hit:
+                return True, list(result)
         
         try:
-            cursor = self._connection.cursor()
-            cursor.execute(query, params)
-            
-            if commit:
-                self._connection.commit()
-                result = cursor.rowcount
-            else:
-                result = cursor.fetchall()
+            with self.connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute(query, params)
                 
-            cursor.close()
-            return True, result
+                if commit:
+                    conn.commit()
+                    result = cursor.rowcount
+                else:
+                    result = cursor.fetchall()
+                    
+                cursor.close()
+        except DatabaseUnavailableError as e:
+            # O comando não chegou ao banco: pode ser reenviado sem risco de duplicar
+            if outbox and commit and self.outbox and self.outbox.add_write(query, params):
+                return True, None
+            # Já registrado na conexão/abertura do circuito; não repete o erro a cada chamada
+            return False, str(e)
         except Exception as e:
             error_msg = str(e)
-            logger.log_error("execute_query", f"Erro ao executar query: {error_msg}", ProcessType.SYSTEM)
+            logger.log_error("execute_query", f"Erro ao executar query: {error_msg}", process_type=ProcessType.SYSTEM)
             return False, error_msg
+        
+        if commit:
+            self._query_cache.invalidate_query(query)
+        elif cache_key is not None:
+            self._query_cache.set(cache_key, tuple(result), cache_ttl, cache_tables)
+        return True, result
+    
+    def invalidate_cache(self, table=None):
+        """Descarta as leituras em cache de uma tabela (ou todas); retorna quantas foram removidas"""
+        return self._query_cache.invalidate(table)
+    
+    def get_cache_stats(self):
+        """Retorna os contadores do cache de consultas (hits, misses, evictions, size, ...)"""
+        return self._query_cache.stats()
+    
+    def stream_query_batches(self, query, params=None, batch_size=None):
+        """
+        Executa uma query com cursor nomeado (no servidor) e retorna os resultados em lotes
+        
+        Apenas `batch_size` linhas ficam em memória por vez, independente do
+        tamanho do resultado. A conexão fica reservada do pool até o consumo
+        terminar; se o consumidor parar antes (break, exceção ou close() do
+        gerador), o cursor é fechado e a conexão devolvida ao pool.
+        
+        Args:
+            query (str): Query SQL (SELECT)
+            params (tuple, optional): Parâmetros para a query
+            batch_size (int, optional): Linhas por lote; padrão DB_STREAM_BATCH_SIZE
+            
+        Yields:
+            tuple: (colunas, lista de linhas)
+        """
+        logger = self.initialize_logging()
+        batch_size = batch_size or self.settings.DB_CONFIG['stream_batch_size']
+        
+        with self.connection() as conn:
+            # Cursores nomeados vivem dentro da transação; o pool faz rollback ao devolver
+            cursor = conn.cursor(name=f"rpa_stream_{uuid.uuid4().hex[:12]}")
+            cursor.itersize = batch_size
+            try:
+                cursor.execute(query, params)
+                columns = None
+                while True:
+                    rows = cursor.fetchmany(batch_size)
+                    if columns is None:
+                        columns = [column[0] for column in cursor.description or ()]
+                    if not rows:
+                        break
+                    yield columns, rows
+            except Exception as e:
+                logger.log_error("stream_query", f"Erro ao executar query em streaming: {e}",
+                                 process_type=ProcessType.SYSTEM)
+                raise
+            finally:
+                try:
+                    cursor.close()
+                except Exception:
+                    pass  # Conexão já perdida; o pool descarta no release
+    
+    def stream_query(self, query, params=None, batch_size=None):
+        """Itera as linhas de uma query sem carregar o resultado inteiro (ver stream_query_batches)"""
+        for _, rows in self.stream_query_batches(query, params, batch_size):
+            yield from rows
+    
+    def stream_dataframes(self, query, params=None, chunk_size=None):
+        """Itera o resultado de uma query em DataFrames de até `chunk_size` linhas"""
+        import pandas as pd  # Import tardio: só quem usa DataFrames paga o custo do pandas
+        
+        for columns, rows in self.stream_query_batches(query, params, chunk_size):
+            yield pd.DataFrame.from_records(rows, columns=columns)
+    
+    def bulk_insert(self, table, columns, rows, method=None, chunk_size=None, page_size=1000):
+        """
+        Insere muitas linhas com COPY ... FROM STDIN ou INSERTs em páginas (execute_values)
+        
+        As linhas são consumidas em blocos de `chunk_size` (podem vir de um
+        gerador, sem carregar o arquivo inteiro) e cada bloco é confirmado
+        com um commit. Em caso de erro, os blocos já confirmados permanecem.
+        
+        Args:
+            table (str): Tabela de destino (ex.: "schema.tabela")
+            columns (list): Colunas na ordem dos valores de cada linha
+            rows (iterable): Sequências de valores
+            method (str, optional): 'copy' ou 'values'; padrão DB_BULK_METHOD
+            chunk_size (int, optional): Linhas por commit; padrão DB_BULK_CHUNK_SIZE
+            page_size (int): Linhas por INSERT no método 'values'
+            
+        Returns:
+            tuple: (success, stats/error_message) — stats tem rows, chunks,
+                   seconds e rows_per_second
+        """
+        logger = self.initialize_logging()
+        method = (method or self.settings.DB_CONFIG['bulk_method']).lower()
+        if method not in BULK_METHODS:
+            raise ValueError(f"Método de carga inválido: {method}")
+        chunk_size = chunk_size or self.settings.DB_CONFIG['bulk_chunk_size']
+        
+        inserted = chunks = 0
+        started = time.perf_counter()
+        try:
+            with self.connection() as conn:
+                for count in write_chunks(conn, table, columns, rows, method, chunk_size, page_size):
+                    inserted += count
+                    chunks += 1
+        except DatabaseUnavailableError as e:
+            return False, str(e)
+        except Exception as e:
+            self._query_cache.invalidate(table)  # Blocos anteriores podem ter sido confirmados
+            logger.log_error("bulk_insert", "Erro na carga em %s após %d linhas confirmadas: %s", table, inserted, e,
+                             process_type=ProcessType.SYSTEM)
+            return False, str(e)
+        
+        self._query_cache.invalidate(table)
+        seconds = time.perf_counter() - started
+        stats = {
+            'rows': inserted,
+            'chunks': chunks,
+            'seconds': seconds,
+            'rows_per_second': inserted / seconds if seconds > 0 else 0.0
+        }
+        logger.log_success("bulk_insert", "%d linhas inseridas em %s via %s em %.2fs (%.0f linhas/s)",
+                           inserted, table, method, seconds, stats['rows_per_second'], process_type=ProcessType.SYSTEM)
+        return True, stats
+    
+    def copy_from_dataframe(self, df, table, columns=None, chunk_size=None):
+        """Carrega um DataFrame com COPY, convertendo NaN/NaT em NULL (ver bulk_insert)"""
+        columns = list(columns or df.columns)
+        chunk_size = max(1, int(chunk_size or self.settings.DB_CONFIG['bulk_chunk_size']))
+        
+        def iter_rows():
+            # Converte um bloco por vez para não duplicar o DataFrame inteiro em memória
+            for start in range(0, len(df), chunk_size):
+                part = df[columns].iloc[start:start + chunk_size].astype(object)
+                part = part.where(part.notna(), None)
+                yield from part.itertuples(index=False, name=None)
+        
+        return self.bulk_insert(table, columns, iter_rows(), method='copy', chunk_size=chunk_size)
     
     def close(self):
-        """Fecha a conexão com o banco de dados"""
+        """Fecha a conexão com o banco de dados (aguarda um connect() em andamento)"""
+        with self._connect_lock:
+            return self._close()
+    
+    def _close(self):
         logger = self.initialize_logging()
         
+        if self._pool:
+            stats = self._pool.stats()
+            logger.log_info("db_close",
+                            f"Pool de conexões: {stats['checkouts']} checkouts, {stats['waits']} esperas, "
+                            f"{stats['timeouts']} timeouts, checkout médio {stats['avg_checkout_ms']:.1f} ms "
+                            f"(máx. {stats['max_checkout_ms']:.1f} ms), {stats['in_use']} em uso",
+                            process_type=ProcessType.SYSTEM)
+            self._pool.close()
+            self._pool = None
+        
+        if self.outbox:
+            self.outbox.close()
+        
         if self._connection:
+            # Encerramento não é queda: os logs seguintes não vão para o outbox
+            if logger.db_outbox is self.outbox:
+                logger.enable_outbox(None)
+            
+            # Grava os logs pendentes antes de fechar a conexão usada pelo logger
+            if logger.db_connection is self._connection:
+                logger.disconnect_db()
+            
             try:
                 self._connection.close()
                 self._connection = None
-                logger.log_info("db_close", "Conexão com banco de dados fechada", ProcessType.SYSTEM)
+                logger.log_info("db_close", "Conexão com banco de dados fechada", process_type=ProcessType.SYSTEM)
                 return True
             except Exception as e:
-                logger.log_error("db_close", f"Erro ao fechar conexão: {str(e)}", ProcessType.SYSTEM)
+                logger.log_error("db_close", f"Erro ao fechar conexão: {str(e)}", process_type=ProcessType.SYSTEM)
                 return False
         return True
 
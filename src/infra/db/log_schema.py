@@ -0,0 +1,434 @@
+# src/infra/db/log_schema.py
+# Estrutura da tabela {schema}.logs: particionamento mensal por log_date,
+# índices para os filtros dos dashboards, retenção e migração de tabelas antigas
+#
+# Uso (linha de comando):
+#   python -m src.infra.db.log_schema retention --keep-months 6 [--archive-schema arquivo]
+#   python -m src.infra.db.log_schema migrate [--drop-legacy]
+#   python -m src.infra.db.log_schema indexes
+#   python -m src.infra.db.log_schema latency [--days 7]
+
+import argparse
+import datetime
+import logging
+import re
+import sys
+
+from src.utils.log_record import LOG_COLUMNS
+
+# Colunas da tabela de logs (id e created_at são preenchidos pelo banco)
+LOG_TABLE_COLUMNS = """
+    task_name VARCHAR(255),
+    function_name VARCHAR(255),
+    source_file VARCHAR(255),
+    cpu_usage FLOAT,
+    memory_usage FLOAT,
+    log_date DATE NOT NULL,
+    log_time TIME,
+    log_message TEXT,
+    process_type VARCHAR(50),
+    status VARCHAR(50),
+    duration_ms DOUBLE PRECISION,
+    span_id VARCHAR(32),
+    parent_span_id VARCHAR(32),
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+"""
+
+# Colunas adicionadas depois da criação original da tabela; tabelas existentes
+# recebem as que faltam no bootstrap (ADD COLUMN sem default não reescreve a tabela)
+LOG_TABLE_ADDED_COLUMNS = (
+    ("duration_ms", "DOUBLE PRECISION"),
+    ("span_id", "VARCHAR(32)"),
+    ("parent_span_id", "VARCHAR(32)"),
+)
+
+# Índices usados pelos dashboards (filtros por log_date, task_name e status);
+# em tabelas particionadas são propagados automaticamente para cada partição
+LOG_TABLE_INDEXES = (
+    ("logs_task_status_date_idx", "(task_name, status, log_date)", "btree"),
+    ("logs_status_date_idx", "(status, log_date)", "btree"),
+    ("logs_created_at_brin_idx", "(created_at)", "brin"),
+    # Parcial: só os registros de fim de span, usados nas consultas de latência
+    ("logs_span_duration_idx", "(function_name, log_date) WHERE duration_ms IS NOT NULL", "btree"),
+)
+
+# Latência por etapa (registros de fim de span) no intervalo [início, fim) de log_date
+SPAN_LATENCY_SQL = """
+    SELECT task_name, function_name, COUNT(*) AS spans,
+           percentile_cont(0.5) WITHIN GROUP (ORDER BY duration_ms) AS p50_ms,
+           percentile_cont(0.95) WITHIN GROUP (ORDER BY duration_ms) AS p95_ms,
+           MAX(duration_ms) AS max_ms
+    FROM {schema}.logs
+    WHERE duration_ms IS NOT NULL AND log_date >= %s AND log_date < %s
+    GROUP BY task_name, function_name
+    ORDER BY p95_ms DESC
+"""
+
+
+_PARTITION_RE = re.compile(r'^logs_(\d{4})_(\d{2})$')
+
+# Todas as colunas gravadas, na ordem usada para mover linhas entre partições
+_ALL_COLUMNS = ', '.join(('id',) + tuple(LOG_COLUMNS) + ('created_at',))
+
+
+def month_start(day):
+    """Primeiro dia do mês da data informada"""
+    return datetime.date(day.year, day.month, 1)
+
+
+def add_months(day, months):
+    """Soma meses a uma data que seja o primeiro dia do mês"""
+    index = day.year * 12 + day.month - 1 + months
+    return datetime.date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(day):
+    """Nome da partição mensal que contém a data (ex.: logs_2024_01)"""
+    return f"logs_{day.year:04d}_{day.month:02d}"
+
+
+def partition_range(name):
+    """Intervalo [início, fim) de uma partição a partir do nome, ou None se não for mensal"""
+    match = _PARTITION_RE.match(name)
+    if not match:
+        return None
+    start = datetime.date(int(match.group(1)), int(match.group(2)), 1)
+    return start, add_months(start, 1)
+
+
+def get_log_table_kind(cursor, schema):
+    """Retorna 'partitioned', 'heap' ou None se {schema}.logs não existir"""
+    cursor.execute("""
+        SELECT c.relkind FROM pg_class c
+        JOIN pg_namespace n ON n.oid = c.relnamespace
+        WHERE n.nspname = %s AND c.relname = 'logs'
+    """, (schema,))
+    row = cursor.fetchone()
+    if not row:
+        return None
+    return 'partitioned' if row[0] == 'p' else 'heap'
+
+
+def create_log_table(cursor, schema, partitioned=True):
+    """Cria {schema}.logs (particionada por mês ou heap) com os índices"""
+    if partitioned:
+        cursor.execute(f"""
+        CREATE TABLE IF NOT EXISTS {schema}.logs (
+            id BIGSERIAL,{LOG_TABLE_COLUMNS},
+            PRIMARY KEY (id, log_date)
+        ) PARTITION BY RANGE (log_date)
+        """)
+        # Partição padrão para datas fora das partições mensais já criadas
+        cursor.execute(f"CREATE TABLE IF NOT EXISTS {schema}.logs_default PARTITION OF {schema}.logs DEFAULT")
+    else:
+        cursor.execute(f"""
+        CREATE TABLE IF NOT EXISTS {schema}.logs (
+            id BIGSERIAL PRIMARY KEY,{LOG_TABLE_COLUMNS}
+        )
+        """)
+
+    create_log_indexes(cursor, schema)
+
+
+def create_log_indexes(cursor, schema):
+    """Índices de LOG_TABLE_INDEXES em {schema}.logs (os que já existem são mantidos)"""
+    for name, columns, method in LOG_TABLE_INDEXES:
+        cursor.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {schema}.logs USING {method} {columns}")
+
+
+def add_missing_columns(cursor, schema):
+    """Adiciona a uma tabela {schema}.logs existente as colunas criadas em versões posteriores"""
+    for name, definition in LOG_TABLE_ADDED_COLUMNS:
+        cursor.execute(f"ALTER TABLE {schema}.logs ADD COLUMN IF NOT EXISTS {name} {definition}")
+
+
+def create_partition(cursor, schema, lower, has_default=True):
+    """Cria a partição mensal que começa em `lower`
+
+    Se a partição padrão já guarda linhas do mês (gravadas enquanto a
+    partição não existia), o PostgreSQL recusa o CREATE ... PARTITION OF.
+    Nesse caso a padrão é desanexada, a partição é criada, as linhas do mês
+    são movidas para ela e a padrão é anexada de novo, na mesma transação.
+
+    Returns:
+        int: Linhas movidas da partição padrão
+    """
+    name = partition_name(lower)
+    upper = add_months(lower, 1)
+    create = f"""
+        CREATE TABLE IF NOT EXISTS {schema}.{name} PARTITION OF {schema}.logs
+        FOR VALUES FROM ('{lower.isoformat()}') TO ('{upper.isoformat()}')
+        """
+    if has_default:
+        cursor.execute(f"SELECT EXISTS (SELECT 1 FROM {schema}.logs_default WHERE log_date >= %s AND log_date < %s)",
+                       (lower, upper))
+        row = cursor.fetchone()
+        has_default = bool(row and row[0])
+    if not has_default:
+        cursor.execute(create)
+        return 0
+
+    cursor.execute(f"ALTER TABLE {schema}.logs DETACH PARTITION {schema}.logs_default")
+    cursor.execute(create)
+    cursor.execute(f"""
+        WITH moved AS (
+            DELETE FROM {schema}.logs_default WHERE log_date >= %s AND log_date < %s
+            RETURNING {_ALL_COLUMNS}
+        )
+        INSERT INTO {schema}.logs ({_ALL_COLUMNS}) SELECT {_ALL_COLUMNS} FROM moved
+    """, (lower, upper))
+    moved = cursor.rowcount
+    cursor.execute(f"ALTER TABLE {schema}.logs ATTACH PARTITION {schema}.logs_default DEFAULT")
+    logging.info(f"Moved {moved} rows from {schema}.logs_default to {schema}.{name}")
+    return moved
+
+
+def ensure_partitions(cursor, schema, start=None, months_ahead=1):
+    """Cria as partições mensais de `start` (padrão: mês atual) até `months_ahead` meses à frente
+
+    Só os meses sem partição são criados (ver create_partition para linhas
+    que já estejam na partição padrão).
+
+    Returns:
+        list: Nomes das partições verificadas/criadas
+    """
+    first = month_start(start or datetime.date.today())
+    existing = set(list_partitions(cursor, schema))
+    names = []
+    for offset in range(months_ahead + 1):
+        lower = add_months(first, offset)
+        name = partition_name(lower)
+        if name not in existing:
+            create_partition(cursor, schema, lower, has_default='logs_default' in existing)
+        names.append(name)
+    return names
+
+
+def bootstrap_log_table(connection, schema, partitioned=True, months_ahead=1):
+    """Garante schema, tabela de logs, índices e partições dos próximos meses
+
+    Executa toda a DDL a cada chamada; na partida dos bots o EnhancedLogger
+    usa migrations.ensure_schema, que só aplica DDL quando a versão está atrasada.
+
+    Tabelas heap criadas por versões anteriores não são convertidas aqui (só
+    recebem as colunas novas); use migrate_to_partitioned (ou o comando
+    `migrate`) para convertê-las.
+
+    Returns:
+        str: Tipo da tabela após o bootstrap ('partitioned' ou 'heap')
+    """
+    cursor = connection.cursor()
+    try:
+        cursor.execute(f"CREATE SCHEMA IF NOT EXISTS {schema}")
+        kind = get_log_table_kind(cursor, schema)
+        if kind is None:
+            create_log_table(cursor, schema, partitioned)
+            kind = 'partitioned' if partitioned else 'heap'
+        else:
+            add_missing_columns(cursor, schema)
+            if kind == 'heap' and partitioned:
+                logging.warning(f"Table {schema}.logs is not partitioned; run "
+                                f"'python -m src.infra.db.log_schema migrate' to convert it")
+
+        if kind == 'partitioned':
+            ensure_partitions(cursor, schema, months_ahead=months_ahead)
+        connection.commit()
+        return kind
+    except Exception:
+        connection.rollback()
+        raise
+    finally:
+        cursor.close()
+
+
+def list_partitions(cursor, schema):
+    """Nomes das partições de {schema}.logs"""
+    cursor.execute("""
+        SELECT child.relname FROM pg_inherits i
+        JOIN pg_class parent ON parent.oid = i.inhparent
+        JOIN pg_class child ON child.oid = i.inhrelid
+        JOIN pg_namespace n ON n.oid = parent.relnamespace
+        WHERE n.nspname = %s AND parent.relname = 'logs'
+        ORDER BY child.relname
+    """, (schema,))
+    return [row[0] for row in cursor.fetchall()]
+
+
+def apply_retention(connection, schema, keep_months, archive_schema=None, today=None):
+    """Remove (ou arquiva) as partições mensais anteriores ao período mantido
+
+    São mantidos o mês atual e os `keep_months` meses anteriores.
+
+    Cada partição é desanexada e descartada de uma vez (DROP TABLE), sem
+    DELETE linha a linha. Com `archive_schema`, a partição é movida para esse
+    schema em vez de apagada.
+
+    Returns:
+        list: [(partição, 'dropped' | 'archived')]
+    """
+    cutoff = add_months(month_start(today or datetime.date.today()), -int(keep_months))
+    cursor = connection.cursor()
+    actions = []
+    try:
+        if archive_schema:
+            cursor.execute(f"CREATE SCHEMA IF NOT EXISTS {archive_schema}")
+        for name in list_partitions(cursor, schema):
+            bounds = partition_range(name)
+            if bounds is None or bounds[1] > cutoff:
+                continue
+            cursor.execute(f"ALTER TABLE {schema}.logs DETACH PARTITION {schema}.{name}")
+            if archive_schema:
+                cursor.execute(f"ALTER TABLE {schema}.{name} SET SCHEMA {archive_schema}")
+                actions.append((name, 'archived'))
+            else:
+                cursor.execute(f"DROP TABLE {schema}.{name}")
+                actions.append((name, 'dropped'))
+            # Commit por partição para liberar os locks o quanto antes
+            connection.commit()
+        return actions
+    except Exception:
+        connection.rollback()
+        raise
+    finally:
+        cursor.close()
+
+
+def migrate_to_partitioned(connection, schema, drop_legacy=False, months_ahead=1):
+    """Converte uma tabela {schema}.logs heap em particionada, preservando os dados
+
+    A tabela antiga é renomeada para logs_legacy, a nova é criada com as
+    partições que cobrem os dados existentes e as linhas são copiadas em um
+    único INSERT ... SELECT, tudo na mesma transação.
+
+    Returns:
+        int: Quantidade de linhas migradas (0 se já estiver particionada ou não existir)
+    """
+    cursor = connection.cursor()
+    try:
+        if get_log_table_kind(cursor, schema) != 'heap':
+            return 0
+
+        # Garante as colunas de span na tabela antiga para copiá-las junto
+        add_missing_columns(cursor, schema)
+        cursor.execute(f"ALTER TABLE {schema}.logs RENAME TO logs_legacy")
+        cursor.execute(f"ALTER INDEX IF EXISTS {schema}.logs_pkey RENAME TO logs_legacy_pkey")
+        for name, _, _ in LOG_TABLE_INDEXES:
+            cursor.execute(f"ALTER INDEX IF EXISTS {schema}.{name} RENAME TO legacy_{name}")
+        create_log_table(cursor, schema, partitioned=True)
+
+        cursor.execute(f"""
+            SELECT MIN(COALESCE(log_date, created_at::date, CURRENT_DATE)) FROM {schema}.logs_legacy
+        """)
+        oldest = cursor.fetchone()[0] or datetime.date.today()
+        today = month_start(datetime.date.today())
+        months = (today.year - oldest.year) * 12 + today.month - oldest.month
+        ensure_partitions(cursor, schema, start=oldest, months_ahead=max(months, 0) + months_ahead)
+
+        cursor.execute(f"""
+            INSERT INTO {schema}.logs (id, task_name, function_name, source_file, cpu_usage, memory_usage,
+                log_date, log_time, log_message, process_type, status,
+                duration_ms, span_id, parent_span_id, created_at)
+            SELECT id, task_name, function_name, source_file, cpu_usage, memory_usage,
+                COALESCE(log_date, created_at::date, CURRENT_DATE), log_time, log_message,
+                process_type, status, duration_ms, span_id, parent_span_id, created_at
+            FROM {schema}.logs_legacy
+        """)
+        migrated = cursor.rowcount
+
+        # Continua a numeração de id a partir da tabela antiga
+        cursor.execute(f"""
+            SELECT setval(pg_get_serial_sequence('{schema}.logs', 'id'),
+                          GREATEST((SELECT MAX(id) FROM {schema}.logs_legacy), 1))
+        """)
+        if drop_legacy:
+            cursor.execute(f"DROP TABLE {schema}.logs_legacy")
+        connection.commit()
+        return migrated
+    except Exception:
+        connection.rollback()
+        raise
+    finally:
+        cursor.close()
+
+
+def create_indexes_concurrently(connection, schema):
+    """Cria os índices em uma tabela heap existente sem bloquear as inserções
+
+    CREATE INDEX CONCURRENTLY não roda dentro de transação, então a conexão é
+    colocada temporariamente em autocommit.
+    """
+    previous = connection.autocommit
+    connection.autocommit = True
+    cursor = connection.cursor()
+    try:
+        for name, columns, method in LOG_TABLE_INDEXES:
+            cursor.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON {schema}.logs USING {method} {columns}")
+    finally:
+        cursor.close()
+        connection.autocommit = previous
+
+
+def span_latency(connection, schema, start, end):
+    """p50/p95/máximo de duration_ms por (task_name, function_name) entre as datas [start, end)
+
+    Returns:
+        list: [(task_name, function_name, spans, p50_ms, p95_ms, max_ms)], mais lentas primeiro
+    """
+    cursor = connection.cursor()
+    try:
+        cursor.execute(SPAN_LATENCY_SQL.format(schema=schema), (start, end))
+        return cursor.fetchall()
+    finally:
+        cursor.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Manutenção da tabela de logs")
+    parser.add_argument('--schema', help="Schema da tabela de logs (padrão: nome do projeto, como no EnhancedLogger)")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    retention = commands.add_parser('retention', help="Remove/arquiva partições antigas")
+    retention.add_argument('--keep-months', type=int, help="Meses mantidos (padrão: LOG_RETENTION_MONTHS)")
+    retention.add_argument('--archive-schema', help="Move as partições para este schema em vez de apagar")
+
+    migrate = commands.add_parser('migrate', help="Converte uma tabela heap em particionada")
+    migrate.add_argument('--drop-legacy', action='store_true', help="Apaga logs_legacy após a cópia")
+
+    commands.add_parser('indexes', help="Cria os índices em uma tabela heap sem bloquear inserções")
+
+    latency = commands.add_parser('latency', help="p50/p95 de duração por etapa (spans)")
+    latency.add_argument('--days', type=int, default=7, help="Dias considerados, incluindo hoje (padrão: 7)")
+    args = parser.parse_args(argv)
+
+    # Import tardio: db_manager depende do logger, que depende deste módulo
+    from src.infra.db.db_manager import get_db_manager
+    db_manager = get_db_manager()
+    connection = db_manager.get_connection()
+    if not connection:
+        print("Não foi possível conectar ao banco de dados")
+        return 1
+    schema = args.schema or db_manager.settings.PROJECT_INFO['name']
+
+    if args.command == 'retention':
+        keep_months = args.keep_months or db_manager.settings.LOG_CONFIG['retention_months']
+        if not keep_months:
+            print("Informe --keep-months ou defina LOG_RETENTION_MONTHS")
+            return 1
+        for name, action in apply_retention(connection, schema, keep_months, args.archive_schema):
+            print(f"{name}: {action}")
+    elif args.command == 'migrate':
+        print(f"Linhas migradas: {migrate_to_partitioned(connection, schema, args.drop_legacy)}")
+    elif args.command == 'indexes':
+        create_indexes_concurrently(connection, schema)
+        print("Índices verificados/criados")
+    elif args.command == 'latency':
+        end = datetime.date.today() + datetime.timedelta(days=1)
+        start = end - datetime.timedelta(days=max(args.days, 1))
+        print("task_name\tfunction_name\tspans\tp50_ms\tp95_ms\tmax_ms")
+        for task_name, function_name, spans, p50, p95, maximum in span_latency(connection, schema, start, end):
+            print(f"{task_name}\t{function_name}\t{spans}\t{p50:.1f}\t{p95:.1f}\t{maximum:.1f}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,163 @@
+# src/infra/db/migrations.py
+# Migrações versionadas do schema do projeto: na partida, uma única consulta
+# confirma que o schema está atualizado e nenhuma DDL é executada
+#
+# Uso (linha de comando):
+#   python -m src.infra.db.migrations [--schema nome]
+
+import argparse
+import datetime
+import logging
+import sys
+
+from src.infra.db.log_schema import (add_missing_columns, add_months, create_log_indexes, create_log_table,
+                                     ensure_partitions, get_log_table_kind, month_start, partition_name)
+
+
+def _create_log_table(cursor, schema, partitioned):
+    """Cria {schema}.logs; tabelas heap antigas são mantidas (ver log_schema migrate) e ganham os índices"""
+    kind = get_log_table_kind(cursor, schema)
+    if kind is None:
+        create_log_table(cursor, schema, partitioned)
+    elif kind == 'heap':
+        # O índice parcial de spans usa duration_ms, que tabelas antigas ainda não têm
+        add_missing_columns(cursor, schema)
+        create_log_indexes(cursor, schema)
+        if partitioned:
+            logging.warning(f"Table {schema}.logs is not partitioned; run "
+                            f"'python -m src.infra.db.log_schema migrate' to convert it")
+
+
+def _add_span_columns(cursor, schema, partitioned):
+    """Colunas duration_ms/span_id/parent_span_id em tabelas criadas antes dos spans"""
+    add_missing_columns(cursor, schema)
+
+
+def _create_outbox_applied(cursor, schema, partitioned):
+    """Entradas do outbox local já reenviadas (evita duplicar em um novo reenvio)"""
+    cursor.execute(f"""
+        CREATE TABLE IF NOT EXISTS {schema}.outbox_applied (
+            entry_id VARCHAR(36) PRIMARY KEY,
+            applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+
+
+# (versão, descrição, função(cursor, schema, partitioned)); apenas acrescente no final
+MIGRATIONS = (
+    (1, "tabela de logs", _create_log_table),
+    (2, "colunas de span na tabela de logs", _add_span_columns),
+    (3, "controle de reenvio do outbox local", _create_outbox_applied),
+)
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+
+def _check(cursor, schema, partition):
+    """Versão aplicada, relkind de {schema}.logs e existência da partição, em uma ida ao banco"""
+    cursor.execute(f"""
+        SELECT MAX(version),
+               (SELECT relkind FROM pg_class WHERE oid = to_regclass(%s)),
+               to_regclass(%s) IS NOT NULL
+        FROM {schema}.schema_migrations
+    """, (f"{schema}.logs", f"{schema}.{partition}"))
+    version, relkind, has_partition = cursor.fetchone()
+    return version or 0, relkind, has_partition
+
+
+def _lock(cursor, schema):
+    """Advisory lock da transação atual que serializa a DDL do schema entre bots"""
+    cursor.execute("SELECT pg_advisory_xact_lock(hashtext(%s))", (f"{schema}.schema_migrations",))
+
+
+def apply_migrations(cursor, schema, partitioned=True):
+    """Aplica as migrações pendentes na transação atual; retorna a versão final
+
+    Um advisory lock serializa bots que partem ao mesmo tempo: o primeiro
+    aplica, os demais esperam e encontram a versão já atualizada.
+    """
+    _lock(cursor, schema)
+    cursor.execute(f"CREATE SCHEMA IF NOT EXISTS {schema}")
+    cursor.execute(f"""
+        CREATE TABLE IF NOT EXISTS {schema}.schema_migrations (
+            version INTEGER PRIMARY KEY,
+            description TEXT,
+            applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    cursor.execute(f"SELECT COALESCE(MAX(version), 0) FROM {schema}.schema_migrations")
+    version = cursor.fetchone()[0]
+    for number, description, migrate in MIGRATIONS:
+        if number <= version:
+            continue
+        migrate(cursor, schema, partitioned)
+        cursor.execute(f"INSERT INTO {schema}.schema_migrations (version, description) VALUES (%s, %s)",
+                       (number, description))
+        logging.info(f"Applied migration {number} ({description}) to schema {schema}")
+        version = number
+    return version
+
+
+def ensure_schema(connection, schema, partitioned=True, months_ahead=1, today=None):
+    """Garante schema, tabela de logs e partições com o mínimo de DDL
+
+    Partida "quente" (versão em dia e partição de daqui a `months_ahead`
+    meses já criada): uma única consulta de leitura. Caso contrário aplica
+    as migrações pendentes e cria as partições que faltam.
+
+    Returns:
+        int: Versão do schema após a verificação
+    """
+    from psycopg2 import errors
+    
+    partition = partition_name(add_months(month_start(today or datetime.date.today()), months_ahead))
+    cursor = connection.cursor()
+    try:
+        try:
+            version, relkind, has_partition = _check(cursor, schema, partition)
+        except (errors.UndefinedTable, errors.InvalidSchemaName):
+            connection.rollback()
+            version, relkind, has_partition = 0, None, False
+
+        if version >= LATEST_VERSION and (relkind != 'p' or has_partition):
+            connection.commit()  # Encerra a transação de leitura
+            return version
+
+        if version < LATEST_VERSION:
+            version = apply_migrations(cursor, schema, partitioned)  # Já com o advisory lock
+        else:
+            # Só faltam partições: mesma trava das migrações, em uma transação própria, para que
+            # bots que partem juntos na virada do mês não executem a mesma DDL ao mesmo tempo
+            connection.commit()
+            _lock(cursor, schema)
+        if get_log_table_kind(cursor, schema) == 'partitioned':
+            ensure_partitions(cursor, schema, start=today, months_ahead=months_ahead)
+        connection.commit()
+        return version
+    except Exception:
+        connection.rollback()
+        raise
+    finally:
+        cursor.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Aplica as migrações do schema do projeto")
+    parser.add_argument('--schema', help="Schema (padrão: nome do projeto, como no EnhancedLogger)")
+    args = parser.parse_args(argv)
+
+    # Import tardio: db_manager depende do logger, que depende deste módulo
+    from src.infra.db.db_manager import get_db_manager
+    db_manager = get_db_manager()
+    connection = db_manager.get_connection()
+    if not connection:
+        print("Não foi possível conectar ao banco de dados")
+        return 1
+    schema = args.schema or db_manager.settings.PROJECT_INFO['name']
+    version = ensure_schema(connection, schema, partitioned=db_manager.settings.LOG_CONFIG['db_partitioned'])
+    print(f"Schema {schema} na versão {version} (mais recente: {LATEST_VERSION})")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
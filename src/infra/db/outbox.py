@@ -0,0 +1,260 @@
+# src/infra/db/outbox.py
+# Outbox local (SQLite) para logs e escritas enquanto o Postgres está inacessível
+
+import datetime
+import decimal
+import json
+import logging
+import os
+import sqlite3
+import threading
+import uuid
+
+import psycopg2
+from psycopg2.extras import Json, execute_values
+
+from src.utils.log_record import LOG_COLUMNS, LogRecord
+
+LOG = 'log'
+WRITE = 'write'
+
+# Valores que o JSON não preserva são gravados como {"__type__": tipo, "value": ...}
+_TYPE = '__type__'
+_DECODERS = {
+    'tuple': lambda value: tuple(_decode(item) for item in value),
+    'dict': lambda value: {key: _decode(item) for key, item in value.items()},
+    'bytes': bytes.fromhex,
+    'decimal': decimal.Decimal,
+    'datetime': datetime.datetime.fromisoformat,
+    'date': datetime.date.fromisoformat,
+    'time': datetime.time.fromisoformat,
+    'timedelta': lambda value: datetime.timedelta(*value),
+    'uuid': uuid.UUID,
+    'json': Json,
+}
+
+
+def _encode(value):
+    """Converte parâmetros em valores JSON sem perder o tipo (tuple continua tuple para IN %s,
+    datetime continua datetime...); tipos desconhecidos lançam TypeError"""
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, list):
+        return [_encode(item) for item in value]
+    if isinstance(value, tuple):
+        return {_TYPE: 'tuple', 'value': [_encode(item) for item in value]}
+    if isinstance(value, dict):
+        if not all(isinstance(key, str) for key in value):
+            raise TypeError("Parâmetros nomeados do outbox precisam de chaves str")
+        return {_TYPE: 'dict', 'value': {key: _encode(item) for key, item in value.items()}}
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return {_TYPE: 'bytes', 'value': bytes(value).hex()}
+    if isinstance(value, decimal.Decimal):
+        return {_TYPE: 'decimal', 'value': str(value)}
+    # datetime antes de date (subclasse)
+    for kind in (datetime.datetime, datetime.date, datetime.time):
+        if isinstance(value, kind):
+            return {_TYPE: kind.__name__, 'value': value.isoformat()}
+    if isinstance(value, datetime.timedelta):
+        return {_TYPE: 'timedelta', 'value': [value.days, value.seconds, value.microseconds]}
+    if isinstance(value, uuid.UUID):
+        return {_TYPE: 'uuid', 'value': str(value)}
+    if isinstance(value, Json):
+        return {_TYPE: 'json', 'value': value.adapted}
+    raise TypeError(f"Tipo não suportado no outbox: {type(value).__name__}")
+
+
+def _decode(value):
+    """Inverso de _encode; dicts sem marca de tipo (arquivos antigos) voltam como dict"""
+    if isinstance(value, list):
+        return [_decode(item) for item in value]
+    if isinstance(value, dict):
+        if _TYPE not in value:
+            return {key: _decode(item) for key, item in value.items()}
+        return _DECODERS[value[_TYPE]](value['value'])
+    return value
+
+
+class LocalOutbox:
+    """
+    Fila durável em disco para o que não pôde ser gravado no Postgres.
+
+    - `add_log`/`add_logs`: registros de log (LogRecord) do EnhancedLogger
+    - `add_write`: comandos SQL marcados com `execute_query(..., outbox=True)`
+    - `replay`: reenvia em lotes, na ordem de chegada, quando o banco volta
+
+    Cada entrada tem um UUID. No reenvio os UUIDs são registrados em
+    {schema}.outbox_applied na mesma transação que aplica as entradas, então
+    um lote confirmado no Postgres e não removido do SQLite (queda no meio do
+    reenvio) é reconhecido na próxima tentativa e não é aplicado de novo.
+    Comandos que falham no reenvio (erro de SQL) ficam no arquivo com o erro,
+    fora das próximas tentativas.
+
+    O arquivo só é criado na primeira gravação.
+    """
+
+    def __init__(self, path, batch_size=500):
+        self.path = path
+        self.batch_size = max(1, int(batch_size))
+        self._db = None
+        self._lock = threading.Lock()
+        self._replay_lock = threading.Lock()
+
+    def _connect(self):
+        """Abre (e cria, se preciso) o arquivo SQLite; chamado com o lock"""
+        if self._db is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            db = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            db.execute("""
+                CREATE TABLE IF NOT EXISTS outbox (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    entry_id TEXT NOT NULL UNIQUE,
+                    kind TEXT NOT NULL,
+                    statement TEXT,
+                    payload TEXT NOT NULL,
+                    created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+                    error TEXT
+                )
+            """)
+            db.commit()
+            self._db = db
+        return self._db
+
+    def _add(self, entries):
+        """Grava (kind, statement, payload) em uma transação; nunca lança exceção"""
+        try:
+            rows = [(str(uuid.uuid4()), kind, statement, json.dumps(_encode(payload)))
+                    for kind, statement, payload in entries]
+            with self._lock:
+                db = self._connect()
+                with db:
+                    db.executemany(
+                        "INSERT INTO outbox (entry_id, kind, statement, payload) VALUES (?, ?, ?, ?)", rows
+                    )
+            return True
+        except Exception as e:
+            logging.error(f"Failed to write to local outbox {self.path}: {e}")
+            return False
+
+    def add_log(self, record):
+        """Guarda um LogRecord para reenvio a {schema}.logs"""
+        return self._add([(LOG, None, list(record))])
+
+    def add_logs(self, records):
+        if not records:
+            return True
+        return self._add([(LOG, None, list(record)) for record in records])
+
+    def add_write(self, query, params=None):
+        """Guarda um comando SQL e seus parâmetros para reenvio
+
+        Os parâmetros voltam com os mesmos tipos (tuple, bytes, Decimal, date,
+        datetime, UUID, Json...); com um tipo não suportado retorna False.
+        """
+        return self._add([(WRITE, query, params)])
+
+    def pending(self):
+        """Entradas aguardando reenvio (sem contar as que falharam)"""
+        if self._db is None and not os.path.exists(self.path):
+            return 0
+        with self._lock:
+            return self._connect().execute("SELECT COUNT(*) FROM outbox WHERE error IS NULL").fetchone()[0]
+
+    def stats(self):
+        """Contadores do arquivo: pending (aguardando reenvio) e failed (com erro)"""
+        if self._db is None and not os.path.exists(self.path):
+            return {'pending': 0, 'failed': 0}
+        with self._lock:
+            pending, failed = self._connect().execute(
+                "SELECT COUNT(*) - COUNT(error), COUNT(error) FROM outbox"
+            ).fetchone()
+        return {'pending': pending, 'failed': failed}
+
+    def _next_batch(self, size, after_id):
+        with self._lock:
+            return self._connect().execute(
+                "SELECT id, entry_id, kind, statement, payload FROM outbox "
+                "WHERE error IS NULL AND id > ? ORDER BY id LIMIT ?", (after_id, size)
+            ).fetchall()
+
+    def _finish(self, entries, failed):
+        """Remove as entradas reenviadas e marca as que falharam"""
+        with self._lock:
+            db = self._connect()
+            with db:
+                db.executemany("DELETE FROM outbox WHERE id = ?",
+                               [(entry[0],) for entry in entries if entry[0] not in failed])
+                db.executemany("UPDATE outbox SET error = ? WHERE id = ?",
+                               [(error, entry_id) for entry_id, error in failed.items()])
+
+    def replay(self, db_manager, schema, batch_size=None):
+        """Reenvia as entradas pendentes ao Postgres, um lote por transação
+
+        Args:
+            db_manager: DBManager conectado (usa db_manager.transaction())
+            schema (str): Schema com as tabelas logs e outbox_applied
+
+        Returns:
+            dict: applied, duplicates (já aplicadas antes) e failed; None se
+                  outro reenvio já estiver em andamento
+        """
+        if not self._replay_lock.acquire(blocking=False):
+            return None
+        try:
+            totals = {'applied': 0, 'duplicates': 0, 'failed': 0}
+            if not self.pending():
+                return totals
+            last_id = 0
+            while True:
+                entries = self._next_batch(batch_size or self.batch_size, last_id)
+                if not entries:
+                    return totals
+                applied, failed = self._replay_batch(db_manager, schema, entries)
+                self._finish(entries, failed)
+                totals['applied'] += applied - len(failed)
+                totals['duplicates'] += len(entries) - applied
+                totals['failed'] += len(failed)
+                last_id = entries[-1][0]
+        finally:
+            self._replay_lock.release()
+
+    def _replay_batch(self, db_manager, schema, entries):
+        """Aplica um lote em uma transação; retorna (entradas novas, {id: erro})"""
+        failed = {}
+        with db_manager.transaction() as tx:
+            cursor = tx.connection.cursor()
+            try:
+                # Registra os UUIDs; os que já existiam foram aplicados em um reenvio anterior
+                new = {row[0] for row in execute_values(
+                    cursor,
+                    f"INSERT INTO {schema}.outbox_applied (entry_id) VALUES %s "
+                    f"ON CONFLICT (entry_id) DO NOTHING RETURNING entry_id",
+                    [(entry[1],) for entry in entries], page_size=len(entries), fetch=True
+                )}
+                logs = [LogRecord(*_decode(json.loads(entry[4]))) for entry in entries
+                        if entry[2] == LOG and entry[1] in new]
+                if logs:
+                    execute_values(cursor, f"INSERT INTO {schema}.logs ({', '.join(LOG_COLUMNS)}) VALUES %s",
+                                   logs, page_size=len(logs))
+            finally:
+                cursor.close()
+
+            for row_id, entry_id, kind, statement, payload in entries:
+                if kind != WRITE or entry_id not in new:
+                    continue
+                try:
+                    with tx.savepoint():
+                        tx.execute(statement, _decode(json.loads(payload)))
+                except psycopg2.Error as e:
+                    if tx.connection.closed:
+                        raise
+                    failed[row_id] = str(e).strip()
+        return len(new), failed
+
+    def close(self):
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
@@ -0,0 +1,165 @@
+# src/infra/db/query_cache.py
+# Cache em memória (TTL + LRU) para consultas de dados de referência
+
+import collections
+import re
+import threading
+import time
+
+# Tabelas referenciadas após FROM/JOIN/INTO/UPDATE/TRUNCATE (com schema e aspas opcionais)
+_TABLE_RE = re.compile(
+    r'\b(?:from|join|into|update|truncate(?:\s+table)?)\s+(?:only\s+)?'
+    r'((?:"[^"]+"|[\w$]+)(?:\s*\.\s*(?:"[^"]+"|[\w$]+))?)',
+    re.IGNORECASE
+)
+# Lista após FROM até a próxima cláusula, para pegar "FROM a, b"
+_FROM_LIST_RE = re.compile(
+    r'\bfrom\s+(.+?)(?=\b(?:where|join|inner|left|right|full|cross|natural|on|group|order|'
+    r'limit|offset|having|union|except|intersect|select|returning|window|for)\b|[()]|;|$)',
+    re.IGNORECASE | re.DOTALL
+)
+_NAME_RE = re.compile(r'^(?:only\s+)?((?:"[^"]+"|[\w$]+)(?:\s*\.\s*(?:"[^"]+"|[\w$]+))?)', re.IGNORECASE)
+# Literais ('...', E'...', $tag$...$tag$) e identificadores entre aspas são mantidos; o resto dos espaços colapsa
+_SQL_SPACING_RE = re.compile(
+    r"(?P<quoted>\b[eE]'(?:[^'\\]|\\.|'')*'|'(?:[^']|'')*'|\"(?:[^\"]|\"\")*\""
+    r"|\$(?P<tag>(?:[A-Za-z_]\w*)?)\$.*?\$(?P=tag)\$)|\s+",
+    re.DOTALL
+)
+
+
+def normalize_sql(query):
+    """Colapsa espaços fora de literais e remove o ';' final para que variações de formatação
+    compartilhem a chave"""
+    normalized = _SQL_SPACING_RE.sub(lambda match: match.group('quoted') or ' ', query)
+    return normalized.strip().rstrip(';').rstrip()
+
+
+def extract_tables(query):
+    """Nomes (sem schema, em minúsculas) das tabelas citadas na query"""
+    names = [match.group(1) for match in _TABLE_RE.finditer(query)]
+    for match in _FROM_LIST_RE.finditer(query):
+        for part in match.group(1).split(',')[1:]:
+            name = _NAME_RE.match(part.strip())
+            if name:
+                names.append(name.group(1))
+    return {name.split('.')[-1].strip().strip('"').lower() for name in names}
+
+
+def _freeze(value):
+    """Converte parâmetros em valores hasheáveis para compor a chave"""
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    if isinstance(value, dict):
+        return tuple(sorted((key, _freeze(item)) for key, item in value.items()))
+    if isinstance(value, (set, frozenset)):
+        return frozenset(_freeze(item) for item in value)
+    return value
+
+
+class _Entry:
+    __slots__ = ('value', 'expires_at', 'tables')
+
+    def __init__(self, value, expires_at, tables):
+        self.value = value
+        self.expires_at = expires_at
+        self.tables = tables
+
+
+class QueryCache:
+    """
+    Cache de resultados por SQL normalizado + parâmetros.
+
+    - TTL por entrada (default_ttl se não informado)
+    - No máximo `max_entries` entradas; a menos usada recentemente é descartada
+    - `invalidate(table)` remove as entradas que leem a tabela (nome sem
+      schema; em caso de dúvida invalida a mais, nunca a menos)
+
+    O cache é por processo; escritas feitas por outros processos ou
+    diretamente no banco só são vistas após o TTL expirar.
+    """
+
+    def __init__(self, max_entries=1000, default_ttl=300.0):
+        self.max_entries = max(1, int(max_entries))
+        self.default_ttl = float(default_ttl)
+        self._entries = collections.OrderedDict()
+        self._by_table = collections.defaultdict(set)
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'expired': 0, 'invalidations': 0}
+
+    @staticmethod
+    def make_key(query, params=None):
+        return normalize_sql(query), _freeze(params)
+
+    def get(self, key):
+        """Retorna (True, valor) se houver entrada válida, senão (False, None)"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._stats['misses'] += 1
+                return False, None
+            if entry.expires_at <= now:
+                self._remove(key)
+                self._stats['expired'] += 1
+                self._stats['misses'] += 1
+                return False, None
+            self._entries.move_to_end(key)
+            self._stats['hits'] += 1
+            return True, entry.value
+
+    def set(self, key, value, ttl=None, tables=None):
+        """Armazena um resultado; `tables` padrão são as tabelas extraídas do SQL da chave"""
+        ttl = self.default_ttl if ttl is None else float(ttl)
+        if ttl <= 0:
+            return
+        tables = frozenset(extract_tables(key[0]) if tables is None else tables)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = _Entry(value, time.monotonic() + ttl, tables)
+            for table in tables:
+                self._by_table[table].add(key)
+            while len(self._entries) > self.max_entries:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self._stats['evictions'] += 1
+
+    def _remove(self, key):
+        entry = self._entries.pop(key)
+        for table in entry.tables:
+            keys = self._by_table.get(table)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._by_table[table]
+
+    def invalidate(self, table=None):
+        """Remove as entradas que leem `table` (com ou sem schema) ou todas se None
+
+        Returns:
+            int: Quantidade de entradas removidas
+        """
+        with self._lock:
+            if table is None:
+                removed = len(self._entries)
+                self._entries.clear()
+                self._by_table.clear()
+            else:
+                name = table.split('.')[-1].strip().strip('"').lower()
+                keys = list(self._by_table.get(name, ()))
+                for key in keys:
+                    self._remove(key)
+                removed = len(keys)
+            self._stats['invalidations'] += removed
+            return removed
+
+    def invalidate_query(self, query):
+        """Invalida as tabelas escritas/lidas por um comando SQL"""
+        return sum(self.invalidate(table) for table in extract_tables(query))
+
+    def stats(self):
+        """Retorna os contadores (hits, misses, evictions, expired, invalidations, size)"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats['size'] = len(self._entries)
+        return stats
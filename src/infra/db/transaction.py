@@ -0,0 +1,105 @@
+# src/infra/db/transaction.py
+# Unidade de trabalho: agrupa vários comandos em um único commit
+
+import contextlib
+import contextvars
+
+from src.infra.db.query_cache import extract_tables
+
+# Transação aberta no contexto atual (thread/tarefa); usada pelo execute_query
+_CURRENT_TRANSACTION = contextvars.ContextVar('db_transaction', default=None)
+
+
+def current_transaction():
+    """Transação aberta no contexto atual ou None"""
+    return _CURRENT_TRANSACTION.get()
+
+
+class Transaction:
+    """
+    Comandos executados em uma única conexão e confirmados juntos.
+
+    Criada por `DBManager.transaction()`; não instancie diretamente.
+
+    - `execute`/`fetchall`/`fetchone`: executam sem commit próprio
+    - `savepoint()`: isola uma parte; em caso de erro só ela é desfeita
+    - `commit_every=N`: confirma a cada N comandos (cargas longas), fora de savepoints
+    """
+
+    def __init__(self, connection, commit_every=None, on_commit=None):
+        self.connection = connection
+        self.commit_every = commit_every if commit_every and commit_every > 0 else None
+        self.statements = 0
+        self.commits = 0
+        self.rolled_back_savepoints = 0
+        self._pending = 0
+        self._savepoints = 0
+        self._tables = set()
+        self._on_commit = on_commit
+
+    def _run(self, query, params, fetch=None):
+        cursor = self.connection.cursor()
+        try:
+            cursor.execute(query, params)
+            result = cursor.rowcount if fetch is None else fetch(cursor)
+        finally:
+            cursor.close()
+        self.statements += 1
+        self._pending += 1
+        self._tables.update(extract_tables(query))
+        if self.commit_every and self._pending >= self.commit_every and not self._savepoints:
+            self.commit()
+        return result
+
+    def execute(self, query, params=None):
+        """Executa um comando; retorna a quantidade de linhas afetadas"""
+        return self._run(query, params)
+
+    def fetchall(self, query, params=None):
+        """Executa uma leitura na transação (vê as escritas ainda não confirmadas)"""
+        return self._run(query, params, lambda cursor: cursor.fetchall())
+
+    def fetchone(self, query, params=None):
+        return self._run(query, params, lambda cursor: cursor.fetchone())
+
+    @contextlib.contextmanager
+    def savepoint(self):
+        """Isola um trecho: `with tx.savepoint(): ...`
+
+        Em caso de exceção desfaz apenas o trecho e relança; capture a exceção
+        para seguir com os demais itens na mesma transação.
+        """
+        self._savepoints += 1
+        name = f"sp_{self._savepoints}"
+        cursor = self.connection.cursor()
+        try:
+            cursor.execute(f"SAVEPOINT {name}")
+            try:
+                yield self
+            except BaseException:
+                cursor.execute(f"ROLLBACK TO SAVEPOINT {name}")
+                self.rolled_back_savepoints += 1
+                raise
+            cursor.execute(f"RELEASE SAVEPOINT {name}")
+        finally:
+            cursor.close()
+            self._savepoints -= 1
+
+    def commit(self):
+        """Confirma o que foi executado até aqui; a transação continua aberta"""
+        self.connection.commit()
+        self.commits += 1
+        self._pending = 0
+        tables, self._tables = self._tables, set()
+        if self._on_commit and tables:
+            self._on_commit(tables)
+
+    def rollback(self):
+        """Desfaz o que não foi confirmado"""
+        self.connection.rollback()
+        self._pending = 0
+        self._tables = set()
+
+    def stats(self):
+        return {'statements': self.statements, 'commits': self.commits,
+                'rolled_back_savepoints': self.rolled_back_savepoints}
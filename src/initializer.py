@@ -5,77 +5,141 @@
 from src.utils.environment_loader import environment
 
 # Depois importa os outros módulos que dependem das variáveis de ambiente
-from src.config.settings import Settings
+from src.config.settings import get_settings
 from src.utils.logger import EnhancedLogger, ProcessType, LogStatus
-from src.infra.db.db_manager import get_db_manager
+from src.infra.db.db_manager import DBManager, get_db_manager
+from src.utils.startup_timer import StartupTimer
 import atexit
+import concurrent.futures
+import os
 
 # Variáveis globais
-settings = Settings()
+settings = get_settings()
 logger = None
 db_manager = None
+db_ready = None  # Future com o resultado da conexão com o banco (True/False)
+startup_timer = None  # Tempos por fase da última inicialização
+_owner_pid = None  # Processo que inicializou as instâncias acima
 
 def cleanup_app():
     """Limpa recursos ao encerrar a aplicação"""
     global logger, db_manager
     
+    # Conexão ainda em andamento: espera para gravar os registros retidos
+    if db_ready is not None and not db_ready.done():
+        wait_for_db(settings.SETTINGS['timeout_seconds'])
+    
+    if logger:
+        logger.log_info("cleanup_app", "Finalizando aplicação...", process_type=ProcessType.SYSTEM)
+    
+    # Garante que registros ainda na fila do sink sejam gravados
     if logger:
-        logger.log_info("cleanup_app", "Finalizando aplicação...", ProcessType.SYSTEM)
+        logger.flush()
     
     # Fecha conexão com banco de dados
     if db_manager:
         db_manager.close()
     
     if logger:
-        logger.log_info("cleanup_app", "Aplicação finalizada com sucesso", ProcessType.SYSTEM)
+        logger.log_info("cleanup_app", "Aplicação finalizada com sucesso", process_type=ProcessType.SYSTEM)
+    
+    # Encerra o processo escritor de logs (modo multiprocesso)
+    if db_manager:
+        db_manager.shutdown_logging()
+
+def _db_connection_finished(connected):
+    """Registra o resultado da conexão com o banco e o tempo de cada fase"""
+    if connected:
+        logger.log_success("initialize_app", "Conexão com banco de dados estabelecida",
+                           process_type=ProcessType.SYSTEM)
+    else:
+        logger.log_warning("initialize_app", "Executando sem conexão com banco de dados",
+                           process_type=ProcessType.SYSTEM)
+        if db_manager.outbox:
+            logger.log_info("initialize_app", "Logs do banco guardados em %s até a conexão voltar",
+                            db_manager.outbox.path, process_type=ProcessType.SYSTEM)
+    # Sem conexão os registros retidos vão para o outbox (com conexão já foram gravados)
+    logger.release_db_records()
+    logger.log_info("initialize_app", "Banco de dados: %s", startup_timer.format("db_"),
+                    process_type=ProcessType.SYSTEM)
 
-def initialize_app():
+def wait_for_db(timeout=None):
+    """Aguarda a conexão iniciada em background; retorna True se o banco está conectado"""
+    if db_ready is None:
+        return False
+    try:
+        return bool(db_ready.result(timeout))
+    except Exception:
+        return False
+
+def initialize_app(background_db=None):
     """
     Inicializa todos os componentes da aplicação:
     - Configura o logger
-    - Conecta ao banco de dados
+    - Conecta ao banco de dados (em background por padrão)
     - Registra função de limpeza ao encerrar
     
+    Com a conexão em background o bot começa sem esperar o banco: os logs do
+    destino banco ficam retidos até a conexão (ou vão para o outbox se ela
+    falhar) e consultas feitas antes disso aguardam a conexão em andamento.
+    Os tempos de cada fase são registrados no log ao final.
+    
+    Args:
+        background_db (bool, optional): Padrão SETTINGS['db_connect_background']
+    
     Returns:
         tuple: (logger, db_manager)
     """
-    global logger, db_manager
+    global logger, db_manager, db_ready, startup_timer, _owner_pid
     
     # Se já inicializado, retorna as instâncias existentes
     if logger is not None and db_manager is not None:
-        return logger, db_manager
+        if _owner_pid == os.getpid():
+            return logger, db_manager
+        
+        # Processo filho criado via fork: as instâncias herdadas pertencem ao pai
+        DBManager.reset_after_fork()
+        logger = db_manager = None
+    
+    _owner_pid = os.getpid()
+    startup_timer = StartupTimer()
     
     # Inicializa o DB Manager
-    db_manager = get_db_manager()
+    with startup_timer.phase("manager"):
+        db_manager = get_db_manager()
     
-    # Inicializa o logger
-    logger = db_manager.initialize_logging()
+    # Inicializa o logger (arquivo, cabeçalho e sampler de métricas)
+    with startup_timer.phase("logger"):
+        logger = db_manager.initialize_logging()
     
     # Ajusta modo de debug conforme configurações
     logger.debug_mode = settings.SETTINGS['debug_mode']
     
     # Log inicial
-    logger.log_info("initialize_app", f"Inicializando aplicação no ambiente: {environment}", ProcessType.SYSTEM)
-    
-    # Conecta ao banco de dados
-    db_connected = db_manager.connect()
-    
-    if db_connected:
-        logger.log_success("initialize_app", "Conexão com banco de dados estabelecida", ProcessType.SYSTEM)
-        # Conecta o logger ao banco de dados
-        connection = db_manager.get_connection()
-        if connection:
-            logger.connect_to_db(connection)
-            logger.log_success("initialize_app", "Logger conectado ao banco de dados", ProcessType.SYSTEM)
+    logger.log_info("initialize_app", f"Inicializando aplicação no ambiente: {environment}",
+                    process_type=ProcessType.SYSTEM)
+    
+    # Conecta ao banco de dados (conexão, verificação do schema e tabela de logs);
+    # connect() também associa o logger à conexão
+    if background_db is None:
+        background_db = settings.SETTINGS['db_connect_background']
+    if background_db and settings.DB_CONFIG['enabled']:
+        logger.hold_db_records()
+        db_ready = db_manager.connect_in_background(startup_timer, on_done=_db_connection_finished)
     else:
-        logger.log_warning("initialize_app", "Executando sem conexão com banco de dados", ProcessType.SYSTEM)
+        connected = db_manager.connect(startup_timer)
+        db_ready = concurrent.futures.Future()
+        db_ready.set_result(connected)
+        _db_connection_finished(connected)
     
     # Registra função de limpeza
     atexit.register(cleanup_app)
     
-    logger.log_success("initialize_app", "Aplicação inicializada com sucesso", ProcessType.SYSTEM)
+    # Fases do banco são registradas à parte, ao fim da conexão (ver _db_connection_finished)
+    logger.log_success("initialize_app", "Aplicação inicializada com sucesso: %s",
+                       startup_timer.format(exclude="db_"), process_type=ProcessType.SYSTEM)
     
     return logger, db_manager
 
 # Exporta variáveis importantes
-__all__ = ['initialize_app', 'logger', 'db_manager', 'settings', 'environment']
\ No newline at end of file
+__all__ = ['initialize_app', 'wait_for_db', 'logger', 'db_manager', 'db_ready', 'settings', 'environment']
\ No newline at end of file
@@ -0,0 +1,141 @@
+# src/modules/checkpoint.py
+# Checkpoints do workflow: saídas das etapas concluídas e manifesto da execução em disco
+
+import datetime
+import hashlib
+import json
+import logging
+import os
+import pickle
+import re
+import shutil
+import threading
+
+MANIFEST = 'manifest.json'
+
+
+class CheckpointStore:
+    """
+    Artefatos das etapas concluídas de uma execução (run_id) do workflow.
+
+    Cada etapa concluída grava sua saída (pickle) em {directory}/{run_id}/ e
+    é registrada no manifest.json com o arquivo, a duração e as dependências.
+    Arquivos são gravados em um temporário e renomeados, então uma queda no
+    meio da gravação não deixa um artefato incompleto marcado como concluído.
+    """
+
+    def __init__(self, directory, run_id):
+        run_id = str(run_id)
+        if not re.fullmatch(r'[\w.-]+', run_id) or run_id in ('.', '..'):
+            raise ValueError(f"run_id inválido para checkpoint: {run_id!r} (use letras, números, '.', '-' e '_')")
+        self.run_id = run_id
+        self.path = os.path.join(directory, run_id)
+        self._lock = threading.Lock()
+        self._manifest = self._read_manifest()
+
+    def _new_manifest(self):
+        return {'run_id': self.run_id, 'status': 'created',
+                'created_at': datetime.datetime.now().isoformat(timespec='seconds'), 'steps': {}}
+
+    def _read_manifest(self):
+        try:
+            with open(os.path.join(self.path, MANIFEST), encoding='utf-8') as f:
+                manifest = json.load(f)
+            if isinstance(manifest, dict) and isinstance(manifest.get('steps'), dict):
+                return manifest
+            logging.error(f"Invalid checkpoint manifest in {self.path}; starting over")
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError) as e:
+            logging.error(f"Failed to read checkpoint manifest in {self.path}: {e}; starting over")
+        return self._new_manifest()
+
+    def _write(self, filename, data):
+        """Grava bytes em {path}/{filename} de forma atômica (temporário + rename)"""
+        os.makedirs(self.path, exist_ok=True)
+        target = os.path.join(self.path, filename)
+        temporary = f"{target}.tmp"
+        with open(temporary, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temporary, target)
+
+    def _write_manifest(self):
+        """Grava o manifesto; chamado com o lock"""
+        self._manifest['updated_at'] = datetime.datetime.now().isoformat(timespec='seconds')
+        self._write(MANIFEST, json.dumps(self._manifest, indent=2, ensure_ascii=False).encode('utf-8'))
+
+    @staticmethod
+    def _artifact_name(step_name):
+        """Nome de arquivo seguro e sem colisões para a saída de uma etapa"""
+        safe = re.sub(r'[^\w.-]', '_', step_name)[:60]
+        return f"{safe}-{hashlib.sha1(step_name.encode('utf-8')).hexdigest()[:8]}.pkl"
+
+    @property
+    def status(self):
+        return self._manifest.get('status')
+
+    def set_status(self, status):
+        """Situação da execução no manifesto (running, completed, failed)"""
+        with self._lock:
+            self._manifest['status'] = status
+            self._write_manifest()
+
+    def completed(self):
+        """{etapa: entrada do manifesto} das etapas concluídas"""
+        with self._lock:
+            return {name: dict(entry) for name, entry in self._manifest['steps'].items()}
+
+    def is_complete(self, name, depends_on=None):
+        """Etapa concluída com artefato presente (e, se informadas, as mesmas dependências)"""
+        with self._lock:
+            entry = self._manifest['steps'].get(name)
+        if entry is None:
+            return False
+        if depends_on is not None and entry.get('depends_on') != list(depends_on):
+            return False
+        return os.path.exists(os.path.join(self.path, entry['artifact']))
+
+    def load(self, name):
+        """Saída gravada de uma etapa concluída"""
+        with self._lock:
+            artifact = self._manifest['steps'][name]['artifact']
+        with open(os.path.join(self.path, artifact), 'rb') as f:
+            return pickle.load(f)
+
+    def save(self, name, output, depends_on=(), duration_ms=None):
+        """Grava a saída de uma etapa e a marca como concluída no manifesto"""
+        artifact = self._artifact_name(name)
+        self._write(artifact, pickle.dumps(output, protocol=pickle.HIGHEST_PROTOCOL))
+        with self._lock:
+            self._manifest['steps'][name] = {
+                'artifact': artifact,
+                'depends_on': list(depends_on),
+                'duration_ms': round(duration_ms, 3) if duration_ms is not None else None,
+                'completed_at': datetime.datetime.now().isoformat(timespec='seconds')
+            }
+            self._write_manifest()
+
+    def invalidate(self, names):
+        """Remove as etapas do manifesto e apaga seus artefatos; retorna as que estavam concluídas"""
+        removed = []
+        with self._lock:
+            for name in names:
+                entry = self._manifest['steps'].pop(name, None)
+                if entry is None:
+                    continue
+                removed.append(name)
+                try:
+                    os.remove(os.path.join(self.path, entry['artifact']))
+                except FileNotFoundError:
+                    pass
+            if removed:
+                self._write_manifest()
+        return removed
+
+    def clear(self):
+        """Apaga todos os checkpoints desta execução"""
+        with self._lock:
+            shutil.rmtree(self.path, ignore_errors=True)
+            self._manifest = self._new_manifest()
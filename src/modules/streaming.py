@@ -0,0 +1,287 @@
+# src/modules/streaming.py
+# Modo streaming do workflow: blocos de dados passam por extração → transformação → carga
+# sem que o conjunto inteiro fique em memória entre as etapas
+
+import contextvars
+import itertools
+import queue
+import threading
+import time
+
+from src.config.settings import get_settings
+
+# Marca de fim de fluxo entre as etapas
+_END = object()
+# Intervalo (s) em que put/get bloqueados conferem se o pipeline foi interrompido
+_POLL_INTERVAL = 0.1
+
+
+def chunked(iterable, size):
+    """Agrupa um iterável (ex.: linhas de db_manager.stream_query) em listas de até `size` itens"""
+    iterator = iter(iterable)
+    while True:
+        chunk = list(itertools.islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+class StageStats:
+    """Contadores de uma etapa: blocos, itens e onde o tempo foi gasto"""
+
+    def __init__(self, name, workers=1):
+        self.name = name
+        self.workers = workers
+        self.chunks = 0
+        self.items = 0
+        self.busy = 0.0          # Segundos processando (soma dos workers)
+        self.wait_input = 0.0    # Segundos esperando bloco da etapa anterior
+        self.wait_output = 0.0   # Segundos bloqueado com a fila da próxima etapa cheia
+        self._lock = threading.Lock()
+
+    def add(self, chunk, busy=0.0, wait_input=0.0, wait_output=0.0):
+        with self._lock:
+            if chunk is not None:
+                self.chunks += 1
+                self.items += len(chunk) if hasattr(chunk, '__len__') else 1
+            self.busy += busy
+            self.wait_input += wait_input
+            self.wait_output += wait_output
+
+    def as_dict(self, elapsed):
+        with self._lock:
+            capacity = elapsed * self.workers
+            return {
+                'chunks': self.chunks,
+                'items': self.items,
+                'busy_ms': round(self.busy * 1000, 3),
+                'wait_input_ms': round(self.wait_input * 1000, 3),
+                'wait_output_ms': round(self.wait_output * 1000, 3),
+                # Vazão enquanto processa (itens por segundo de trabalho de um worker)
+                'items_per_second': round(self.items / self.busy, 1) if self.busy else None,
+                # Fração do tempo total em que os workers da etapa estiveram ocupados
+                'utilization': round(self.busy / capacity, 3) if capacity else 0.0
+            }
+
+
+class StreamingPipeline:
+    """
+    Processa uma fonte de blocos por uma sequência de etapas, um bloco por vez.
+
+    - `source`: iterável de blocos (ex.: db_manager.stream_dataframes(...) ou
+      chunked(linhas, 1000))
+    - `add_stage(nome, funcao, workers=1)`: recebe um bloco e devolve o bloco
+      para a próxima etapa (None descarta); o retorno da última é ignorado
+
+    Com queue_size > 0 cada etapa roda em suas próprias threads, ligadas por
+    filas de até queue_size blocos: quando uma etapa é mais lenta, a fila
+    enche e as anteriores esperam (backpressure), então no máximo
+    queue_size + workers blocos ficam em memória por etapa. A fonte é lida na
+    thread que chamou run(). Com queue_size=0 as etapas são encadeadas como
+    geradores na thread atual, um bloco por vez, sem paralelismo.
+
+    Os contadores por etapa (stats()) mostram o gargalo: a etapa com maior
+    utilização; as demais passam o tempo em wait_input (sem trabalho) ou
+    wait_output (fila seguinte cheia).
+    """
+
+    def __init__(self, source, source_name='extract', queue_size=None, logger=None):
+        if queue_size is None:
+            queue_size = get_settings().WORKFLOW_CONFIG['stream_queue_size']
+        self.source = source
+        self.source_name = source_name
+        self.queue_size = max(0, int(queue_size))
+        self.logger = logger
+        self.elapsed = 0.0
+        self._stages = []
+        self._stats = {source_name: StageStats(source_name)}
+        self._stop = threading.Event()
+        self._error = None
+        self._error_lock = threading.Lock()
+
+    def add_stage(self, name, func, workers=1):
+        if name in self._stats:
+            raise ValueError(f"Etapa de streaming duplicada: {name}")
+        workers = max(1, int(workers))
+        self._stages.append((name, func, workers))
+        self._stats[name] = StageStats(name, workers)
+        return self
+
+    def _fail(self, name, error):
+        with self._error_lock:
+            if self._error is None:
+                self._error = (name, error)
+        self._stop.set()
+
+    def _put(self, target, item, stats):
+        """Coloca na fila respeitando o limite; False se o pipeline foi interrompido"""
+        start = time.perf_counter()
+        try:
+            while True:
+                try:
+                    target.put(item, timeout=_POLL_INTERVAL)
+                    return True
+                except queue.Full:
+                    if self._stop.is_set():
+                        return False
+        finally:
+            stats.add(None, wait_output=time.perf_counter() - start)
+
+    def _get(self, source, stats):
+        """Próximo bloco da fila; _END no fim do fluxo ou se o pipeline foi interrompido"""
+        start = time.perf_counter()
+        try:
+            while True:
+                try:
+                    return source.get(timeout=_POLL_INTERVAL)
+                except queue.Empty:
+                    if self._stop.is_set():
+                        return _END
+        finally:
+            stats.add(None, wait_input=time.perf_counter() - start)
+
+    def _source_chunks(self):
+        """Itera a fonte contando o tempo de leitura de cada bloco"""
+        stats = self._stats[self.source_name]
+        iterator = iter(self.source)
+        try:
+            while not self._stop.is_set():
+                start = time.perf_counter()
+                try:
+                    chunk = next(iterator)
+                except StopIteration:
+                    return
+                except Exception as e:
+                    self._fail(self.source_name, e)
+                    return
+                stats.add(chunk, busy=time.perf_counter() - start)
+                yield chunk
+        finally:
+            # Encerra geradores da fonte (ex.: devolve a conexão de um stream_query interrompido)
+            close = getattr(iterator, 'close', None)
+            if close is not None:
+                close()
+
+    def _call(self, name, func, chunk):
+        """Executa uma etapa sobre um bloco; (ok, resultado)"""
+        start = time.perf_counter()
+        try:
+            result = func(chunk)
+        except Exception as e:
+            self._fail(name, e)
+            return False, None
+        finally:
+            self._stats[name].add(chunk, busy=time.perf_counter() - start)
+        return True, result
+
+    def _run_inline(self):
+        chunks = self._source_chunks()
+        try:
+            for chunk in chunks:
+                for name, func, _ in self._stages:
+                    ok, chunk = self._call(name, func, chunk)
+                    if not ok:
+                        return
+                    if chunk is None:
+                        break
+        finally:
+            chunks.close()
+
+    def _run_threaded(self):
+        queues = [queue.Queue(maxsize=self.queue_size) for _ in self._stages]
+        remaining = [workers for _, _, workers in self._stages]
+        remaining_lock = threading.Lock()
+        threads = []
+
+        def worker(index):
+            name, func, _ = self._stages[index]
+            stats = self._stats[name]
+            is_last = index == len(self._stages) - 1
+            while True:
+                chunk = self._get(queues[index], stats)
+                if chunk is _END or self._stop.is_set():
+                    break
+                ok, result = self._call(name, func, chunk)
+                if not ok:
+                    break
+                if not is_last and result is not None and not self._put(queues[index + 1], result, stats):
+                    break
+            with remaining_lock:
+                remaining[index] -= 1
+                finished = remaining[index] == 0
+            # O último worker a terminar avisa os workers da etapa seguinte
+            if finished and not is_last:
+                for _ in range(self._stages[index + 1][2]):
+                    self._put(queues[index + 1], _END, stats)
+
+        for index, (name, _, workers) in enumerate(self._stages):
+            for number in range(workers):
+                # Cada thread herda o contexto atual (span ativo, por exemplo)
+                thread = threading.Thread(target=contextvars.copy_context().run, args=(worker, index),
+                                          name=f"stream-{name}-{number}", daemon=True)
+                thread.start()
+                threads.append(thread)
+
+        source_stats = self._stats[self.source_name]
+        chunks = self._source_chunks()
+        try:
+            for chunk in chunks:
+                if not self._put(queues[0], chunk, source_stats):
+                    break
+        except BaseException:
+            self._stop.set()  # Ex.: KeyboardInterrupt; os workers param no próximo bloco
+            raise
+        finally:
+            chunks.close()
+            for _ in range(self._stages[0][2]):
+                self._put(queues[0], _END, source_stats)
+            for thread in threads:
+                thread.join()
+
+    def run(self):
+        """Processa a fonte inteira; retorna stats()
+
+        Raises:
+            WorkflowError: Uma etapa (ou a fonte) lançou exceção; as demais são interrompidas
+        """
+        from src.modules.workflow import WorkflowError
+
+        if not self._stages:
+            raise ValueError("Pipeline de streaming sem etapas")
+        self._stop.clear()
+        self._error = None
+        for name, stats in self._stats.items():
+            self._stats[name] = StageStats(name, stats.workers)
+        start = time.perf_counter()
+        try:
+            if self.queue_size:
+                self._run_threaded()
+            else:
+                self._run_inline()
+        finally:
+            self.elapsed = time.perf_counter() - start
+        if self.logger:
+            self.logger.log_info('workflow', f"Streaming: {self.format_stats()}")
+        if self._error is not None:
+            name, error = self._error
+            raise WorkflowError(name, error) from error
+        return self.stats()
+
+    def stats(self):
+        """{etapa: contadores} na ordem do fluxo (ver StageStats.as_dict)"""
+        return {name: stats.as_dict(self.elapsed) for name, stats in self._stats.items()}
+
+    def bottleneck(self):
+        """Etapa com maior utilização (a que limita a vazão do pipeline)"""
+        stats = self.stats()
+        name = max(stats, key=lambda name: stats[name]['utilization'])
+        return name if stats[name]['utilization'] else None
+
+    def format_stats(self):
+        """Resumo de uma linha: 'etapa N itens, X itens/s, Y% ocupada | ... | gargalo: etapa'"""
+        parts = []
+        for name, stats in self.stats().items():
+            rate = f"{stats['items_per_second']:.0f} itens/s" if stats['items_per_second'] else "- itens/s"
+            parts.append(f"{name} {stats['items']} itens, {rate}, {stats['utilization']:.0%} ocupada")
+        parts.append(f"gargalo: {self.bottleneck()}")
+        return " | ".join(parts)
@@ -1,27 +1,363 @@
-# Module containing workflow steps
+# src/modules/workflow.py
+# Motor de workflow: etapas com dependências declaradas, executadas uma vez em ordem topológica
+
+import collections
+import concurrent.futures
+import contextlib
+import contextvars
+import logging
+import pickle
+import time
+
+from src.config.settings import get_settings
+from src.modules.checkpoint import CheckpointStore
+from src.modules.streaming import StreamingPipeline
+
+EXECUTORS = ('thread', 'process')
+
+WorkflowStep = collections.namedtuple('WorkflowStep', ['name', 'func', 'depends_on'])
+
+
+def step(name=None, depends_on=()):
+    """Declara um método de Workflow como etapa: `@step("transformar", depends_on=["extrair"])`
+
+    A etapa recebe as saídas das dependências como argumentos posicionais, na
+    ordem de depends_on. Subclasses que sobrescrevem o método (sem repetir o
+    decorator) mantêm o nome e as dependências da etapa.
+    """
+    def decorator(func):
+        func._workflow_step = (name or func.__name__, tuple(depends_on))
+        return func
+    return decorator
+
+
+class WorkflowError(RuntimeError):
+    """Falha de uma etapa; `step` é o nome da etapa e __cause__ a exceção original"""
+
+    def __init__(self, step_name, error):
+        super().__init__(f"Etapa '{step_name}' falhou: {error}")
+        self.step = step_name
+
 
 class Workflow:
-    def __init__(self):
+    """
+    Executa etapas registradas com dependências, cada uma exatamente uma vez.
+
+    - Etapas declaradas com `@step` nos métodos (inclusive de subclasses) ou
+      registradas com `add_step(nome, funcao, depends_on=[...])`
+    - A ordem é topológica; etapas sem dependência pendente entre si (ex.:
+      extrações de sistemas diferentes) rodam em paralelo em até max_workers
+      threads (executor='thread') ou processos (executor='process')
+    - Com executor='process' as funções, argumentos e saídas precisam ser
+      serializáveis (pickle): funções de módulo ou métodos do workflow (que
+      vão para o processo filho sem logger e sem checkpoints; spans e
+      checkpoints continuam no processo principal); run() falha antes de
+      iniciar se alguma etapa não puder ser enviada
+    - Com `logger`, cada etapa roda em um `logger.span` (duração em duration_ms)
+    - Com `run_id`, a saída de cada etapa concluída é gravada como checkpoint
+      (CheckpointStore); executar de novo com o mesmo run_id pula as etapas
+      concluídas e recarrega suas saídas. Uma etapa só é reaproveitada se
+      todas as suas dependências também foram; `invalidate(etapa)` força a
+      reexecução dela e das que dependem dela
+
+    Na primeira falha nenhuma etapa nova é iniciada; as que já estavam em
+    andamento terminam e a falha é relançada como WorkflowError.
+    """
+
+    def __init__(self, max_workers=None, executor=None, logger=None, run_id=None, checkpoint_dir=None):
+        config = get_settings().WORKFLOW_CONFIG
+        self.max_workers = max(1, int(max_workers if max_workers is not None else config['max_workers']))
+        self.executor = (executor or config['executor']).lower()
+        if self.executor not in EXECUTORS:
+            raise ValueError(f"Executor de workflow inválido: {self.executor} (use {' ou '.join(EXECUTORS)})")
+        self.logger = logger
         self.status = 'initialized'
-        
+        self.durations = {}
+        self.restored = []
+        run_id = run_id or config['run_id']
+        self.run_id = run_id or None
+        self.checkpoints = CheckpointStore(checkpoint_dir or config['checkpoint_dir'], run_id) if run_id else None
+        self._steps = {}
+        self._register_declared_steps()
+
+    def __getstate__(self):
+        """Cópia enviada ao processo filho quando a etapa é um método (executor='process')"""
+        state = self.__dict__.copy()
+        # Logger e checkpoints têm locks e arquivos abertos e só são usados no processo principal
+        state['logger'] = None
+        state['checkpoints'] = None
+        return state
+
+    def _register_declared_steps(self):
+        """Registra os métodos marcados com @step, das classes base para as derivadas"""
+        declared = {}
+        for klass in reversed(type(self).__mro__):
+            for attr, value in vars(klass).items():
+                spec = getattr(value, '_workflow_step', None)
+                if spec is not None:
+                    declared[attr] = spec
+        for attr, (name, depends_on) in declared.items():
+            self.add_step(name, getattr(self, attr), depends_on)
+
+    def add_step(self, name, func, depends_on=()):
+        """Registra (ou substitui) uma etapa; `func` recebe as saídas de depends_on, em ordem"""
+        if isinstance(depends_on, str):
+            depends_on = (depends_on,)
+        self._steps[name] = WorkflowStep(name, func, tuple(depends_on))
+        return self
+
+    def remove_step(self, name):
+        self._steps.pop(name, None)
+        return self
+
+    @property
+    def steps(self):
+        return dict(self._steps)
+
+    def topological_order(self):
+        """Nomes das etapas em ordem de execução (desempate pela ordem de registro)
+
+        Raises:
+            ValueError: Dependência não registrada ou ciclo entre etapas
+        """
+        remaining = {}
+        for name, item in self._steps.items():
+            for dependency in item.depends_on:
+                if dependency not in self._steps:
+                    raise ValueError(f"Etapa '{name}' depende de '{dependency}', que não está registrada")
+            remaining[name] = set(item.depends_on)
+
+        order = []
+        while remaining:
+            ready = [name for name, dependencies in remaining.items() if not dependencies]
+            if not ready:
+                raise ValueError(f"Ciclo entre as etapas do workflow: {', '.join(remaining)}")
+            for name in ready:
+                del remaining[name]
+                order.append(name)
+            for dependencies in remaining.values():
+                dependencies.difference_update(ready)
+        return order
+
+    def dependents(self, name):
+        """Etapas que dependem, direta ou indiretamente, de `name`"""
+        found = set()
+        frontier = {name}
+        while frontier:
+            frontier = {item.name for item in self._steps.values()
+                        if frontier.intersection(item.depends_on) and item.name not in found}
+            found.update(frontier)
+        return found
+
+    def invalidate(self, name, dependents=True):
+        """Descarta o checkpoint de uma etapa (e, por padrão, das que dependem dela)
+
+        Returns:
+            list: Etapas que tinham checkpoint e serão executadas de novo
+        """
+        if self.checkpoints is None:
+            raise ValueError("Checkpoints desativados: informe run_id (ou WORKFLOW_RUN_ID)")
+        names = [name] + sorted(self.dependents(name)) if dependents else [name]
+        return self.checkpoints.invalidate(names)
+
+    def _warn(self, message):
+        if self.logger:
+            self.logger.log_warning('workflow', message)
+        else:
+            logging.warning(message)
+
+    def _restore_checkpoints(self, order):
+        """Saídas das etapas reaproveitadas do checkpoint desta execução (run_id)"""
+        self.restored = []
+        results = {}
+        if self.checkpoints is None:
+            return results
+        for name in order:
+            depends_on = self._steps[name].depends_on
+            # Dependência executada de novo invalida a saída gravada desta etapa
+            if not all(dependency in results for dependency in depends_on):
+                continue
+            if not self.checkpoints.is_complete(name, depends_on):
+                continue
+            try:
+                results[name] = self.checkpoints.load(name)
+            except Exception as e:
+                self._warn(f"Checkpoint da etapa '{name}' ilegível; a etapa será executada: {e}")
+                continue
+            self.restored.append(name)
+        if self.restored and self.logger:
+            self.logger.log_info('workflow', f"Execução {self.run_id}: etapas recuperadas do checkpoint: "
+                                             f"{', '.join(self.restored)}")
+        return results
+
+    def _check_picklable(self, names):
+        """Com executor='process', valida antes de iniciar que as etapas podem ir para outro processo"""
+        for name in names:
+            try:
+                pickle.dumps(self._steps[name].func)
+            except Exception as e:
+                raise ValueError(f"Etapa '{name}' não pode rodar com executor='process' (use uma função de "
+                                 f"módulo ou um método do workflow serializável com pickle): {e}") from e
+
+    def _run_step(self, name, args, processes=None):
+        """Executa uma etapa (no processo atual ou no pool de processos), mede a duração e grava o checkpoint"""
+        item = self._steps[name]
+        span = self.logger.span(name, 'business', log_start=True) if self.logger else contextlib.nullcontext()
+        start = time.perf_counter()
+        try:
+            with span:
+                if processes is not None:
+                    output = processes.submit(item.func, *args).result()
+                else:
+                    output = item.func(*args)
+        finally:
+            self.durations[name] = (time.perf_counter() - start) * 1000
+        if self.checkpoints is not None:
+            try:
+                self.checkpoints.save(name, output, item.depends_on, self.durations[name])
+            except Exception as e:
+                # Sem checkpoint a etapa apenas será executada de novo em uma retomada
+                self._warn(f"Falha ao gravar o checkpoint da etapa '{name}': {e}")
+        return output
+
+    def run(self):
+        """Executa uma vez as etapas sem checkpoint; retorna {etapa: saída}
+
+        Raises:
+            ValueError: Dependência não registrada, ciclo entre etapas ou, com
+                        executor='process', etapa que não pode ser enviada ao processo
+            WorkflowError: Uma etapa lançou exceção
+        """
+        order = self.topological_order()
+        self.durations = {}
+        results = self._restore_checkpoints(order)
+        if self.executor == 'process':
+            self._check_picklable([name for name in order if name not in results])
+        if self.checkpoints is not None:
+            # Saídas gravadas de etapas que vão rodar de novo ficaram obsoletas; sem isso uma
+            # retomada após nova falha reaproveitaria uma saída calculada sobre dados antigos
+            self.checkpoints.invalidate([name for name in order if name not in results])
+            self.checkpoints.set_status('running')
+        try:
+            self._execute(order, results)
+        except Exception:
+            if self.checkpoints is not None:
+                self.checkpoints.set_status('failed')
+            raise
+        if self.checkpoints is not None:
+            self.checkpoints.set_status('completed')
+        return results
+
+    def _execute(self, order, results):
+        """Executa as etapas que ainda não estão em `results`, preenchendo-o"""
+        order = [name for name in order if name not in results]
+        if self.max_workers == 1 and self.executor == 'thread':
+            for name in order:
+                args = [results[dependency] for dependency in self._steps[name].depends_on]
+                try:
+                    results[name] = self._run_step(name, args)
+                except Exception as e:
+                    raise WorkflowError(name, e) from e
+            return
+
+        # Etapas são despachadas por threads; com executor='process' cada thread
+        # apenas aguarda a sua etapa no pool de processos
+        pending = {name: set(self._steps[name].depends_on).difference(results) for name in order}
+        failure = None
+        processes = (concurrent.futures.ProcessPoolExecutor(self.max_workers)
+                     if self.executor == 'process' else contextlib.nullcontext())
+        with processes, concurrent.futures.ThreadPoolExecutor(
+                self.max_workers, thread_name_prefix='workflow') as dispatcher:
+            process_pool = processes if self.executor == 'process' else None
+            running = {}
+            while pending or running:
+                if failure is None:
+                    for name in [name for name in order if name in pending and not pending[name]]:
+                        del pending[name]
+                        args = [results[dependency] for dependency in self._steps[name].depends_on]
+                        # Copia o contexto para que spans das etapas fiquem sob o span de quem chamou run()
+                        context = contextvars.copy_context()
+                        running[dispatcher.submit(context.run, self._run_step, name, args, process_pool)] = name
+                if not running:
+                    break
+                done, _ = concurrent.futures.wait(running, return_when=concurrent.futures.FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    try:
+                        results[name] = future.result()
+                    except Exception as e:
+                        failure = failure or (name, e)
+                        continue
+                    for dependencies in pending.values():
+                        dependencies.discard(name)
+
+        if failure is not None:
+            raise WorkflowError(*failure) from failure[1]
+
+    def execute_workflow(self):
+        """Execute the complete workflow"""
+        self.status = 'running'
+        try:
+            results = self.run()
+        except Exception:
+            self.status = 'failed'
+            raise
+        self.status = 'completed'
+        return {'status': 'completed', 'results': results, 'durations_ms': dict(self.durations),
+                'run_id': self.run_id, 'restored': list(self.restored)}
+
+    def execute_streaming(self, queue_size=None, transform_workers=1):
+        """Executa o template em modo streaming: extract_chunks → transform_chunk → load_chunk
+
+        Cada bloco passa pelas três etapas sem esperar a extração inteira
+        terminar (ver StreamingPipeline); o retorno traz os contadores por
+        etapa e qual delas foi o gargalo.
+        """
+        pipeline = StreamingPipeline(self.extract_chunks(), 'data_extraction', queue_size, self.logger)
+        pipeline.add_stage('data_transformation', self.transform_chunk, workers=transform_workers)
+        pipeline.add_stage('data_loading', self.load_chunk)
+        self.status = 'running'
+        try:
+            stats = pipeline.run()
+        except Exception:
+            self.status = 'failed'
+            raise
+        self.status = 'completed'
+        return {'status': 'completed', 'stages': stats, 'bottleneck': pipeline.bottleneck(),
+                'elapsed_ms': round(pipeline.elapsed * 1000, 3)}
+
+    # Etapas padrão do template: sobrescreva nos bots (o grafo é mantido)
+
+    @step('data_extraction')
     def step1_data_extraction(self):
         """Extract data from source systems"""
         # Implementation
         self.status = 'data_extracted'
-        
-    def step2_data_transformation(self):
+
+    @step('data_transformation', depends_on=['data_extraction'])
+    def step2_data_transformation(self, extracted=None):
         """Transform the extracted data"""
         # Implementation
         self.status = 'data_transformed'
-        
-    def step3_data_loading(self):
+
+    @step('data_loading', depends_on=['data_transformation'])
+    def step3_data_loading(self, transformed=None):
         """Load data to target systems"""
         # Implementation
         self.status = 'data_loaded'
-        
-    def execute_workflow(self):
-        """Execute the complete workflow"""
-        self.step1_data_extraction()
-        self.step2_data_transformation()
-        self.step3_data_loading()
-        return {'status': 'completed'}
+
+    # Etapas do modo streaming (execute_streaming): operam sobre um bloco por vez
+
+    def extract_chunks(self):
+        """Yield chunks of data from source systems (e.g. db_manager.stream_dataframes)"""
+        # Implementation
+        return iter(())
+
+    def transform_chunk(self, chunk):
+        """Transform one extracted chunk; return None to drop it"""
+        # Implementation
+        return chunk
+
+    def load_chunk(self, chunk):
+        """Load one transformed chunk to target systems"""
+        # Implementation
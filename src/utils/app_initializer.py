@@ -38,20 +38,20 @@ def initialize_app():
     _logger = _db_manager.initialize_logging()
     
     # Registra log de início
-    _logger.log_info("initialize_app", "Application initialization started", ProcessType.SYSTEM)
+    _logger.log_info("initialize_app", "Application initialization started", process_type=ProcessType.SYSTEM)
     
     # Conecta ao banco de dados
     db_connected = _db_manager.connect()
     
     if db_connected:
-        _logger.log_success("initialize_app", "Database connection established", ProcessType.SYSTEM)
+        _logger.log_success("initialize_app", "Database connection established", process_type=ProcessType.SYSTEM)
     else:
-        _logger.log_warning("initialize_app", "Running without database connection", ProcessType.SYSTEM)
+        _logger.log_warning("initialize_app", "Running without database connection", process_type=ProcessType.SYSTEM)
     
     # Registra função de limpeza ao encerrar
     atexit.register(cleanup_app)
     
-    _logger.log_success("initialize_app", "Application initialized successfully", ProcessType.SYSTEM)
+    _logger.log_success("initialize_app", "Application initialized successfully", process_type=ProcessType.SYSTEM)
     
     return _logger, _db_manager
 
@@ -60,14 +60,14 @@ def cleanup_app():
     global _logger, _db_manager
     
     if _logger is not None:
-        _logger.log_info("cleanup_app", "Application shutdown initiated", ProcessType.SYSTEM)
+        _logger.log_info("cleanup_app", "Application shutdown initiated", process_type=ProcessType.SYSTEM)
     
     # Fecha conexão com banco de dados
     if _db_manager is not None:
         _db_manager.close()
     
     if _logger is not None:
-        _logger.log_info("cleanup_app", "Application shutdown completed", ProcessType.SYSTEM)
+        _logger.log_info("cleanup_app", "Application shutdown completed", process_type=ProcessType.SYSTEM)
 
 def get_logger():
     """Retorna a instância do logger, inicializando a aplicação se necessário"""
@@ -1,8 +1,10 @@
 # src/utils/environment_loader.py
 import os
-import sys
-from dotenv import load_dotenv
-import argparse
+import threading
+
+# Ambiente carregado no primeiro acesso (get_environment)
+_environment = None
+_environment_lock = threading.Lock()
 
 def load_environment():
     """
@@ -14,6 +16,9 @@ def load_environment():
     Returns:
         str: O ambiente carregado ('development' ou 'production')
     """
+    from dotenv import load_dotenv
+    import argparse
+    
     # Carrega as variáveis de ambiente do arquivo .env
     # Prioridade: .env (com valores específicos) > variáveis de sistema
     dotenv_path = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), '.env')
@@ -48,16 +53,34 @@ def load_environment():
     print(f"Using default environment: {default_env}")
     return default_env
 
-# Carrega o ambiente imediatamente quando o módulo é importado
-environment = load_environment()
+def _print_loaded_variables():
+    """Debug: mostra as variáveis de ambiente carregadas para diagnóstico"""
+    if os.environ.get('DEBUG_MODE', '').lower() in ('true', '1', 'yes'):
+        print("\nLoaded environment variables:")
+        for key in ['ENVIRONMENT', 'DB_HOST', 'DB_PORT', 'DB_NAME', 'DB_USER', 'DB_SCHEMA', 'BOT_NAME', 'DEBUG_MODE']:
+            if key in os.environ:
+                # Ocultar a senha
+                if key == 'DB_PASSWORD':
+                    print(f"  {key}: ******")
+                else:
+                    print(f"  {key}: {os.environ[key]}")
+
+def get_environment():
+    """
+    Retorna o ambiente de execução, carregando .env e argumentos apenas na
+    primeira chamada (importar este módulo não lê arquivos nem sys.argv).
+    """
+    global _environment
+    if _environment is None:
+        with _environment_lock:
+            if _environment is None:
+                env = load_environment()
+                _print_loaded_variables()
+                _environment = env
+    return _environment
 
-# Debug: mostre todas as variáveis de ambiente carregadas para diagnóstico
-if os.environ.get('DEBUG_MODE', '').lower() in ('true', '1', 'yes'):
-    print("\nLoaded environment variables:")
-    for key in ['ENVIRONMENT', 'DB_HOST', 'DB_PORT', 'DB_NAME', 'DB_USER', 'DB_SCHEMA', 'BOT_NAME', 'DEBUG_MODE']:
-        if key in os.environ:
-            # Ocultar a senha
-            if key == 'DB_PASSWORD':
-                print(f"  {key}: ******")
-            else:
-                print(f"  {key}: {os.environ[key]}")
\ No newline at end of file
+def __getattr__(name):
+    # `from src.utils.environment_loader import environment` continua válido e carrega sob demanda
+    if name == 'environment':
+        return get_environment()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
\ No newline at end of file
@@ -0,0 +1,155 @@
+# src/utils/log_file_writer.py
+# Escritor de arquivo de log com handle persistente, buffer e rotação
+
+import datetime
+import gzip
+import os
+import shutil
+import threading
+import time
+
+
+class RotatingLogFileWriter:
+    """
+    Mantém um único handle aberto para o arquivo de log atual.
+
+    O buffer é descarregado no disco a cada `flush_interval` segundos, quando
+    acumula `flush_bytes` caracteres ou quando `write(..., force_flush=True)`
+    é chamado (usado em registros CRITICAL). O arquivo é rotacionado por
+    tamanho (`max_bytes`) e/ou na virada do dia (`rotate_daily`); cada novo
+    segmento começa com o texto de `header_factory()` e os segmentos antigos
+    são compactados com gzip em uma thread separada. Os tamanhos são medidos
+    em caracteres, o que equivale a bytes para logs em ASCII.
+    """
+
+    def __init__(self, log_dir, base_name, header_factory=None, footer_factory=None,
+                 max_bytes=0, rotate_daily=False, flush_interval=1.0, flush_bytes=65536,
+                 compress=True, extension='.log'):
+        self.log_dir = log_dir
+        self.base_name = base_name
+        self.extension = extension
+        self.header_factory = header_factory
+        self.footer_factory = footer_factory
+        self.max_bytes = int(max_bytes or 0)
+        self.rotate_daily = rotate_daily
+        self.flush_interval = float(flush_interval)
+        self.flush_bytes = int(flush_bytes)
+        self.compress = compress
+
+        self.path = None
+        self._file = None
+        self._size = 0
+        self._pending = 0
+        self._next_rollover = None
+        self._lock = threading.Lock()
+        self._closed = False
+        self._compress_threads = []
+
+        os.makedirs(self.log_dir, exist_ok=True)
+        self._open_segment()
+
+        self._stop_event = threading.Event()
+        self._flusher = None
+        if self.flush_interval > 0:
+            self._flusher = threading.Thread(target=self._flush_loop, name=f"log-file-flush-{base_name}", daemon=True)
+            self._flusher.start()
+
+    def write(self, text, force_flush=False):
+        """Acrescenta texto ao segmento atual, rotacionando se necessário"""
+        with self._lock:
+            if self._closed:
+                return
+            if self._should_rollover(len(text)):
+                self._rotate()
+            self._file.write(text)
+            self._size += len(text)
+            self._pending += len(text)
+            if force_flush or self._pending >= self.flush_bytes:
+                self._flush_locked()
+
+    def flush(self):
+        """Descarrega o buffer no disco"""
+        with self._lock:
+            if not self._closed:
+                self._flush_locked()
+
+    def close(self, footer=True):
+        """Grava o rodapé, fecha o handle e aguarda compactações em andamento"""
+        with self._lock:
+            if self._closed:
+                return
+            if footer and self.footer_factory:
+                self._file.write(self.footer_factory())
+            self._file.close()
+            self._closed = True
+        self._stop_event.set()
+        for thread in self._compress_threads:
+            thread.join()
+
+    @property
+    def closed(self):
+        return self._closed
+
+    def _flush_locked(self):
+        if self._pending:
+            self._file.flush()
+            self._pending = 0
+
+    def _flush_loop(self):
+        """Thread que descarrega o buffer periodicamente"""
+        while not self._stop_event.wait(self.flush_interval):
+            self.flush()
+
+    def _should_rollover(self, incoming):
+        if self.max_bytes and self._size + incoming > self.max_bytes and self._size > self._header_size:
+            return True
+        if self._next_rollover is not None and time.time() >= self._next_rollover:
+            return True
+        return False
+
+    def _open_segment(self):
+        """Abre um novo segmento com nome único e escreve o cabeçalho"""
+        now = datetime.datetime.now()
+        timestamp = now.strftime('%Y%m%d_%H%M%S')
+        path = os.path.join(self.log_dir, f"{self.base_name}_{timestamp}{self.extension}")
+        suffix = 1
+        while os.path.exists(path) or os.path.exists(path + '.gz'):
+            path = os.path.join(self.log_dir, f"{self.base_name}_{timestamp}_{suffix}{self.extension}")
+            suffix += 1
+
+        self.path = path
+        self._file = open(path, 'w', encoding='utf-8')
+        header = self.header_factory() if self.header_factory else ""
+        self._file.write(header)
+        self._file.flush()
+        self._header_size = len(header)
+        self._size = len(header)
+        self._pending = 0
+
+        if self.rotate_daily:
+            tomorrow = datetime.datetime.combine(now.date() + datetime.timedelta(days=1), datetime.time())
+            self._next_rollover = tomorrow.timestamp()
+
+    def _rotate(self):
+        """Fecha o segmento atual, abre o próximo e compacta o anterior em background"""
+        if self.footer_factory:
+            self._file.write(self.footer_factory())
+        self._file.close()
+        old_path = self.path
+        self._open_segment()
+
+        if self.compress:
+            self._compress_threads = [t for t in self._compress_threads if t.is_alive()]
+            thread = threading.Thread(target=self._compress_segment, args=(old_path,), daemon=True)
+            thread.start()
+            self._compress_threads.append(thread)
+
+    @staticmethod
+    def _compress_segment(path):
+        """Compacta um segmento fechado para path.gz e remove o original"""
+        try:
+            with open(path, 'rb') as src, gzip.open(path + '.gz', 'wb') as dst:
+                shutil.copyfileobj(src, dst)
+            os.remove(path)
+        except Exception:
+            pass  # Mantém o segmento sem compactação se algo falhar
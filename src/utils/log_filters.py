@@ -0,0 +1,116 @@
+# src/utils/log_filters.py
+# Limiares de nível e amostragem por ponto de chamada para o EnhancedLogger
+
+import logging
+import threading
+import time
+
+
+def parse_level(level):
+    """Converte nomes ('INFO', 'warning') ou números em nível do módulo logging"""
+    if level is None:
+        return None
+    if isinstance(level, int):
+        return level
+    value = logging.getLevelName(str(level).strip().upper())
+    if not isinstance(value, int):
+        raise ValueError(f"Nível de log inválido: {level}")
+    return value
+
+
+class _SiteState:
+    __slots__ = ('function_name', 'calls', 'window_start', 'window_count', 'suppressed', 'last_summary')
+
+    def __init__(self, function_name, now):
+        self.function_name = function_name
+        self.calls = 0
+        self.window_start = now
+        self.window_count = 0
+        self.suppressed = 0
+        self.last_summary = now
+
+
+class LogSampler:
+    """
+    Amostragem por ponto de chamada (code object + linha) para loops verbosos.
+
+    - every_n: emite 1 a cada N chamadas do mesmo ponto (a primeira sempre passa)
+    - max_per_interval: emite no máximo M registros por ponto a cada `interval` segundos
+    - max_level: só registros até este nível são amostrados; avisos e erros
+      acima dele são sempre emitidos
+
+    Os registros descartados são contados e reportados, no máximo uma vez a
+    cada `summary_interval` segundos por ponto, como um resumo "N mensagens
+    semelhantes suprimidas": junto do próximo registro emitido pelo mesmo
+    ponto ou, para pontos que silenciaram, via `due_summaries`.
+    """
+
+    def __init__(self, every_n=1, max_per_interval=0, interval=1.0, summary_interval=30.0,
+                 max_level=logging.INFO):
+        self.every_n = max(1, int(every_n))
+        self.max_per_interval = int(max_per_interval or 0)
+        self.interval = float(interval)
+        self.summary_interval = float(summary_interval)
+        self.max_level = parse_level(max_level)
+        self._sites = {}
+        self._lock = threading.Lock()
+        self._next_summary = time.monotonic() + self.summary_interval
+
+    @property
+    def active(self):
+        return self.every_n > 1 or self.max_per_interval > 0
+
+    def allow(self, key, function_name):
+        """Decide se o registro do ponto `key` deve ser emitido
+
+        Returns:
+            tuple: (allowed, suppressed) — suppressed é o total descartado desde
+                   o último resumo desse ponto quando um novo resumo é devido
+                   (0 caso contrário)
+        """
+        now = time.monotonic()
+        with self._lock:
+            site = self._sites.get(key)
+            if site is None:
+                site = self._sites[key] = _SiteState(function_name, now)
+
+            site.calls += 1
+            allowed = (site.calls - 1) % self.every_n == 0
+
+            if allowed and self.max_per_interval:
+                if now - site.window_start >= self.interval:
+                    site.window_start = now
+                    site.window_count = 0
+                if site.window_count >= self.max_per_interval:
+                    allowed = False
+                else:
+                    site.window_count += 1
+
+            if not allowed:
+                site.suppressed += 1
+                return False, 0
+
+            # Resume os descartes no máximo uma vez por summary_interval
+            if site.suppressed and now - site.last_summary >= self.summary_interval:
+                suppressed, site.suppressed = site.suppressed, 0
+                site.last_summary = now
+                return True, suppressed
+            return True, 0
+
+    def due_summaries(self, force=False):
+        """Retorna [(key, function_name, suppressed)] dos pontos com descartes não reportados
+
+        Só varre os pontos a cada `summary_interval` segundos, a menos que force=True.
+        """
+        now = time.monotonic()
+        if not force and now < self._next_summary:
+            return []
+        summaries = []
+        with self._lock:
+            self._next_summary = now + self.summary_interval
+            for key, site in self._sites.items():
+                if site.suppressed and (force or now - site.last_summary >= self.summary_interval):
+                    summaries.append((key, site.function_name, site.suppressed))
+                    site.suppressed = 0
+                    site.last_summary = now
+        return summaries
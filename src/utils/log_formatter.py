@@ -0,0 +1,86 @@
+# src/utils/log_formatter.py
+# Formatação pré-compilada das linhas da tabela de log
+
+# Caracteres que o textwrap trata de forma especial (tabs, quebras de linha etc.)
+_WRAP_SPECIAL = frozenset('\t\n\x0b\x0c\r')
+
+
+class LogTableFormatter:
+    """
+    Formata as linhas da tabela de log a partir de templates montados uma
+    única vez com as larguras das colunas. Separador e cabeçalho ficam em
+    cache, e a mensagem só passa pelo textwrap quando não cabe na coluna.
+
+    A saída é idêntica, byte a byte, à montagem coluna a coluna usada
+    anteriormente em EnhancedLogger.log_entry.
+    """
+
+    def __init__(self, col_widths, padding=1, message_column='message', message_width=None):
+        self.col_widths = dict(col_widths)
+        self.padding = padding
+        self.message_column = message_column
+        self.message_width = message_width or self.col_widths[message_column]
+
+        names = list(self.col_widths)
+        widths = list(self.col_widths.values())
+        self._message_index = names.index(message_column)
+        self._widths = widths
+        pad = " " * padding
+
+        # "|" + " valor   " + "|" ... com cada valor alinhado à esquerda na largura da coluna
+        self._row_template = "|" + "|".join(
+            f"{pad}{{{i}:<{width}}}{pad}" for i, width in enumerate(widths)
+        ) + "|"
+
+        # Linhas de continuação: colunas vazias fixas e apenas a mensagem variável
+        blank = ["|" + " " * (width + padding * 2) for width in widths]
+        self._cont_prefix = "".join(blank[:self._message_index]) + "|" + pad
+        self._cont_suffix = pad + "".join(blank[self._message_index + 1:]) + "|"
+        self._cont_width = widths[self._message_index]
+
+        self.separator = "+" + "+".join("-" * (width + padding * 2) for width in widths) + "+"
+        self.header = self._build_header()
+
+    def _build_header(self):
+        """Monta separador + títulos centralizados + separador"""
+        header_line = "|"
+        for name, width in self.col_widths.items():
+            # Títulos com um espaço adicional em cada lado para melhor centralização
+            title = f" {name.upper()} "
+            padding_left = self.padding + (width - len(title) + 1) // 2
+            padding_right = width - (len(title) - 1) - padding_left + self.padding
+            header_line += " " * padding_left + title + " " * padding_right + "|"
+        return self.separator + "\n" + header_line + "\n" + self.separator + "\n"
+
+    def wrap(self, message):
+        """Quebra a mensagem na largura da coluna, evitando o textwrap quando possível"""
+        if len(message) <= self.message_width and message.isprintable():
+            # isprintable() exclui tabs/quebras de linha; o textwrap apenas removeria
+            # os espaços finais de uma mensagem que já cabe na coluna
+            return [message.rstrip(' ')]
+        import textwrap
+        return textwrap.wrap(message, width=self.message_width) or [""]
+
+    def format_entry(self, values, critical=False):
+        """Formata uma entrada completa (linha principal, continuações e separador)
+
+        Args:
+            values (sequence): Valores na ordem das colunas; a mensagem vai sem quebra
+            critical (bool): Acrescenta o separador ao final, como nos registros CRITICAL
+
+        Returns:
+            str: Texto pronto para o arquivo, terminado em "\\n"
+        """
+        message_lines = self.wrap(values[self._message_index])
+        widths = self._widths
+        columns = [value[:widths[i]] for i, value in enumerate(values)]
+        columns[self._message_index] = message_lines[0]
+
+        text = self._row_template.format(*columns) + "\n"
+        if len(message_lines) > 1:
+            prefix, suffix, width = self._cont_prefix, self._cont_suffix, self._cont_width
+            for line in message_lines[1:]:
+                text += prefix + line.ljust(width) + suffix + "\n"
+        if critical:
+            text += self.separator + "\n"
+        return text
@@ -0,0 +1,207 @@
+# src/utils/log_multiprocess.py
+# Logging seguro para múltiplos processos: um único processo escritor recebe
+# os registros dos workers e é o dono do arquivo de log e da conexão com o banco
+
+# multiprocessing é importado só quando usado: o logger importa este módulo
+# em todo processo, mas o modo multiprocesso é opcional
+import logging
+import os
+import sys
+import threading
+
+# Variável de ambiente com o endereço do processo escritor; é herdada pelos
+# processos filhos tanto com fork quanto com spawn
+WRITER_ADDRESS_ENV = 'RPA_LOG_WRITER_ADDRESS'
+
+
+def is_child_process():
+    """Indica se o processo atual foi criado pelo multiprocessing"""
+    # Processos filhos (fork ou spawn) sempre têm o multiprocessing já importado
+    multiprocessing = sys.modules.get('multiprocessing')
+    return multiprocessing is not None and multiprocessing.parent_process() is not None
+
+
+def get_writer_address():
+    """Endereço do processo escritor ativo, se houver"""
+    return os.environ.get(WRITER_ADDRESS_ENV)
+
+
+class LogForwarder:
+    """
+    Lado do worker: envia registros prontos ao processo escritor.
+
+    Cada `send` serializa o registro no canal (socket Unix ou named pipe no
+    Windows) já aberto com o escritor, sem tocar em arquivo ou banco.
+    """
+
+    def __init__(self, address):
+        import multiprocessing
+        from multiprocessing.connection import Client
+        self.address = address
+        self._conn = Client(address, authkey=multiprocessing.current_process().authkey)
+        self._lock = threading.Lock()
+
+    def send(self, item):
+        with self._lock:
+            if self._conn is None:
+                return False
+            try:
+                self._conn.send(item)
+                return True
+            except (OSError, EOFError):
+                # Escritor encerrado; descarta em vez de travar o worker
+                self._conn = None
+                return False
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+class LogWriterProcess:
+    """
+    Lado do processo principal: inicia e encerra o processo escritor.
+
+    O escritor cria um EnhancedLogger próprio (único dono do arquivo de log)
+    e, se `db_params` for informado, uma única conexão com o banco com o sink
+    em lote habilitado. O endereço é publicado em RPA_LOG_WRITER_ADDRESS para
+    que workers criados depois se conectem automaticamente.
+    """
+
+    def __init__(self, project_name, logger_options=None, db_params=None, sink_options=None):
+        self.project_name = project_name
+        self.logger_options = logger_options or {}
+        self.db_params = db_params
+        self.sink_options = sink_options or {}
+        self.address = None
+        self._process = None
+        self._control = None
+
+    def start(self, timeout=30):
+        """Inicia o processo escritor e retorna o endereço para os workers"""
+        if self._process and self._process.is_alive():
+            return self.address
+        import multiprocessing
+        self._control, child_control = multiprocessing.Pipe()
+        self._process = multiprocessing.Process(
+            target=_writer_main,
+            args=(child_control, self.project_name, self.logger_options, self.db_params, self.sink_options),
+            name=f"log-writer-{self.project_name}",
+            daemon=True
+        )
+        self._process.start()
+        child_control.close()
+
+        if not self._control.poll(timeout):
+            self.stop(timeout=1)
+            raise RuntimeError("Processo escritor de logs não respondeu")
+        self.address = self._control.recv()
+        os.environ[WRITER_ADDRESS_ENV] = self.address
+        return self.address
+
+    def flush(self, timeout=30):
+        """Pede ao escritor que grave arquivo e banco e aguarda a confirmação"""
+        if not self._process or not self._process.is_alive():
+            return False
+        self._control.send('flush')
+        return self._control.poll(timeout) and self._control.recv() == 'flushed'
+
+    def stop(self, timeout=30):
+        """Drena os registros pendentes, fecha arquivo/banco e encerra o escritor"""
+        if not self._process:
+            return
+        if self._process.is_alive():
+            try:
+                self._control.send('stop')
+            except OSError:
+                pass
+            self._process.join(timeout)
+            if self._process.is_alive():
+                self._process.terminate()
+        if os.environ.get(WRITER_ADDRESS_ENV) == self.address:
+            del os.environ[WRITER_ADDRESS_ENV]
+        self._control.close()
+        self._process = None
+
+
+def _writer_main(control, project_name, logger_options, db_params, sink_options):
+    """Loop do processo escritor"""
+    # Import tardio: logger.py importa este módulo para o LogForwarder
+    import multiprocessing
+    from multiprocessing.connection import Listener, wait
+    from src.utils.logger import EnhancedLogger
+
+    listener = Listener(authkey=multiprocessing.current_process().authkey)
+    logger = EnhancedLogger(project_name, **logger_options)
+
+    db_connection = None
+    if db_params:
+        try:
+            import psycopg2
+            db_connection = psycopg2.connect(**db_params)
+            logger.enable_db_sink(**sink_options)
+            logger.connect_to_db(db_connection)
+        except Exception as e:
+            logging.error(f"Log writer failed to connect to database: {e}")
+
+    clients = []
+    clients_lock = threading.Lock()
+
+    def accept_loop():
+        while True:
+            try:
+                conn = listener.accept()
+            except Exception:
+                return
+            with clients_lock:
+                clients.append(conn)
+
+    threading.Thread(target=accept_loop, name="log-writer-accept", daemon=True).start()
+    control.send(listener.address)
+
+    def receive(conn):
+        """Recebe um item de um worker; retorna False se o worker desconectou"""
+        try:
+            item = conn.recv()
+        except (EOFError, OSError):
+            with clients_lock:
+                clients.remove(conn)
+            return False
+        try:
+            logger._emit(*item)
+        except Exception as e:
+            logging.error(f"Log writer failed to write record: {e}")
+        return True
+
+    running = True
+    while running:
+        with clients_lock:
+            watched = list(clients)
+        for conn in wait(watched + [control], timeout=0.2):
+            if conn is control:
+                try:
+                    command = control.recv()
+                except EOFError:
+                    command = 'stop'  # Processo principal morreu
+                if command == 'flush':
+                    logger.flush()
+                    control.send('flushed')
+                elif command == 'stop':
+                    running = False
+            else:
+                receive(conn)
+
+    # Drena o que os workers já enviaram antes de fechar
+    with clients_lock:
+        remaining = list(clients)
+    for conn in remaining:
+        while conn in clients and conn.poll():
+            receive(conn)
+
+    logger.disconnect_db()
+    logger._add_closing_line()
+    if db_connection is not None:
+        db_connection.close()
+    listener.close()
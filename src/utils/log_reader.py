@@ -0,0 +1,128 @@
+# src/utils/log_reader.py
+# Leitura em streaming dos logs em JSON Lines (inclusive segmentos .gz rotacionados)
+#
+# Uso: python -m src.utils.log_reader logs/ --start "2024-01-01 08:00" --status failure --count
+
+import argparse
+import datetime
+import glob
+import gzip
+import json
+import os
+import sys
+from collections import Counter
+
+
+def _as_set(value):
+    """Normaliza um filtro (str, lista ou None) para conjunto"""
+    if value is None:
+        return None
+    if isinstance(value, str):
+        return {value}
+    return set(value)
+
+
+def _as_iso(value):
+    """Converte datetime/str para o formato ISO usado em created_at"""
+    if value is None:
+        return None
+    if isinstance(value, str):
+        value = datetime.datetime.fromisoformat(value)
+    return value.isoformat(timespec='microseconds')
+
+
+def find_log_files(paths):
+    """Expande arquivos, diretórios e padrões glob em arquivos .jsonl/.jsonl.gz ordenados"""
+    if isinstance(paths, str):
+        paths = [paths]
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files.extend(glob.glob(os.path.join(path, '*.jsonl')))
+            files.extend(glob.glob(os.path.join(path, '*.jsonl.gz')))
+        elif os.path.exists(path):
+            files.append(path)
+        else:
+            files.extend(glob.glob(path))
+    # O nome dos segmentos começa com o timestamp, então a ordem alfabética é cronológica
+    return sorted(set(files), key=lambda f: f[:-3] if f.endswith('.gz') else f)
+
+
+def _open(path):
+    if path.endswith('.gz'):
+        return gzip.open(path, 'rt', encoding='utf-8')
+    return open(path, 'r', encoding='utf-8')
+
+
+def iter_log_records(paths, start=None, end=None, status=None, task=None, process_type=None):
+    """
+    Percorre os registros linha a linha, sem carregar os arquivos em memória.
+
+    Args:
+        paths (str | list): Arquivos, diretórios ou padrões glob
+        start (datetime | str, optional): Inclui registros com created_at >= start
+        end (datetime | str, optional): Inclui registros com created_at < end
+        status (str | list, optional): Valores de status aceitos
+        task (str | list, optional): Valores de task_name aceitos
+        process_type (str | list, optional): Valores de process_type aceitos
+
+    Yields:
+        dict: Registro com os campos da tabela logs e created_at
+    """
+    start, end = _as_iso(start), _as_iso(end)
+    status, task, process_type = _as_set(status), _as_set(task), _as_set(process_type)
+
+    for path in find_log_files(paths):
+        with _open(path) as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue  # Linha truncada (ex.: processo encerrado no meio da escrita)
+
+                # created_at em ISO com microssegundos permite comparar como string
+                created_at = record.get('created_at', '')
+                if start and created_at < start:
+                    continue
+                if end and created_at >= end:
+                    continue
+                if status and record.get('status') not in status:
+                    continue
+                if task and record.get('task_name') not in task:
+                    continue
+                if process_type and record.get('process_type') not in process_type:
+                    continue
+                yield record
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Filtra logs JSON Lines do RPA")
+    parser.add_argument('paths', nargs='+', help="Arquivos, diretórios ou padrões glob")
+    parser.add_argument('--start', help="Data/hora inicial (ISO, ex.: 2024-01-01 08:00)")
+    parser.add_argument('--end', help="Data/hora final, exclusiva")
+    parser.add_argument('--status', action='append', help="Status aceito (pode repetir)")
+    parser.add_argument('--task', action='append', help="task_name aceito (pode repetir)")
+    parser.add_argument('--process-type', action='append', help="process_type aceito (pode repetir)")
+    parser.add_argument('--count', action='store_true',
+                        help="Mostra apenas a contagem por status em vez dos registros")
+    args = parser.parse_args(argv)
+
+    records = iter_log_records(args.paths, start=args.start, end=args.end, status=args.status,
+                               task=args.task, process_type=args.process_type)
+
+    if args.count:
+        counts = Counter(record.get('status') for record in records)
+        for status, total in counts.most_common():
+            print(f"{status}\t{total}")
+        print(f"total\t{sum(counts.values())}")
+        return 0
+
+    for record in records:
+        sys.stdout.write(json.dumps(record, ensure_ascii=False) + "\n")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
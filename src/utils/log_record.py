@@ -0,0 +1,41 @@
+# src/utils/log_record.py
+# Estrutura compartilhada de um registro de log
+
+import json
+from collections import namedtuple
+
+# Colunas gravadas na tabela {schema}.logs, na ordem usada pelos INSERTs
+LOG_COLUMNS = (
+    'task_name',
+    'function_name',
+    'source_file',
+    'cpu_usage',
+    'memory_usage',
+    'log_date',
+    'log_time',
+    'log_message',
+    'process_type',
+    'status',
+    'duration_ms',
+    'span_id',
+    'parent_span_id',
+)
+
+# Registro imutável e barato de criar, repassado aos destinos (arquivo, banco, filas);
+# os campos de span são opcionais e ficam None fora de um LogSpan
+LogRecord = namedtuple('LogRecord', LOG_COLUMNS, defaults=(None, None, None))
+
+
+def format_jsonl(record, created_at):
+    """Serializa um LogRecord como uma linha JSON (mesmos campos da tabela logs)
+
+    Args:
+        record (LogRecord): Registro a serializar
+        created_at (datetime): Momento do registro; gravado em ISO 8601 com microssegundos
+
+    Returns:
+        str: Objeto JSON terminado em "\n"
+    """
+    data = record._asdict()
+    data['created_at'] = created_at.isoformat(timespec='microseconds')
+    return json.dumps(data, ensure_ascii=False) + "\n"
@@ -0,0 +1,403 @@
+# src/utils/log_sinks.py
+# Destinos assíncronos para os registros do EnhancedLogger
+
+import collections
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from enum import Enum
+
+from src.utils.log_record import LOG_COLUMNS, LogRecord
+
+
+def execute_values(cursor, sql, argslist, **kwargs):
+    """psycopg2.extras.execute_values importado só na primeira gravação (importar o logger não carrega o psycopg2)"""
+    from psycopg2.extras import execute_values as _execute_values
+    return _execute_values(cursor, sql, argslist, **kwargs)
+
+
+class OverflowPolicy(str, Enum):
+    """
+    Política aplicada quando a fila do sink está cheia:
+
+    - BLOCK: a thread do bot espera por espaço na fila (até `block_timeout`
+      segundos; None espera indefinidamente). Se o tempo esgotar, o registro
+      é descartado e contado em `dropped`.
+    - DROP: o registro é descartado imediatamente e contado em `dropped`.
+    - SPILL: o registro é gravado em um arquivo JSONL em `spill_dir` e
+      reenviado ao banco pela thread de escrita assim que a fila esvaziar.
+    """
+    BLOCK = "block"
+    DROP = "drop"
+    SPILL = "spill"
+
+
+class DatabaseLogSink:
+    """
+    Sink em background que grava registros de log em {schema}.logs.
+
+    Os registros entram em uma fila limitada e uma thread de escrita os agrupa
+    em INSERTs de múltiplas linhas (execute_values), disparados quando o lote
+    atinge `batch_size` registros ou quando `flush_interval` segundos se passam
+    desde o primeiro registro pendente.
+    """
+
+    _FLUSH = object()
+    _STOP = object()
+
+    def __init__(self, connection, schema, max_queue_size=10000, batch_size=500,
+                 flush_interval=1.0, overflow_policy=OverflowPolicy.DROP,
+                 block_timeout=None, spill_dir=None, outbox=None):
+        self.connection = connection
+        self.outbox = outbox  # LocalOutbox para lotes que falharem
+        self.schema = schema
+        self.batch_size = max(1, int(batch_size))
+        self.flush_interval = float(flush_interval)
+        self.overflow_policy = OverflowPolicy(overflow_policy)
+        self.block_timeout = block_timeout
+        self.spill_file = None
+
+        if self.overflow_policy == OverflowPolicy.SPILL:
+            spill_dir = spill_dir or os.path.join(os.getcwd(), 'data', 'temp')
+            os.makedirs(spill_dir, exist_ok=True)
+            self.spill_file = os.path.join(spill_dir, f"db_log_spill_{os.getpid()}_{id(self)}.jsonl")
+
+        self._insert_sql = f"INSERT INTO {schema}.logs ({', '.join(LOG_COLUMNS)}) VALUES %s"
+        self._queue = queue.Queue(maxsize=max(1, int(max_queue_size)))
+        self._stats_lock = threading.Lock()
+        self._spill_lock = threading.Lock()
+        self._spill_pending = 0
+        self._stats = {'queued': 0, 'written': 0, 'dropped': 0, 'spilled': 0, 'failed': 0, 'outboxed': 0}
+        self._closed = False
+
+        self._thread = threading.Thread(target=self._run, name=f"db-log-sink-{schema}", daemon=True)
+        self._thread.start()
+
+    def submit(self, record):
+        """Enfileira um LogRecord sem bloquear em I/O de banco
+
+        Returns:
+            bool: True se o registro foi aceito (fila ou arquivo de spill)
+        """
+        if self._closed:
+            self._count('dropped')
+            return False
+
+        try:
+            if self.overflow_policy == OverflowPolicy.BLOCK:
+                self._queue.put(record, timeout=self.block_timeout)
+            else:
+                self._queue.put_nowait(record)
+        except queue.Full:
+            if self.overflow_policy == OverflowPolicy.SPILL and self._spill(record):
+                return True
+            self._count('dropped')
+            return False
+
+        self._count('queued')
+        return True
+
+    def flush(self, timeout=None):
+        """Força a gravação de tudo que está pendente e aguarda a conclusão
+
+        Returns:
+            bool: True se o flush terminou dentro do timeout
+        """
+        if self._closed or not self._thread.is_alive():
+            return False
+        done = threading.Event()
+        try:
+            self._queue.put((self._FLUSH, done), timeout=timeout)
+        except queue.Full:
+            return False
+        return done.wait(timeout)
+
+    def close(self, timeout=None):
+        """Grava os registros pendentes e encerra a thread de escrita"""
+        if self._closed:
+            return
+        self._closed = True
+        if self._thread.is_alive():
+            try:
+                self._queue.put(self._STOP, timeout=timeout)
+            except queue.Full:
+                pass
+            self._thread.join(timeout)
+
+    def stats(self):
+        """Retorna os contadores do sink (queued, written, dropped, spilled, failed, outboxed, pending)"""
+        with self._stats_lock:
+            result = dict(self._stats)
+        result['pending'] = self._queue.qsize() + self._spill_pending
+        return result
+
+    def _count(self, key, amount=1):
+        with self._stats_lock:
+            self._stats[key] += amount
+
+    def _spill(self, record):
+        """Grava o registro no arquivo de spill quando a fila está cheia"""
+        try:
+            with self._spill_lock:
+                with open(self.spill_file, 'a', encoding='utf-8') as f:
+                    f.write(json.dumps(list(record), default=str) + "\n")
+                self._spill_pending += 1
+            self._count('spilled')
+            return True
+        except Exception as e:
+            logging.error(f"Failed to spill log record to disk: {e}")
+            return False
+
+    def _run(self):
+        """Loop da thread de escrita"""
+        batch = []
+        deadline = None
+
+        while True:
+            timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                item = None
+
+            if item is self._STOP:
+                self._write(batch)
+                self._drain_spill()
+                return
+
+            if isinstance(item, tuple) and item and item[0] is self._FLUSH:
+                self._write(batch)
+                self._drain_spill()
+                batch, deadline = [], None
+                item[1].set()
+                continue
+
+            if item is not None:
+                batch.append(item)
+                if deadline is None:
+                    deadline = time.monotonic() + self.flush_interval
+
+            if len(batch) >= self.batch_size or (deadline is not None and time.monotonic() >= deadline):
+                self._write(batch)
+                batch, deadline = [], None
+                if self._queue.empty():
+                    self._drain_spill()
+
+    def _write(self, rows):
+        """Grava um lote com um único INSERT de múltiplas linhas e um commit"""
+        if not rows:
+            return
+        try:
+            cursor = self.connection.cursor()
+            execute_values(cursor, self._insert_sql, rows, page_size=self.batch_size)
+            self.connection.commit()
+            cursor.close()
+            self._count('written', len(rows))
+        except Exception as e:
+            logging.error(f"Failed to write log batch to database: {e}")
+            try:
+                self.connection.rollback()
+            except Exception:
+                pass
+            # Lote guardado no outbox local é reenviado quando o banco voltar
+            if self.outbox and self.outbox.add_logs(rows):
+                self._count('outboxed', len(rows))
+            else:
+                self._count('failed', len(rows))
+
+    def _drain_spill(self):
+        """Reenvia ao banco os registros gravados no arquivo de spill"""
+        if not self._spill_pending:
+            return
+        with self._spill_lock:
+            draining = self.spill_file + ".draining"
+            try:
+                os.replace(self.spill_file, draining)
+            except OSError:
+                return
+            self._spill_pending = 0
+
+        batch = []
+        with open(draining, 'r', encoding='utf-8') as f:
+            for line in f:
+                batch.append(LogRecord(*json.loads(line)))
+                if len(batch) >= self.batch_size:
+                    self._write(batch)
+                    batch = []
+        self._write(batch)
+        os.remove(draining)
+
+
+class AsyncDatabaseLogSink:
+    """
+    Sink para bots asyncio que grava em {schema}.logs via AsyncDBManager.
+
+    `submit` nunca bloqueia (a fila é um deque limitado; registros acima de
+    `max_queue_size` são descartados e contados em `dropped`). Uma task no
+    event loop acorda a cada `flush_interval` segundos, ou quando o lote
+    atinge `batch_size`, e grava os pendentes em uma thread do executor do
+    AsyncDBManager, com INSERTs de múltiplas linhas e commit por lote.
+
+    `aflush`/`aclose` aguardam a gravação sem bloquear o loop; `flush`/`close`
+    gravam na thread chamadora (usados no encerramento, quando o loop pode
+    já ter terminado). Lotes que falharem vão para `outbox`, como no
+    DatabaseLogSink.
+    """
+
+    def __init__(self, db, schema, max_queue_size=10000, batch_size=500, flush_interval=1.0, outbox=None):
+        self.db = db
+        self.outbox = outbox  # LocalOutbox para lotes que falharem
+        self.schema = schema
+        self.max_queue_size = max(1, int(max_queue_size))
+        self.batch_size = max(1, int(batch_size))
+        self.flush_interval = float(flush_interval)
+
+        self._insert_sql = f"INSERT INTO {schema}.logs ({', '.join(LOG_COLUMNS)}) VALUES %s"
+        self._pending = collections.deque()
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._stats = {'queued': 0, 'written': 0, 'dropped': 0, 'failed': 0, 'outboxed': 0}
+        self._closed = False
+        self._loop = None
+        self._wakeup = None
+        self._task = None
+
+    def start(self):
+        """Inicia a task de escrita no loop em execução"""
+        import asyncio
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        self._task = self._loop.create_task(self._run(), name=f"db-log-sink-{self.schema}")
+        return self
+
+    def submit(self, record):
+        """Enfileira um LogRecord (seguro a partir de qualquer thread)
+
+        Returns:
+            bool: True se o registro foi aceito
+        """
+        with self._lock:
+            if self._closed or len(self._pending) >= self.max_queue_size:
+                self._stats['dropped'] += 1
+                return False
+            self._pending.append(record)
+            self._stats['queued'] += 1
+            full = len(self._pending) >= self.batch_size
+        if full:
+            self._wake()
+        return True
+
+    def _wake(self):
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            return
+        import asyncio
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            self._wakeup.set()
+        else:
+            try:
+                loop.call_soon_threadsafe(self._wakeup.set)
+            except RuntimeError:
+                pass  # Loop encerrado; close() grava o que restar
+
+    async def _run(self):
+        """Task de escrita: aguarda o intervalo (ou lote cheio) e grava os pendentes"""
+        import asyncio
+        while not self._closed:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            if self._pending:
+                await self.aflush()
+
+    def _write_pending(self, connection):
+        """Grava todos os pendentes em lotes (roda fora do loop, com uma conexão do pool)"""
+        with self._write_lock:
+            while True:
+                with self._lock:
+                    count = min(self.batch_size, len(self._pending))
+                    batch = [self._pending.popleft() for _ in range(count)]
+                if not batch:
+                    return
+                try:
+                    cursor = connection.cursor()
+                    execute_values(cursor, self._insert_sql, batch, page_size=self.batch_size)
+                    connection.commit()
+                    cursor.close()
+                    self._count('written', len(batch))
+                except Exception as e:
+                    logging.error(f"Failed to write log batch to database: {e}")
+                    try:
+                        connection.rollback()
+                    except Exception:
+                        pass
+                    # Lote guardado no outbox local é reenviado quando o banco voltar
+                    if self.outbox and self.outbox.add_logs(batch):
+                        self._count('outboxed', len(batch))
+                    else:
+                        self._count('failed', len(batch))
+                    return
+
+    async def aflush(self):
+        """Grava os pendentes sem bloquear o loop
+
+        Returns:
+            bool: True se não restou nada pendente
+        """
+        if self._pending:
+            try:
+                await self.db.run(self._write_pending)
+            except Exception as e:
+                logging.error(f"Failed to flush async log sink: {e}")
+        return not self._pending
+
+    async def aclose(self):
+        """Encerra a task de escrita e grava os pendentes"""
+        import asyncio
+        self._closed = True
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        await self.aflush()
+
+    def flush(self, timeout=None):
+        """Grava os pendentes na thread chamadora (bloqueante; no loop prefira aflush)"""
+        if self._pending and self.db.pool is not None and not self.db.pool.closed:
+            try:
+                self.db.run_blocking(self._write_pending)
+            except Exception as e:
+                logging.error(f"Failed to flush async log sink: {e}")
+        return not self._pending
+
+    def close(self, timeout=None):
+        """Grava os pendentes e para de aceitar registros (bloqueante; no loop prefira aclose)"""
+        if self._task is not None and not self._task.done() and not self._loop.is_closed():
+            try:
+                self._loop.call_soon_threadsafe(self._task.cancel)
+            except RuntimeError:
+                pass
+        self._closed = True
+        self.flush(timeout)
+
+    def stats(self):
+        """Retorna os contadores do sink (queued, written, dropped, failed, outboxed, pending)"""
+        with self._lock:
+            result = dict(self._stats)
+            result['pending'] = len(self._pending)
+        return result
+
+    def _count(self, key, amount=1):
+        with self._lock:
+            self._stats[key] += amount
@@ -0,0 +1,98 @@
+# src/utils/log_spans.py
+# Spans de tempo: medem a duração das etapas dos bots e a gravam em duration_ms
+
+import contextvars
+import functools
+import os
+import time
+
+# Span ativo no contexto atual (thread ou task asyncio); usado para aninhamento
+_CURRENT_SPAN = contextvars.ContextVar('rpa_log_span', default=None)
+
+
+def new_span_id():
+    """Identificador aleatório de 16 caracteres hexadecimais"""
+    return os.urandom(8).hex()
+
+
+def current_span():
+    """Span ativo no contexto atual, se houver"""
+    return _CURRENT_SPAN.get()
+
+
+class LogSpan:
+    """
+    Mede uma etapa como context manager ou decorator.
+
+    Ao sair, registra uma linha com a duração em milissegundos (duration_ms),
+    o span_id e o span pai (parent_span_id) do span que estava ativo na
+    entrada. Saídas por exceção são registradas como failure e a exceção é
+    propagada. Os registros feitos dentro do span recebem o mesmo span_id.
+
+    O tempo vem de time.perf_counter (monotônico e de alta resolução), não do
+    relógio do sistema.
+    """
+
+    def __init__(self, logger, name=None, process_type='process', task_name=None,
+                 source_file=None, log_start=False):
+        self.logger = logger
+        self.name = name
+        self.process_type = process_type
+        self.task_name = task_name
+        self.source_file = source_file
+        self.log_start = log_start
+        self.span_id = None
+        self.parent_span_id = None
+        self.started_at = None
+        self.duration_ms = None
+        self._token = None
+
+    def __enter__(self):
+        if self.name is None:
+            raise ValueError("Informe o nome do span")
+        parent = _CURRENT_SPAN.get()
+        self.span_id = new_span_id()
+        self.parent_span_id = parent.span_id if parent else None
+        self._token = _CURRENT_SPAN.set(self)
+        if self.log_start:
+            self._log("Iniciando %s", (self.name,), 'information')
+        self.started_at = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.duration_ms = (time.perf_counter() - self.started_at) * 1000.0
+        _CURRENT_SPAN.reset(self._token)
+        if exc_type is None:
+            self._log("%s concluída em %.1f ms", (self.name, self.duration_ms), 'success')
+        else:
+            self._log("%s falhou após %.1f ms: %s", (self.name, self.duration_ms, exc), 'failure')
+        return False
+
+    def _log(self, message, args, status):
+        # sample=False: descartar registros de span distorceria os percentis
+        self.logger.log_entry(self.name, message, self.process_type, status,
+                              task_name=self.task_name, source_file=self.source_file,
+                              sample=False, args=args, duration_ms=self.duration_ms,
+                              span_id=self.span_id, parent_span_id=self.parent_span_id)
+
+    def _copy(self, name, source_file):
+        """Novo span com as mesmas opções (cada chamada decorada tem o seu)"""
+        return LogSpan(self.logger, name, self.process_type, self.task_name, source_file, self.log_start)
+
+    def __call__(self, func):
+        name = self.name or func.__name__
+        source_file = self.source_file or os.path.basename(func.__code__.co_filename)
+
+        import inspect
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with self._copy(name, source_file):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with self._copy(name, source_file):
+                return func(*args, **kwargs)
+        return wrapper
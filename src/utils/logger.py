@@ -5,15 +5,20 @@ import logging
 import os
 import time
 import datetime
-import inspect
-import psutil
-import psycopg2
-import textwrap
+import sys
+import threading
+import warnings
 from enum import Enum
-from dotenv import load_dotenv
-
-# Carrega variáveis de ambiente
-load_dotenv()
+from src.utils.environment_loader import get_environment
+from src.utils.log_record import LogRecord, LOG_COLUMNS, format_jsonl
+from src.utils.log_sinks import AsyncDatabaseLogSink, DatabaseLogSink, execute_values
+from src.utils.log_file_writer import RotatingLogFileWriter
+from src.utils.system_metrics import SystemMetricsSampler
+from src.utils.log_formatter import LogTableFormatter
+from src.utils.log_filters import LogSampler, parse_level
+from src.utils.log_multiprocess import LogForwarder
+from src.utils.log_spans import LogSpan, current_span
+from src.infra.db.migrations import ensure_schema
 
 class ProcessType(str, Enum):
     ROBOTIC = "robotic"
@@ -28,15 +33,90 @@ class LogStatus(str, Enum):
     CRITICAL = "critical"
     INFO = "information"
 
+# Formatos aceitos para o arquivo de log
+LOG_FILE_FORMATS = ('table', 'jsonl', 'both')
+
+# Cache (arquivo, função) por code object usado em _get_caller_info
+_CALLER_CACHE = {}
+
+# Nível do módulo logging correspondente a cada status
+_STATUS_LEVELS = {
+    LogStatus.CRITICAL: logging.CRITICAL,
+    LogStatus.FAILURE: logging.ERROR,
+    LogStatus.WARNING: logging.WARNING,
+    LogStatus.INFO: logging.INFO,
+    LogStatus.SUCCESS: logging.INFO
+}
+
+# Valores de ProcessType aceitos como string
+_PROCESS_TYPE_VALUES = {member.value for member in ProcessType}
+
+
+def _split_process_type(message, args, process_type):
+    """(process_type, args) aceitando ainda o process_type posicional (log_info(nome, msg, ProcessType.X))
+
+    Só vale com um único argumento extra que seja um tipo de processo e uma
+    mensagem sem placeholders %-style; nesse caso emite DeprecationWarning.
+    """
+    if len(args) != 1:
+        return process_type, args
+    value = args[0]
+    if not isinstance(value, ProcessType) and not (isinstance(value, str) and value.lower() in _PROCESS_TYPE_VALUES):
+        return process_type, args
+    if isinstance(message, str) and '%' in message.replace('%%', ''):
+        return process_type, args
+    warnings.warn("process_type posicional nos métodos log_* está obsoleto; use process_type=...",
+                  DeprecationWarning, stacklevel=3)
+    return value, ()
+
+
 class EnhancedLogger:
-    def __init__(self, project_name):
+    def __init__(self, project_name, file_options=None, metrics_options=None, file_format='table', forward_to=None):
+        """
+        Args:
+            project_name (str): Nome do projeto (usado no nome do arquivo e como schema)
+            file_options (dict, optional): Opções do RotatingLogFileWriter
+                (max_bytes, rotate_daily, flush_interval, flush_bytes, compress)
+            metrics_options (dict, optional): Opções do SystemMetricsSampler
+                (interval, enabled)
+            file_format (str): 'table' (tabela formatada), 'jsonl' (JSON Lines,
+                um objeto por registro) ou 'both'
+            forward_to (str, optional): Endereço de um LogWriterProcess; os registros
+                são enviados a ele em vez de gravados em arquivo/banco por este processo
+        """
+        if file_format not in LOG_FILE_FORMATS:
+            raise ValueError(f"Formato de arquivo de log inválido: {file_format}")
         self.project_name = project_name
         self.log_dir = os.path.join(os.getcwd(), 'logs')  # Usa o diretório atual + /logs
-        self.log_file = None
+        self.file_options = file_options or {}
+        self.file_format = file_format
+        self.file_writer = None
+        self.jsonl_writer = None
+        self.forward_to = forward_to
+        self.forwarder = None
+        self.metrics_sampler = SystemMetricsSampler(**(metrics_options or {}))
         self.db_connection = None
+        self.db_sink = None
+        self.db_sink_options = None
+        self.db_outbox = None  # LocalOutbox para registros que não chegaram ao banco
+        self._db_held = None  # Registros retidos enquanto a conexão é aberta (hold_db_records)
+        self._db_held_limit = 0
+        self._db_held_dropped = 0
+        self._db_hold_lock = threading.Lock()
+        self.partitioned_logs = True  # Tabela de logs particionada por mês em log_date
         self.debug_mode = True  # Valor padrão
+        self.capture_caller = True  # Desative para não inspecionar a stack a cada log
+        get_environment()  # Garante o .env carregado antes de ler BOT_NAME
         self.bot_name = os.getenv('BOT_NAME', 'Default Bot')  # Usa a variável de ambiente ou valor padrão
         
+        # Nível mínimo por destino; registros abaixo de todos são descartados antes de qualquer trabalho
+        self.file_level = logging.DEBUG
+        self.console_level = logging.DEBUG
+        self.db_level = logging.DEBUG
+        
+        # Amostragem/limite de taxa por ponto de chamada (desativada por padrão)
+        self.sampler = None
+        
         # Formato de colunas - definições de largura
         self.col_widths = {
             'timestamp': 25,    # TIMESTAMP
@@ -54,22 +134,44 @@ class EnhancedLogger:
         # Quantidade de espaço entre borda e conteúdo da coluna
         self.padding = 1
         
+        # Templates de linha, separador e cabeçalho montados uma única vez
+        self.formatter = LogTableFormatter(self.col_widths, self.padding, message_width=self.message_width)
+        
         # Setup inicial
         self.setup_logging()
         
     def setup_logging(self):
         """Configuração inicial do logging"""
+        import atexit
+        
+        # Em modo multiprocesso o processo escritor é o dono do arquivo, do console e do banco
+        if self.forward_to:
+            self.forwarder = LogForwarder(self.forward_to)
+            atexit.register(self._add_closing_line)
+            return
+        
         # Ensure log directory exists
         os.makedirs(self.log_dir, exist_ok=True)
         
-        # Create log file with timestamp
-        timestamp = datetime.datetime.now().strftime('%Y%m%d_%H%M%S')
-        self.log_file = os.path.join(self.log_dir, f"rpa_{self.project_name}_{timestamp}.log")
+        # Abre o arquivo de log com timestamp; o handle fica aberto durante toda a execução
+        # e cada novo segmento (após rotação) começa com o cabeçalho
+        if self.file_format in ('table', 'both'):
+            self.file_writer = RotatingLogFileWriter(
+                self.log_dir,
+                f"rpa_{self.project_name}",
+                header_factory=self._create_header,
+                footer_factory=lambda: self._create_separator_line() + "\n",
+                **self.file_options
+            )
         
-        # Define UTF-8 encoding for the log file
-        with open(self.log_file, 'w', encoding='utf-8') as f:
-            # Escreve o cabeçalho do arquivo de log
-            f.write(self._create_header())
+        # Arquivo JSON Lines com os mesmos campos da tabela de logs do banco
+        if self.file_format in ('jsonl', 'both'):
+            self.jsonl_writer = RotatingLogFileWriter(
+                self.log_dir,
+                f"rpa_{self.project_name}",
+                extension='.jsonl',
+                **self.file_options
+            )
         
         # Set up standard Python logging
         logging.basicConfig(
@@ -81,45 +183,21 @@ class EnhancedLogger:
         )
         
         # Register function to add closing line on program exit
-        import atexit
         atexit.register(self._add_closing_line)
         
     def _create_separator_line(self):
         """Cria a linha separadora com + alinhado precisamente com as barras verticais"""
-        separator = "+"
-        for name, width in self.col_widths.items():
-            # Adiciona dois traços extras para compensar o espaço de padding em cada lado
-            separator += "-" * (width + self.padding * 2) + "+"
-        return separator
+        return self.formatter.separator
         
     def _create_header(self):
         """Cria o cabeçalho com alinhamento preciso e títulos melhor centralizados"""
-        # Títulos das colunas com um espaço adicional em cada lado para melhor centralização
-        headers = {
-            'timestamp': " TIMESTAMP ",
-            'task': " TASK ",
-            'function': " FUNCTION ",
-            'file': " FILE ",
-            'message': " MESSAGE ",
-            'process_type': " PROCESS_TYPE ",
-            'status': " STATUS "
-        }
-        
-        # Criar linha separadora
-        separator = self._create_separator_line()
-        
-        # Criar linha de cabeçalho
-        header_line = "|"
-        for name, width in self.col_widths.items():
-            # Centraliza o título na coluna
-            title = headers[name]
-            padding_left = self.padding + (width - len(title) + 1) // 2  # +2 para compensar os espaços adicionados
-            padding_right = width - (len(title) - 1) - padding_left + self.padding  # -2 para compensar os espaços adicionados
-            header_line += " " * padding_left + title + " " * padding_right + "|"
-        
-        # Monta o cabeçalho completo
-        full_header = separator + "\n" + header_line + "\n" + separator + "\n"
-        return full_header
+        return self.formatter.header
+
+    @property
+    def log_file(self):
+        """Caminho do segmento de log atual (tabela, ou JSONL se for o único formato)"""
+        writer = self.file_writer or self.jsonl_writer
+        return writer.path if writer else None
 
     def connect_to_db(self, connection):
         """Connect to PostgreSQL database
@@ -127,9 +205,18 @@ class EnhancedLogger:
         Args:
             connection: Can be either a psycopg2 connection object or a connection string
         """
+        # Em modo multiprocesso a conexão de logs pertence ao processo escritor
+        if self.forwarder:
+            return True
+            
+        # Mesma conexão já associada: tabela já verificada
+        if connection is not None and connection is self.db_connection:
+            return True
+            
         try:
             # Se for uma string de conexão, estabelecer conexão
             if isinstance(connection, str):
+                import psycopg2
                 self.db_connection = psycopg2.connect(connection)
             else:
                 # Se for um objeto de conexão, usar diretamente
@@ -137,46 +224,194 @@ class EnhancedLogger:
                 
             # Criar tabela de logs se não existir
             self.create_log_table_if_not_exists()
+            
+            # Inicia o sink em background se foi habilitado antes da conexão
+            if self.db_sink_options is not None:
+                self._start_db_sink()
+            
+            # Grava o que foi registrado enquanto a conexão era aberta
+            self.release_db_records()
             return True
         except Exception as e:
             logging.error(f"Failed to connect to database: {e}")
             return False
+
+    def hold_db_records(self, max_records=10000):
+        """Retém em memória os registros do destino banco até release_db_records()
+        
+        Usado enquanto a conexão é aberta em background: o bot já registra logs
+        e eles são gravados (em lote) assim que connect_to_db terminar. Acima de
+        `max_records` os registros retidos são descartados e contados.
+        """
+        with self._db_hold_lock:
+            if self._db_held is None:
+                self._db_held = []
+                self._db_held_limit = max(1, int(max_records))
+                self._db_held_dropped = 0
+    
+    def release_db_records(self):
+        """Encerra a retenção e envia os registros retidos ao banco (ou ao outbox sem conexão)
+        
+        Returns:
+            int: Quantidade de registros liberados
+        """
+        with self._db_hold_lock:
+            held, self._db_held = self._db_held, None
+        if not held:
+            return 0
+        if self._db_held_dropped:
+            logging.warning(f"{self._db_held_dropped} log records dropped while waiting for the database")
+        
+        if self.db_sink:
+            for record in held:
+                self.db_sink.submit(record)
+        elif self.db_connection:
+            try:
+                cursor = self.db_connection.cursor()
+                execute_values(cursor, f"INSERT INTO {self.project_name}.logs ({', '.join(LOG_COLUMNS)}) VALUES %s",
+                               held, page_size=len(held))
+                self.db_connection.commit()
+                cursor.close()
+            except Exception as e:
+                logging.error(f"Failed to write held log records to database: {e}")
+                try:
+                    self.db_connection.rollback()
+                except Exception:
+                    pass
+                if self.db_outbox:
+                    self.db_outbox.add_logs(held)
+        elif self.db_outbox:
+            self.db_outbox.add_logs(held)
+        return len(held)
+
+    def enable_db_sink(self, **options):
+        """Grava os logs no banco em background, em lotes, em vez de um INSERT por linha
+        
+        Args:
+            **options: Repassadas ao DatabaseLogSink (max_queue_size, batch_size,
+                       flush_interval, overflow_policy, block_timeout, spill_dir)
+        """
+        self.db_sink_options = options
+        if self.db_connection:
+            self._start_db_sink()
+        
+    async def enable_async_db_sink(self, async_db, max_queue_size=10000, batch_size=500, flush_interval=1.0):
+        """Grava os logs no banco a partir de um bot asyncio, sem bloquear o event loop
+        
+        Garante a tabela de logs e inicia um AsyncDatabaseLogSink no loop em
+        execução, usando o pool do AsyncDBManager informado.
+        
+        Args:
+            async_db (AsyncDBManager): Gerenciador assíncrono já configurado
+            max_queue_size (int): Registros pendentes antes de descartar
+            batch_size (int): Registros por INSERT
+            flush_interval (float): Segundos entre gravações
+        
+        Returns:
+            bool: True se o sink foi iniciado
+        """
+        if self.forwarder:
+            return True
+        try:
+            await async_db.run(lambda conn: ensure_schema(conn, self.project_name,
+                                                           partitioned=self.partitioned_logs))
+        except Exception as e:
+            logging.error(f"Failed to create log table: {e}")
+            return False
+        if self.db_sink:
+            self.db_sink.close()
+        self.db_sink = AsyncDatabaseLogSink(async_db, self.project_name, max_queue_size=max_queue_size,
+                                            batch_size=batch_size, flush_interval=flush_interval,
+                                            outbox=self.db_outbox).start()
+        return True
+        
+    def _start_db_sink(self):
+        """Cria (ou recria) o sink para a conexão atual"""
+        if self.db_sink:
+            self.db_sink.close()
+        self.db_sink = DatabaseLogSink(self.db_connection, self.project_name, outbox=self.db_outbox,
+                                       **self.db_sink_options)
+    
+    def enable_outbox(self, outbox):
+        """Guarda no outbox local (LocalOutbox) os registros que não puderem ir ao banco
+        
+        Sem conexão ou com falha na gravação, os registros do destino banco vão
+        para o arquivo e são reenviados pelo DBManager quando a conexão voltar.
+        None desativa.
+        """
+        self.db_outbox = outbox
+        if self.db_sink and hasattr(self.db_sink, 'outbox'):
+            self.db_sink.outbox = outbox
+        
+    def set_levels(self, file=None, console=None, db=None):
+        """Define o nível mínimo por destino (nomes como 'INFO' ou níveis do logging)"""
+        if file is not None:
+            self.file_level = parse_level(file)
+        if console is not None:
+            self.console_level = parse_level(console)
+        if db is not None:
+            self.db_level = parse_level(db)
+            
+    def enable_sampling(self, **options):
+        """Amostra registros repetitivos por ponto de chamada
+        
+        Args:
+            **options: Repassadas ao LogSampler (every_n, max_per_interval,
+                       interval, summary_interval, max_level)
+        """
+        sampler = LogSampler(**options)
+        self.sampler = sampler if sampler.active else None
+        
+    def get_db_sink_stats(self):
+        """Retorna os contadores do sink (queued, written, dropped, ...) ou None se desabilitado"""
+        return self.db_sink.stats() if self.db_sink else None
+        
+    def flush(self, timeout=None):
+        """Descarrega o arquivo de log e aguarda a gravação dos registros pendentes no banco"""
+        if self.file_writer:
+            self.file_writer.flush()
+        if self.jsonl_writer:
+            self.jsonl_writer.flush()
+        if self.db_sink:
+            return self.db_sink.flush(timeout)
+        return True
+        
+    async def aflush(self):
+        """Como flush(), mas aguardando o banco sem bloquear o event loop"""
+        if self.file_writer:
+            self.file_writer.flush()
+        if self.jsonl_writer:
+            self.jsonl_writer.flush()
+        if isinstance(self.db_sink, AsyncDatabaseLogSink):
+            return await self.db_sink.aflush()
+        if self.db_sink:
+            import asyncio
+            return await asyncio.get_running_loop().run_in_executor(None, self.db_sink.flush)
+        return True
+        
+    def disconnect_db(self, timeout=None):
+        """Grava os registros pendentes e desassocia o logger da conexão"""
+        if self.db_sink:
+            self.db_sink.close(timeout)
+            self.db_sink = None
+        self.db_connection = None
         
     def create_log_table_if_not_exists(self):
-        """Create log table in the database if it doesn't exist"""
+        """Create log table in the database if it doesn't exist
+        
+        A tabela é particionada por mês em log_date (ou heap com índices se
+        partitioned_logs for False); ver src/infra/db/log_schema.py. Com o
+        schema já na versão atual (src/infra/db/migrations.py) nenhuma DDL é
+        executada, apenas uma consulta de verificação.
+        """
         if not self.db_connection:
             return False
         
         try:
-            cursor = self.db_connection.cursor()
-            
             # Obter schema das configurações ou usar o nome do projeto
             schema = self.project_name
             
-            # Create schema if it doesn't exist
-            cursor.execute(f"CREATE SCHEMA IF NOT EXISTS {schema}")
-            self.db_connection.commit()
-            
-            # Create logs table with the new source_file column
-            create_table_sql = f"""
-            CREATE TABLE IF NOT EXISTS {schema}.logs (
-                id SERIAL PRIMARY KEY,
-                task_name VARCHAR(255),
-                function_name VARCHAR(255),
-                source_file VARCHAR(255),
-                cpu_usage FLOAT,
-                memory_usage FLOAT,
-                log_date DATE,
-                log_time TIME,
-                log_message TEXT,
-                process_type VARCHAR(50),
-                status VARCHAR(50),
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-            """
-            cursor.execute(create_table_sql)
-            self.db_connection.commit()
-            cursor.close()
+            ensure_schema(self.db_connection, schema, partitioned=self.partitioned_logs)
             return True
         except Exception as e:
             logging.error(f"Failed to create log table: {e}")
@@ -185,6 +420,9 @@ class EnhancedLogger:
     def _get_caller_info(self, depth=3):
         """Get information about the caller (file, function)
         
+        Usa sys._getframe e memoiza (arquivo, função) por code object, sem ler
+        o código-fonte do disco como inspect.getframeinfo fazia.
+        
         Args:
             depth (int): How far back in the stack to look for the caller
                        2 = the direct caller of this method
@@ -195,183 +433,281 @@ class EnhancedLogger:
             tuple: (filename, function_name)
         """
         try:
-            # Pega a stack de chamadas até o depth desejado
-            frame = inspect.currentframe()
-            for _ in range(depth):
-                if frame.f_back is None:
-                    break
+            frame = sys._getframe(depth)
+        except ValueError:
+            # Stack mais curta que depth: usa o frame mais externo disponível
+            frame = sys._getframe(1)
+            while frame.f_back is not None:
                 frame = frame.f_back
-            
-            # Extrai informações do frame
-            if frame:
-                frame_info = inspect.getframeinfo(frame)
-                filename = os.path.basename(frame_info.filename)
-                function_name = frame_info.function
-                return filename, function_name
         except Exception:
-            pass
+            return "unknown.py", "unknown"
         
-        return "unknown.py", "unknown"
+        code = frame.f_code
+        info = _CALLER_CACHE.get(code)
+        if info is None:
+            info = (os.path.basename(code.co_filename), code.co_name)
+            _CALLER_CACHE[code] = info
+        return info
         
-    def log_entry(self, function_name, log_message, process_type=ProcessType.SYSTEM, status=LogStatus.INFO, task_name=None, extra_data=None):
-        """Log a new entry to both file and database with precise alignment"""
-        # Get system usage stats
-        cpu_usage = psutil.cpu_percent()
-        memory_usage = psutil.virtual_memory().percent
+    def log_entry(self, function_name, log_message, process_type=ProcessType.SYSTEM, status=LogStatus.INFO, task_name=None, extra_data=None, source_file=None, sample=True, args=None,
+                  duration_ms=None, span_id=None, parent_span_id=None):
+        """Log a new entry to both file and database with precise alignment
         
-        # Get current date and time
-        now = datetime.datetime.now()
-        timestamp = now.strftime('%Y-%m-%d %H:%M:%S')
-        log_date = now.strftime('%Y-%m-%d')
-        log_time = now.strftime('%H:%M:%S')
-        
-        # Use task_name from environment variable if not provided
-        if task_name is None:
-            task_name = self.bot_name
+        Se source_file for informado (ou capture_caller estiver desativado),
+        a inspeção da stack para descobrir o arquivo chamador é pulada.
+        Registros abaixo do nível de todos os destinos, ou descartados pela
+        amostragem (sample=False ignora a amostragem), retornam antes de
+        qualquer coleta de métricas, formatação ou I/O.
         
-        # Get caller info (file) - obtenha apenas o arquivo, o nome da função já é fornecido
-        source_file, _ = self._get_caller_info(depth=3)
+        A mensagem só é montada depois desses filtros: log_message pode ser uma
+        string com placeholders %-style (valores em args) ou uma função sem
+        argumentos que retorna o texto.
         
+        duration_ms/span_id/parent_span_id são preenchidos pelos spans (ver
+        span()); fora deles, registros feitos dentro de um span ativo herdam
+        o span_id desse span.
+        """
         # Validate enum values
         if not isinstance(process_type, ProcessType):
             try:
                 process_type = ProcessType(process_type.lower())
-            except ValueError:
+            except (AttributeError, ValueError):
                 process_type = ProcessType.SYSTEM
                 
         if not isinstance(status, LogStatus):
             try:
                 status = LogStatus(status.lower())
-            except ValueError:
+            except (AttributeError, ValueError):
                 status = LogStatus.INFO
         
-        # Format status
-        status_str = status.value
+        # Verifica os destinos antes de qualquer trabalho caro
+        log_level = _STATUS_LEVELS[status]
+        to_file = log_level >= self.file_level
+        to_console = log_level >= self.console_level
+        to_db = (self.db_connection is not None or self.db_sink is not None or self.db_outbox is not None
+                 or self._db_held is not None or self.forwarder is not None) and log_level >= self.db_level
+        if not (to_file or to_console or to_db):
+            return
         
-        # Quebra a mensagem em múltiplas linhas se necessário
-        message_lines = textwrap.wrap(log_message, width=self.message_width)
-        if not message_lines:
-            message_lines = [""]
-            
-        # Prepara valores para cada coluna (truncando se necessário)
-        values = {
-            'timestamp': timestamp[:self.col_widths['timestamp']],
-            'task': task_name[:self.col_widths['task']],
-            'function': function_name[:self.col_widths['function']],
-            'file': source_file[:self.col_widths['file']],
-            'message': message_lines[0],
-            'process_type': process_type.value[:self.col_widths['process_type']],
-            'status': status_str[:self.col_widths['status']]
-        }
+        # Amostragem por ponto de chamada (quem chamou log_info/log_error/...)
+        suppressed = 0
+        if sample and self.sampler and log_level <= self.sampler.max_level:
+            frame = sys._getframe(2)
+            allowed, suppressed = self.sampler.allow((frame.f_code, frame.f_lineno), function_name)
+            if not allowed:
+                return
         
-        # Formata a linha usando o mesmo padrão de padding que o cabeçalho
-        log_line = "|"
-        for name, width in self.col_widths.items():
-            content = values[name]
-            padding_right = width - len(content) + self.padding
-            log_line += " " * self.padding + content + " " * padding_right + "|"
-            
-        # Escreve no arquivo de log com codificação UTF-8
-        with open(self.log_file, 'a', encoding='utf-8') as f:
-            f.write(log_line + "\n")
-            
-            # Se houver mais linhas na mensagem, adiciona-as com alinhamento preciso
-            if len(message_lines) > 1:
-                # Cria linha de continuação para cada linha adicional da mensagem
-                for i in range(1, len(message_lines)):
-                    cont_line = "|"
-                    for name, width in self.col_widths.items():
-                        if name == 'message':
-                            # A coluna de mensagem tem conteúdo
-                            content = message_lines[i]
-                            padding_right = width - len(content) + self.padding
-                            cont_line += " " * self.padding + content + " " * padding_right + "|"
-                        else:
-                            # Outras colunas ficam vazias
-                            cont_line += " " * (width + self.padding * 2) + "|"
-                    f.write(cont_line + "\n")
+        # Monta a mensagem apenas agora que o registro será emitido
+        log_message = self._render_message(log_message, args)
+        
+        # Get system usage stats (último snapshot do sampler, sem consultar o kernel)
+        metrics = self.metrics_sampler.snapshot
+        cpu_usage = metrics.cpu_usage
+        memory_usage = metrics.memory_usage
+        
+        # Get current date and time
+        now = datetime.datetime.now()
+        log_date = now.strftime('%Y-%m-%d')
+        log_time = now.strftime('%H:%M:%S')
+        
+        # Use task_name from environment variable if not provided
+        if task_name is None:
+            task_name = self.bot_name
+        
+        # Get caller info (file) - obtenha apenas o arquivo, o nome da função já é fornecido
+        if source_file is None:
+            source_file = self._get_caller_info(depth=3)[0] if self.capture_caller else ""
+        
+        # Associa o registro ao span ativo (etapa em andamento)
+        if span_id is None:
+            span = current_span()
+            if span is not None:
+                span_id = span.span_id
+        
+        # Reporta os registros descartados deste ponto antes do registro atual
+        if suppressed:
+            self._log_suppressed(function_name, suppressed, process_type, task_name, source_file)
+        
+        record = LogRecord(task_name, function_name, source_file, cpu_usage, memory_usage,
+                           log_date, log_time, log_message, process_type.value, status.value,
+                           duration_ms, span_id, parent_span_id)
+        self._emit(record, now, status, to_file, to_console, to_db)
+        
+        # Resumo periódico dos pontos que pararam de emitir
+        if self.sampler:
+            self._flush_suppressed_summaries()
+    
+    @staticmethod
+    def _render_message(message, args):
+        """Resolve mensagens adiadas (função sem argumentos e/ou placeholders %-style)"""
+        if callable(message):
+            try:
+                message = message()
+            except Exception as e:
+                return f"<erro ao montar mensagem: {e!r}>"
+        if args:
+            try:
+                return str(message) % args
+            except (TypeError, ValueError, KeyError):
+                # Como no módulo logging, não deixa um formato inválido derrubar o bot
+                return f"{message} {args!r}"
+        return message if isinstance(message, str) else str(message)
+    
+    def _emit(self, record, now, status, to_file, to_console, to_db):
+        """Grava um registro já preparado nos destinos selecionados"""
+        # Em modo multiprocesso o registro vai para o processo escritor
+        if self.forwarder:
+            self.forwarder.send((record, now, status, to_file, to_console, to_db))
+            return
+        
+        # Formata a entrada (quebra a mensagem apenas se não couber na coluna)
+        critical = status == LogStatus.CRITICAL
+        if to_file and self.file_writer:
+            entry = self.formatter.format_entry(
+                (f"{record.log_date} {record.log_time}", record.task_name, record.function_name,
+                 record.source_file, record.log_message, record.process_type, record.status),
+                critical=critical
+            )
             
-            # Adiciona separador após erros críticos para ênfase
-            if status == LogStatus.CRITICAL:
-                f.write(self._create_separator_line() + "\n")
+            # Escreve no handle persistente; CRITICAL força o flush imediato
+            self.file_writer.write(entry, force_flush=critical)
         
         # Log to console
-        log_level = self._get_log_level(status)
-        logging.log(log_level, f"{task_name} - {function_name}: {log_message}")
+        if to_console:
+            logging.log(_STATUS_LEVELS[status], f"{record.task_name} - {record.function_name}: {record.log_message}")
+        
+        # JSON Lines recebe os mesmos campos da tabela de logs
+        if to_file and self.jsonl_writer:
+            self.jsonl_writer.write(format_jsonl(record, now), force_flush=critical)
         
         # Save to database if connected
-        self._log_to_database(task_name, function_name, source_file, cpu_usage, memory_usage, 
-                             log_date, log_time, log_message, process_type, status, extra_data)
+        if to_db and (self.db_sink or self.db_connection or self.db_outbox or self._db_held is not None):
+            self._log_to_database(record)
+    
+    def _log_suppressed(self, function_name, count, process_type=ProcessType.SYSTEM, task_name=None, source_file=None):
+        """Registra o resumo de mensagens descartadas pela amostragem"""
+        self.log_entry(function_name, f"{count} mensagens semelhantes suprimidas", process_type,
+                       LogStatus.INFO, task_name=task_name, source_file=source_file, sample=False)
+        
+    def _flush_suppressed_summaries(self, force=False):
+        """Registra os resumos pendentes do sampler (a cada summary_interval ou forçado)"""
+        for key, function_name, count in self.sampler.due_summaries(force):
+            self._log_suppressed(function_name, count, source_file=os.path.basename(key[0].co_filename))
     
     def _add_closing_line(self):
         """Add closing line to log file on program exit with exact alignment"""
-        if hasattr(self, 'log_file') and self.log_file and os.path.exists(self.log_file):
-            try:
-                with open(self.log_file, 'a', encoding='utf-8') as f:
-                    f.write(self._create_separator_line() + "\n")
-            except Exception:
-                pass  # Silently fail if we can't write to the file
-                
+        if getattr(self, 'metrics_sampler', None):
+            self.metrics_sampler.stop()
+            
+        # Reporta descartes ainda não resumidos
+        if getattr(self, 'sampler', None):
+            self._flush_suppressed_summaries(force=True)
+            
+        # Grava o que ainda estiver na fila do sink antes de encerrar
+        if getattr(self, 'db_sink', None):
+            self.db_sink.close()
+            
+        for writer in (getattr(self, 'file_writer', None), getattr(self, 'jsonl_writer', None)):
+            if writer and not writer.closed:
+                try:
+                    # Grava o separador final (apenas na tabela) e fecha o handle
+                    writer.close()
+                except Exception:
+                    pass  # Silently fail if we can't write to the file
+        
+        if getattr(self, 'forwarder', None):
+            self.forwarder.close()
+            
     def _get_log_level(self, status):
         """Map log status to Python logging level"""
-        status_map = {
-            LogStatus.CRITICAL: logging.CRITICAL,
-            LogStatus.FAILURE: logging.ERROR,
-            LogStatus.WARNING: logging.WARNING,
-            LogStatus.INFO: logging.INFO,
-            LogStatus.SUCCESS: logging.INFO
-        }
-        return status_map.get(status, logging.INFO)
+        return _STATUS_LEVELS.get(status, logging.INFO)
     
-    def _log_to_database(self, task_name, function_name, source_file, cpu_usage, memory_usage, 
-                        log_date, log_time, log_message, process_type, status, extra_data):
-        """Save log entry to database"""
+    def _log_to_database(self, record):
+        """Save log entry to database (direct insert or background sink)"""
+        if self._db_held is not None:
+            with self._db_hold_lock:
+                if self._db_held is not None:
+                    if len(self._db_held) < self._db_held_limit:
+                        self._db_held.append(record)
+                    else:
+                        self._db_held_dropped += 1
+                    return True
+        
+        if self.db_sink:
+            return self.db_sink.submit(record)
+            
         if not self.db_connection:
-            return False
+            return self.db_outbox.add_log(record) if self.db_outbox else False
             
         try:
             cursor = self.db_connection.cursor()
             
-            # Converter process_type e status para string se forem enum
-            process_type_value = process_type.value if hasattr(process_type, 'value') else str(process_type)
-            status_value = status.value if hasattr(status, 'value') else str(status)
-            
             sql = f"""
             INSERT INTO {self.project_name}.logs 
-            (task_name, function_name, source_file, cpu_usage, memory_usage, log_date, log_time, 
-            log_message, process_type, status)
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+            ({', '.join(LOG_COLUMNS)})
+            VALUES ({', '.join(['%s'] * len(LOG_COLUMNS))})
             """
             
-            cursor.execute(
-                sql,
-                (task_name, function_name, source_file, cpu_usage, memory_usage, log_date, log_time, 
-                log_message, process_type_value, status_value)
-            )
+            cursor.execute(sql, record)
             
             self.db_connection.commit()
             cursor.close()
             return True
         except Exception as e:
             logging.error(f"Failed to log to database: {e}")
-            return False
+            # Conexão perdida: para de tentar a cada registro até o DBManager reconectar (connect_to_db)
+            if getattr(self.db_connection, 'closed', False):
+                logging.error("Database logging suspended until the connection is restored")
+                self.db_connection = None
+            else:
+                try:
+                    self.db_connection.rollback()
+                except Exception:
+                    pass
+            return self.db_outbox.add_log(record) if self.db_outbox else False
+    
+    def span(self, name=None, process_type=ProcessType.PROCESS, task_name=None, log_start=False):
+        """Mede uma etapa e registra sua duração em milissegundos
+        
+        Uso como context manager (`with logger.span("extrair_dados"):`) ou
+        decorator (`@logger.span()`, usando o nome da função). Spans abertos
+        dentro de outro span gravam o span_id do externo em parent_span_id.
+        
+        Args:
+            name (str, optional): Nome da etapa (function_name do registro)
+            process_type (ProcessType): Tipo de processo dos registros do span
+            task_name (str, optional): Nome da tarefa; padrão BOT_NAME
+            log_start (bool): Registra também uma linha ao iniciar a etapa
+        """
+        source_file = None
+        if name is not None and self.capture_caller:
+            source_file = self._get_caller_info(depth=2)[0]
+        return LogSpan(self, name, process_type, task_name, source_file, log_start)
     
-    def log_info(self, function_name, message, process_type=ProcessType.SYSTEM):
-        """Log information message"""
-        self.log_entry(function_name, message, process_type, LogStatus.INFO)
+    def log_info(self, function_name, message, *args, process_type=ProcessType.SYSTEM):
+        """Log information message
+        
+        Exemplo: logger.log_info("main", "Processados %d itens de %s", total, origem, process_type=ProcessType.BUSINESS)
+        """
+        process_type, args = _split_process_type(message, args, process_type)
+        self.log_entry(function_name, message, process_type, LogStatus.INFO, args=args)
     
-    def log_success(self, function_name, message, process_type=ProcessType.SYSTEM):
+    def log_success(self, function_name, message, *args, process_type=ProcessType.SYSTEM):
         """Log success message"""
-        self.log_entry(function_name, message, process_type, LogStatus.SUCCESS)
+        process_type, args = _split_process_type(message, args, process_type)
+        self.log_entry(function_name, message, process_type, LogStatus.SUCCESS, args=args)
     
-    def log_warning(self, function_name, message, process_type=ProcessType.SYSTEM):
+    def log_warning(self, function_name, message, *args, process_type=ProcessType.SYSTEM):
         """Log warning message"""
-        self.log_entry(function_name, message, process_type, LogStatus.WARNING)
+        process_type, args = _split_process_type(message, args, process_type)
+        self.log_entry(function_name, message, process_type, LogStatus.WARNING, args=args)
     
-    def log_error(self, function_name, message, process_type=ProcessType.SYSTEM):
+    def log_error(self, function_name, message, *args, process_type=ProcessType.SYSTEM):
         """Log error message"""
-        self.log_entry(function_name, message, process_type, LogStatus.FAILURE)
+        process_type, args = _split_process_type(message, args, process_type)
+        self.log_entry(function_name, message, process_type, LogStatus.FAILURE, args=args)
     
-    def log_critical(self, function_name, message, process_type=ProcessType.SYSTEM):
+    def log_critical(self, function_name, message, *args, process_type=ProcessType.SYSTEM):
         """Log critical error message"""
-        self.log_entry(function_name, message, process_type, LogStatus.CRITICAL)
\ No newline at end of file
+        process_type, args = _split_process_type(message, args, process_type)
+        self.log_entry(function_name, message, process_type, LogStatus.CRITICAL, args=args)
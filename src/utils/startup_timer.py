@@ -0,0 +1,56 @@
+# src/utils/startup_timer.py
+# Tempos por fase da inicialização da aplicação
+
+import contextlib
+import threading
+import time
+
+
+class StartupTimer:
+    """
+    Registra a duração de cada fase da inicialização (perf_counter).
+
+    Fases podem rodar em threads diferentes (ex.: conexão com o banco em
+    background); cada uma guarda o início relativo ao timer, então o
+    relatório mostra também o que correu em paralelo.
+
+    Uso:
+        timer = StartupTimer()
+        with timer.phase("logger"):
+            ...
+        timer.format()  # "logger 12.3 ms | total 12.5 ms"
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self._phases = []
+        self._lock = threading.Lock()
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, start, time.perf_counter())
+
+    def record(self, name, start, end):
+        """Registra uma fase a partir de instantes de perf_counter"""
+        with self._lock:
+            self._phases.append((name, (start - self.started) * 1000, (end - start) * 1000))
+
+    def phases(self, prefix=None, exclude=None):
+        """Lista de (nome, início_ms, duração_ms), na ordem de conclusão, filtrada por prefixo"""
+        with self._lock:
+            return [phase for phase in self._phases
+                    if (prefix is None or phase[0].startswith(prefix))
+                    and (exclude is None or not phase[0].startswith(exclude))]
+
+    def elapsed_ms(self):
+        return (time.perf_counter() - self.started) * 1000
+
+    def format(self, prefix=None, exclude=None):
+        """Resumo de uma linha: 'fase 1.2 ms | ... | total X ms' (total desde a criação do timer)"""
+        parts = [f"{name} {duration:.1f} ms" for name, _, duration in self.phases(prefix, exclude)]
+        parts.append(f"total {self.elapsed_ms():.1f} ms")
+        return " | ".join(parts)
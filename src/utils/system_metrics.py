@@ -0,0 +1,84 @@
+# src/utils/system_metrics.py
+# Amostragem periódica de métricas do sistema para o EnhancedLogger
+
+import threading
+import time
+from collections import namedtuple
+
+# Última leitura disponível; cpu/memória da máquina em %, processo em % e bytes
+MetricsSnapshot = namedtuple('MetricsSnapshot', [
+    'cpu_usage',
+    'memory_usage',
+    'process_cpu',
+    'process_rss',
+    'sampled_at',
+])
+
+EMPTY_SNAPSHOT = MetricsSnapshot(0.0, 0.0, 0.0, 0, 0.0)
+
+
+class SystemMetricsSampler:
+    """
+    Coleta métricas de CPU e memória em uma thread daemon a cada `interval`
+    segundos. A leitura em `snapshot` é apenas um acesso a atributo, então
+    registrar um log não executa nenhuma consulta ao kernel.
+
+    Com `enabled=False` nenhuma thread é criada e `snapshot` permanece zerado
+    (útil em testes).
+    """
+
+    def __init__(self, interval=1.0, enabled=True):
+        self.interval = float(interval)
+        self.enabled = enabled
+        self.snapshot = EMPTY_SNAPSHOT
+        self._process = None
+        self._stop_event = threading.Event()
+        self._thread = None
+
+        if self.enabled:
+            self.start()
+
+    def start(self):
+        """Inicia a thread de amostragem (idempotente)"""
+        if self._thread and self._thread.is_alive():
+            return
+        import psutil  # Import tardio: só com a amostragem habilitada
+        self._process = psutil.Process()
+        # A primeira chamada de cpu_percent() só estabelece a referência e retorna 0.0
+        psutil.cpu_percent(interval=None)
+        self._process.cpu_percent(interval=None)
+        self.sample()
+
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="system-metrics-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Interrompe a amostragem mantendo o último snapshot"""
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(self.interval + 1)
+            self._thread = None
+
+    def sample(self):
+        """Faz uma leitura imediata e atualiza o snapshot"""
+        try:
+            import psutil
+            process = self._process or psutil.Process()
+            with process.oneshot():
+                process_cpu = process.cpu_percent(interval=None)
+                process_rss = process.memory_info().rss
+            self.snapshot = MetricsSnapshot(
+                psutil.cpu_percent(interval=None),
+                psutil.virtual_memory().percent,
+                process_cpu,
+                process_rss,
+                time.time(),
+            )
+        except Exception:
+            pass  # Mantém o último snapshot válido
+        return self.snapshot
+
+    def _run(self):
+        while not self._stop_event.wait(self.interval):
+            self.sample()
@@ -0,0 +1,106 @@
+# Tests for async_db_manager module and the async log sink
+
+import threading
+import unittest
+from unittest import mock
+
+from src.config.settings import Settings
+from src.infra.db.async_db_manager import AsyncDBManager
+from tests.test_db_manager import StreamingConnection
+from tests.test_logger import make_logger
+
+
+def make_async_db(test, rows=()):
+    """AsyncDBManager com conexões falsas e banco habilitado"""
+    settings = Settings()
+    settings.DB_CONFIG['enabled'] = True
+    settings.DB_POOL_CONFIG.update(min_size=1, max_size=2)
+    db = AsyncDBManager(settings, logger=mock.Mock())
+    db.connections = []
+
+    def connect():
+        connection = StreamingConnection(list(rows))
+        connection.thread = threading.current_thread().name
+        db.connections.append(connection)
+        return connection
+
+    db._open_connection = connect
+    return db
+
+
+class TestAsyncDBManager(unittest.IsolatedAsyncioTestCase):
+    async def test_queries_run_off_the_event_loop(self):
+        db = make_async_db(self, rows=[(1, 'a'), (2, 'b')])
+        self.assertTrue(await db.connect())
+        self.assertEqual(await db.fetch("SELECT id, value FROM t"), [(1, 'a'), (2, 'b')])
+        self.assertEqual(await db.execute("UPDATE t SET value = %s", ('c',)), 2)
+        self.assertTrue(db.connections[0].thread.startswith('async-db'))
+        self.assertEqual(db.connections[0].commits, 1)
+        self.assertEqual(db.stats()['in_use'], 0)
+        await db.close()
+        self.assertTrue(db.connections[0].closed)
+
+    async def test_copy_writes_chunks(self):
+        db = make_async_db(self)
+        await db.connect()
+        self.assertEqual(await db.copy("rpa.items", ['id'], [(i,) for i in range(5)], chunk_size=2), 5)
+        self.assertEqual(len(db.connections[0].copies), 3)
+        await db.close()
+
+    async def test_errors_are_logged_and_raised(self):
+        db = make_async_db(self)
+        await db.connect()
+        with mock.patch.object(StreamingConnection, 'cursor', side_effect=RuntimeError("boom")):
+            with self.assertRaises(RuntimeError):
+                await db.fetch("SELECT 1")
+        db.logger.log_error.assert_called_once()
+        await db.close()
+
+
+class TestAsyncLogSink(unittest.IsolatedAsyncioTestCase):
+    async def test_logger_writes_batches_through_async_db(self):
+        logger = make_logger(self)
+        logger.set_levels(console='CRITICAL')
+        db = make_async_db(self)
+        await db.connect()
+
+        with mock.patch('src.utils.logger.ensure_schema') as bootstrap, \
+                mock.patch('src.utils.log_sinks.execute_values') as execute_values:
+            self.assertTrue(await logger.enable_async_db_sink(db, batch_size=2, flush_interval=60))
+            bootstrap.assert_called_once()
+            for i in range(3):
+                logger.log_info('step', f'item {i}')
+            self.assertTrue(await logger.aflush())
+
+        self.assertEqual([len(c.args[2]) for c in execute_values.call_args_list], [2, 1])
+        stats = logger.get_db_sink_stats()
+        self.assertEqual((stats['queued'], stats['written'], stats['pending']), (3, 3, 0))
+        await logger.db_sink.aclose()
+        await db.close()
+
+
+    async def test_failed_batch_goes_to_outbox(self):
+        logger = make_logger(self)
+        logger.set_levels(console='CRITICAL')
+        outbox = mock.Mock()
+        outbox.add_logs.return_value = True
+        logger.enable_outbox(outbox)
+        db = make_async_db(self)
+        await db.connect()
+
+        with mock.patch('src.utils.logger.ensure_schema'), \
+                mock.patch('src.utils.log_sinks.execute_values', side_effect=RuntimeError("server closed")):
+            self.assertTrue(await logger.enable_async_db_sink(db, batch_size=5, flush_interval=60))
+            for i in range(2):
+                logger.log_info('step', f'item {i}')
+            await logger.aflush()
+
+        self.assertEqual([record.log_message for record in outbox.add_logs.call_args.args[0]], ['item 0', 'item 1'])
+        stats = logger.get_db_sink_stats()
+        self.assertEqual((stats['outboxed'], stats['failed'], stats['pending']), (2, 0, 0))
+        self.assertNotIn('spilled', stats)
+        await logger.db_sink.aclose()
+        await db.close()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,56 @@
+# Tests for checkpoint module
+
+import os
+import tempfile
+import unittest
+
+from src.modules.checkpoint import MANIFEST, CheckpointStore
+
+
+class TestCheckpointStore(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.directory = tmp.name
+
+    def test_saved_outputs_survive_reopen(self):
+        store = CheckpointStore(self.directory, 'run')
+        self.assertFalse(os.path.exists(store.path))
+        store.save('extract/source a', {'rows': [1, 2]}, duration_ms=12.5)
+        store.save('transform', [2, 4], depends_on=['extract/source a'])
+
+        reopened = CheckpointStore(self.directory, 'run')
+        self.assertTrue(reopened.is_complete('extract/source a'))
+        self.assertTrue(reopened.is_complete('transform', ['extract/source a']))
+        self.assertFalse(reopened.is_complete('transform', ['other']))
+        self.assertEqual(reopened.load('extract/source a'), {'rows': [1, 2]})
+        self.assertEqual(reopened.completed()['extract/source a']['duration_ms'], 12.5)
+        self.assertEqual([name for name in os.listdir(store.path) if name.endswith('.tmp')], [])
+
+    def test_missing_artifact_is_not_complete(self):
+        store = CheckpointStore(self.directory, 'run')
+        store.save('extract', [1])
+        os.remove(os.path.join(store.path, store.completed()['extract']['artifact']))
+        self.assertFalse(store.is_complete('extract'))
+
+    def test_invalidate_and_clear(self):
+        store = CheckpointStore(self.directory, 'run')
+        store.save('extract', [1])
+        store.save('load', 1, depends_on=['extract'])
+        self.assertEqual(store.invalidate(['extract', 'unknown']), ['extract'])
+        self.assertFalse(CheckpointStore(self.directory, 'run').is_complete('extract'))
+        store.clear()
+        self.assertFalse(os.path.exists(store.path))
+        self.assertEqual(store.completed(), {})
+
+    def test_corrupted_manifest_starts_over(self):
+        os.makedirs(os.path.join(self.directory, 'run'))
+        with open(os.path.join(self.directory, 'run', MANIFEST), 'w') as f:
+            f.write('{truncado')
+        with self.assertLogs(level='ERROR'):
+            store = CheckpointStore(self.directory, 'run')
+        self.assertEqual(store.completed(), {})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,210 @@
+# Tests for circuit_breaker module and DBManager reconnection
+
+import threading
+import time
+import unittest
+from unittest import mock
+
+import psycopg2
+
+from src.infra.db.circuit_breaker import CircuitBreaker, backoff_delay
+from src.infra.db.db_manager import DBManager
+from tests.test_db_manager import make_manager
+from tests.test_logger import make_logger
+
+
+class LogCursor:
+    def __init__(self, connection):
+        self.connection = connection
+
+    def execute(self, sql, params=None):
+        self.connection.executed.append(sql)
+        if self.connection.down:
+            self.connection.closed = 2
+            raise psycopg2.OperationalError("server closed the connection unexpectedly")
+        if 'INSERT' in sql:
+            self.connection.messages.append(params.log_message)
+
+    def close(self):
+        pass
+
+
+class LogConnection:
+    """Conexão dedicada falsa: guarda as mensagens de log gravadas; `down` simula a queda"""
+
+    def __init__(self):
+        self.closed = 0
+        self.down = False
+        self.messages = []
+        self.executed = []
+
+    def cursor(self):
+        return LogCursor(self)
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        self.closed = 1
+
+
+class TestCircuitBreaker(unittest.TestCase):
+    def test_opens_after_threshold_and_half_opens_once(self):
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0.02, max_reset_timeout=1)
+        self.assertFalse(breaker.record_failure())
+        self.assertTrue(breaker.record_failure())
+        self.assertEqual(breaker.state, CircuitBreaker.OPEN)
+        self.assertFalse(breaker.allow())
+
+        time.sleep(0.03)
+        self.assertTrue(breaker.allow())   # Chamada de teste
+        self.assertFalse(breaker.allow())  # Demais aguardam o resultado
+        self.assertTrue(breaker.record_success())  # Voltou depois da queda
+        self.assertFalse(breaker.record_success())
+        self.assertEqual(breaker.state, CircuitBreaker.CLOSED)
+        self.assertTrue(breaker.allow())
+
+    def test_failed_trial_reopens_with_longer_timeout(self):
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.02, max_reset_timeout=10)
+        breaker.trip()
+        first = breaker.retry_in
+        time.sleep(0.03)
+        self.assertTrue(breaker.allow())
+        self.assertTrue(breaker.record_failure())
+        self.assertGreater(breaker.retry_in, first)
+
+    def test_backoff_is_bounded(self):
+        for attempt in range(10):
+            self.assertLessEqual(backoff_delay(attempt, base=0.5, cap=4), 4)
+
+
+class TestReconnect(unittest.TestCase):
+    def setUp(self):
+        self.manager = make_manager(self, [])
+        self.manager._pool = None
+        self.manager.settings.DB_CONFIG['enabled'] = True
+        self.manager.settings.SETTINGS.update(retry_attempts=3, timeout_seconds=30)
+
+    def test_connect_retries_then_fails_fast_while_open(self):
+        error = psycopg2.OperationalError("could not connect")
+        with mock.patch('src.infra.db.db_manager.psycopg2.connect', side_effect=error) as connect, \
+                mock.patch('src.infra.db.db_manager.time.sleep') as sleep:
+            self.assertFalse(self.manager.connect())
+            self.assertEqual(connect.call_count, 3)
+            self.assertEqual(sleep.call_count, 2)
+            self.assertEqual(self.manager.connection_state, CircuitBreaker.OPEN)
+
+            # Circuito aberto: nenhuma nova tentativa de rede
+            self.assertEqual(self.manager.execute_query("SELECT 1")[0], False)
+            self.assertFalse(self.manager.connect())
+            self.assertEqual(connect.call_count, 3)
+
+    def test_dead_connections_open_the_circuit(self):
+        manager = make_manager(self, [])
+        dead = psycopg2.OperationalError("server closed the connection unexpectedly")
+
+        def execute(cursor, sql, params=None):
+            cursor.connection.closed = 2
+            raise dead
+
+        with mock.patch('tests.test_db_manager.StreamingCursor.execute', execute):
+            for _ in range(2):
+                self.assertFalse(manager.execute_query("SELECT 1")[0])
+        self.assertEqual(manager.connection_state, CircuitBreaker.OPEN)
+
+        with mock.patch.object(manager._pool, 'acquire') as acquire:
+            success, message = manager.execute_query("SELECT 1")
+        self.assertFalse(success)
+        self.assertIn("indisponível", message)
+        acquire.assert_not_called()
+
+    def test_logger_is_reattached_when_database_comes_back(self):
+        logger = make_logger(self)
+        logger.set_levels(console='CRITICAL')
+        manager = make_manager(self, [])
+        DBManager.initialize_logging.return_value = logger
+        manager._breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.01, max_reset_timeout=0.01)
+        manager._connection = LogConnection()
+        logger.db_connection = manager._connection
+
+        logger.log_info("step", "antes da queda")
+        manager._connection.down = True
+        logger.log_info("step", "durante a queda")
+        self.assertIsNone(logger.db_connection)
+        manager._connection_lost(psycopg2.OperationalError("server closed the connection unexpectedly"))
+        self.assertEqual(manager.connection_state, CircuitBreaker.OPEN)
+
+        time.sleep(0.02)
+        reopened = LogConnection()
+        with mock.patch.object(manager, '_open_connection', return_value=reopened), \
+                mock.patch('src.utils.logger.ensure_schema'):
+            with manager.connection():
+                pass
+            for thread in threading.enumerate():
+                if thread.name == 'db-recover':
+                    thread.join(5)
+        self.assertIs(manager._connection, reopened)
+        self.assertIs(logger.db_connection, reopened)
+
+        logger.log_info("step", "depois da volta")
+        self.assertIn("depois da volta", reopened.messages)
+
+
+    def test_outbox_is_replayed_when_database_comes_back(self):
+        manager = make_manager(self, [])
+        manager._breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.01, max_reset_timeout=0.01)
+        manager._connection = LogConnection()
+        manager.outbox = mock.Mock()
+        manager.outbox.pending.return_value = 3
+        manager._connection_lost(psycopg2.OperationalError("server closed the connection unexpectedly"))
+
+        time.sleep(0.02)
+        with mock.patch.object(manager, 'replay_outbox') as replay_outbox, \
+                mock.patch.object(manager, '_open_connection', return_value=LogConnection()):
+            with manager.connection():
+                pass
+            for thread in threading.enumerate():
+                if thread.name == 'db-recover':
+                    thread.join(5)
+        replay_outbox.assert_called_once_with()
+
+    def test_recovery_does_not_touch_the_connection_in_use(self):
+        logger = make_logger(self)
+        logger.set_levels(console='CRITICAL')
+        manager = make_manager(self, [])
+        DBManager.initialize_logging.return_value = logger
+        manager._breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.01, max_reset_timeout=0.01)
+        in_use = manager._connection = LogConnection()
+        logger.db_connection = in_use
+        manager._connection_lost(psycopg2.OperationalError("server closed the connection unexpectedly"))
+
+        time.sleep(0.02)
+        reopened = LogConnection()
+        with mock.patch.object(manager, '_open_connection', return_value=reopened), \
+                mock.patch('src.utils.logger.ensure_schema'):
+            with manager.connection():
+                pass
+            for thread in threading.enumerate():
+                if thread.name == 'db-recover':
+                    thread.join(5)
+        # Nenhum SELECT/commit na conexão que o logger (ou o sink) podia estar usando
+        self.assertEqual([sql for sql in in_use.executed if 'INSERT' not in sql], [])
+        self.assertEqual(in_use.closed, 1)
+        self.assertIs(logger.db_connection, reopened)
+
+    def test_failed_setup_closes_the_dedicated_connection(self):
+        manager = make_manager(self, [])
+        manager._pool = None
+        manager.settings.DB_CONFIG['enabled'] = True
+        opened = LogConnection()
+        with mock.patch.object(manager, '_connect_with_retry', return_value=opened), \
+                mock.patch.object(LogCursor, 'fetchone', create=True, side_effect=RuntimeError("permission denied")):
+            self.assertFalse(manager.connect())
+        self.assertEqual(opened.closed, 1)
+        self.assertIsNone(manager._connection)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,140 @@
+# Tests for connection_pool module
+
+import threading
+import time
+import unittest
+
+from psycopg2 import extensions
+
+from src.infra.db.connection_pool import ConnectionPool, PoolTimeoutError
+
+
+class FakeCursor:
+    def __init__(self, connection):
+        self.connection = connection
+
+    def execute(self, sql, params=None):
+        time.sleep(self.connection.check_delay)
+        if self.connection.broken:
+            raise RuntimeError("server closed the connection")
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    def __init__(self):
+        self.closed = 0
+        self.broken = False
+        self.check_delay = 0
+        self.in_transaction = False
+        self.rollbacks = 0
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def get_transaction_status(self):
+        if self.in_transaction:
+            return extensions.TRANSACTION_STATUS_INTRANS
+        return extensions.TRANSACTION_STATUS_IDLE
+
+    def rollback(self):
+        self.rollbacks += 1
+        self.in_transaction = False
+
+    def close(self):
+        self.closed = 1
+
+
+class TestConnectionPool(unittest.TestCase):
+    def make_pool(self, **options):
+        self.created = []
+
+        def connect():
+            connection = FakeConnection()
+            self.created.append(connection)
+            return connection
+
+        pool = ConnectionPool(connect, **options)
+        self.addCleanup(pool.close)
+        return pool
+
+    def test_reuses_connections_and_rolls_back_on_release(self):
+        pool = self.make_pool(min_size=1, max_size=2).open()
+        with pool.connection() as conn:
+            conn.in_transaction = True
+        with pool.connection() as again:
+            self.assertIs(again, conn)
+        self.assertEqual(conn.rollbacks, 1)
+        self.assertEqual(len(self.created), 1)
+        stats = pool.stats()
+        self.assertEqual((stats['checkouts'], stats['in_use'], stats['idle']), (2, 0, 1))
+
+    def test_waits_and_times_out_when_exhausted(self):
+        pool = self.make_pool(min_size=0, max_size=1, checkout_timeout=0.05)
+        conn = pool.acquire()
+        with self.assertRaises(PoolTimeoutError):
+            pool.acquire()
+
+        # Uma thread esperando recebe a conexão assim que ela é devolvida
+        received = []
+        waiter = threading.Thread(target=lambda: received.append(pool.acquire(timeout=5)))
+        waiter.start()
+        time.sleep(0.05)
+        pool.release(conn)
+        waiter.join(5)
+        self.assertEqual(received, [conn])
+        stats = pool.stats()
+        self.assertEqual((stats['waits'], stats['timeouts']), (2, 1))
+
+    def test_unhealthy_connection_is_replaced(self):
+        pool = self.make_pool(min_size=1, max_size=1, health_check_interval=0).open()
+        self.created[0].broken = True
+        with pool.connection() as conn:
+            self.assertIsNot(conn, self.created[0])
+        self.assertTrue(self.created[0].closed)
+        self.assertEqual(pool.stats()['failed_health_checks'], 1)
+
+    def test_health_check_counts_toward_max_size(self):
+        pool = self.make_pool(min_size=1, max_size=1, health_check_interval=0, checkout_timeout=5).open()
+        self.created[0].check_delay = 0.05  # Health check lento: a outra thread chega no meio dele
+        lock = threading.Lock()
+        in_use = []
+        peak = []
+
+        def work():
+            with pool.connection():
+                with lock:
+                    in_use.append(1)
+                    peak.append(len(in_use))
+                time.sleep(0.01)
+                with lock:
+                    in_use.pop()
+
+        threads = [threading.Thread(target=work) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(5)
+        self.assertLessEqual(len(self.created), pool.max_size)
+        self.assertEqual(max(peak), 1)
+        self.assertEqual(pool.stats()['size'], 1)
+
+    def test_expired_and_idle_connections_are_closed(self):
+        pool = self.make_pool(min_size=0, max_size=2, max_lifetime=0.01, idle_timeout=0)
+        with pool.connection() as conn:
+            time.sleep(0.02)
+        self.assertTrue(conn.closed)
+        self.assertEqual(pool.stats()['size'], 0)
+
+    def test_exception_rolls_back(self):
+        pool = self.make_pool(min_size=0)
+        with self.assertRaises(ValueError):
+            with pool.connection() as conn:
+                raise ValueError("boom")
+        self.assertEqual(conn.rollbacks, 1)
+        self.assertFalse(conn.closed)
+
+
+if __name__ == '__main__':
+    unittest.main()
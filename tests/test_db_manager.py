@@ -0,0 +1,270 @@
+# Tests for db_manager module
+
+import json
+import math
+import re
+import threading
+import time
+import unittest
+from unittest import mock
+
+import pandas as pd
+from psycopg2.extras import Json
+
+from src.config.settings import Settings
+from src.infra.db.connection_pool import ConnectionPool
+from src.infra.db.db_manager import DBManager
+from src.infra.db.query_cache import QueryCache
+from src.infra.db.circuit_breaker import CircuitBreaker
+from src.utils.startup_timer import StartupTimer
+from tests.test_connection_pool import FakeConnection
+
+
+class StreamingCursor:
+    def __init__(self, connection, name):
+        self.connection = connection
+        self.name = name
+        self.description = None
+        self.closed = False
+        self.fetches = 0
+
+    def execute(self, sql, params=None):
+        self.connection.in_transaction = True
+        self.connection.executed.append(sql)
+        self.rows = iter(self.connection.rows)
+        self.rowcount = len(self.connection.rows)
+
+    def fetchall(self):
+        return list(self.rows)
+
+    def fetchmany(self, size):
+        self.fetches += 1
+        self.description = (('id',), ('value',))
+        return [row for _, row in zip(range(size), self.rows)]
+
+    def copy_expert(self, sql, file):
+        self.connection.copies.append((sql, file.read()))
+
+    def close(self):
+        self.closed = True
+
+
+class StreamingConnection(FakeConnection):
+    def __init__(self, rows):
+        super().__init__()
+        self.rows = rows
+        self.cursors = []
+        self.copies = []
+        self.executed = []
+        self.commits = 0
+
+    def commit(self):
+        self.commits += 1
+
+    def cursor(self, name=None):
+        cursor = StreamingCursor(self, name)
+        self.cursors.append(cursor)
+        return cursor
+
+
+def make_manager(test, rows):
+    """DBManager fora do singleton, com um pool de conexões falsas"""
+    manager = object.__new__(DBManager)
+    manager.settings = Settings()
+    manager._connection = None
+    manager._connect_lock = threading.RLock()
+    manager.outbox = None
+    manager._query_cache = QueryCache()
+    manager._breaker = CircuitBreaker(failure_threshold=2, reset_timeout=60, max_reset_timeout=60)
+    manager.fake_connection = StreamingConnection(rows)
+    manager._pool = ConnectionPool(lambda: manager.fake_connection, min_size=0, max_size=1)
+    test.addCleanup(manager._pool.close)
+    patcher = mock.patch.object(DBManager, 'initialize_logging', return_value=mock.Mock())
+    patcher.start()
+    test.addCleanup(patcher.stop)
+    return manager
+
+
+class TestStreaming(unittest.TestCase):
+    def test_rows_are_fetched_in_batches_with_named_cursor(self):
+        manager = make_manager(self, [(i, i * 10) for i in range(5)])
+        batches = list(manager.stream_query_batches("SELECT id, value FROM t", batch_size=2))
+        self.assertEqual([len(rows) for _, rows in batches], [2, 2, 1])
+        self.assertEqual(batches[0][0], ['id', 'value'])
+        cursor = manager.fake_connection.cursors[0]
+        self.assertTrue(cursor.name.startswith('rpa_stream_'))
+        self.assertTrue(cursor.closed)
+        self.assertEqual(manager.get_pool_stats()['in_use'], 0)
+
+    def test_early_stop_closes_cursor_and_releases_connection(self):
+        manager = make_manager(self, [(i, i) for i in range(100)])
+        rows = manager.stream_query("SELECT id, value FROM t", batch_size=10)
+        self.assertEqual(next(rows), (0, 0))
+        self.assertEqual(manager.get_pool_stats()['in_use'], 1)
+        rows.close()
+
+        cursor = manager.fake_connection.cursors[0]
+        self.assertTrue(cursor.closed)
+        self.assertEqual(cursor.fetches, 1)
+        self.assertEqual(manager.fake_connection.rollbacks, 1)
+        self.assertEqual(manager.get_pool_stats()['in_use'], 0)
+
+    def test_dataframe_chunks(self):
+        manager = make_manager(self, [(i, i * 10) for i in range(3)])
+        frames = list(manager.stream_dataframes("SELECT id, value FROM t", chunk_size=2))
+        self.assertEqual([len(frame) for frame in frames], [2, 1])
+        self.assertEqual(list(frames[1].columns), ['id', 'value'])
+        self.assertEqual(frames[1]['value'].tolist(), [20])
+
+
+class TestQueryCaching(unittest.TestCase):
+    def test_cached_reads_and_invalidation_on_write(self):
+        manager = make_manager(self, [(1, 'ativo')])
+        query = "SELECT id, label FROM rpa.status_codes WHERE id = %s"
+        self.assertEqual(manager.execute_query(query, (1,), cache=True), (True, [(1, 'ativo')]))
+        self.assertEqual(manager.execute_query(query, (1,), cache=True), (True, [(1, 'ativo')]))
+        self.assertEqual(len(manager.fake_connection.executed), 1)
+
+        manager.execute_query("UPDATE rpa.status_codes SET label = %s", ('inativo',), commit=True)
+        manager.execute_query(query, (1,), cache=True)
+        self.assertEqual(len(manager.fake_connection.executed), 3)
+        stats = manager.get_cache_stats()
+        self.assertEqual((stats['hits'], stats['misses'], stats['invalidations']), (1, 2, 1))
+
+    def test_uncached_reads_always_hit_the_database(self):
+        manager = make_manager(self, [(1,)])
+        manager.execute_query("SELECT 1 FROM t")
+        manager.execute_query("SELECT 1 FROM t")
+        self.assertEqual(len(manager.fake_connection.executed), 2)
+
+
+def decode_copy_field(field):
+    """Desfaz os escapes de um campo do COPY em formato texto (como o servidor lê)"""
+    if field == '\\N':
+        return None
+    escapes = {'t': '\t', 'n': '\n', 'r': '\r'}
+    return re.sub(r'\\(.)', lambda match: escapes.get(match.group(1), match.group(1)), field)
+
+
+class TestBulkInsert(unittest.TestCase):
+    def test_copy_escapes_values_and_commits_per_chunk(self):
+        manager = make_manager(self, [])
+        rows = iter([(1, 'a\tb'), (2, None), (3, 'line\nbreak')])
+        success, stats = manager.bulk_insert('rpa.items', ['id', 'name'], rows, method='copy', chunk_size=2)
+        self.assertTrue(success)
+        self.assertEqual((stats['rows'], stats['chunks']), (3, 2))
+        self.assertEqual(manager.fake_connection.commits, 2)
+        sql, data = manager.fake_connection.copies[0]
+        self.assertEqual(sql, "COPY rpa.items (id, name) FROM STDIN")
+        self.assertEqual(data, "1\ta\\tb\n2\t\\N\n")
+        self.assertEqual(manager.fake_connection.copies[1][1], "3\tline\\nbreak\n")
+
+    def test_copy_round_trips_bytes_json_and_arrays_like_insert(self):
+        payload = b'\x00\\\tbin'
+        document = {'nome': 'a\tb', 'itens': [1, 2]}
+        rows = [(payload, document, Json(document), [1, None, 'a "b"', [2, 3]])]
+        manager = make_manager(self, [])
+        success, _ = manager.bulk_insert('rpa.items', ['raw', 'doc', 'meta', 'tags'], rows, method='copy')
+        self.assertTrue(success)
+        line = manager.fake_connection.copies[0][1].rstrip('\n')
+        raw, doc, meta, tags = [decode_copy_field(field) for field in line.split('\t')]
+        # bytea em hex: o servidor lê "\x..." e grava os mesmos bytes que o INSERT de psycopg2.Binary
+        self.assertTrue(raw.startswith('\\x'))
+        self.assertEqual(bytes.fromhex(raw[2:]), payload)
+        # JSON: mesmo texto que o adaptador Json envia no INSERT
+        self.assertEqual(doc, Json(document).dumps(document))
+        self.assertEqual(meta, doc)
+        self.assertEqual(json.loads(doc), document)
+        # Array: mesmos elementos do ARRAY[...] do INSERT
+        self.assertEqual(tags, '{"1",NULL,"a \\"b\\"",{"2","3"}}')
+
+    def test_values_method_uses_execute_values_pages(self):
+        manager = make_manager(self, [])
+        with mock.patch('src.infra.db.db_manager.execute_values') as execute_values:
+            success, stats = manager.bulk_insert('rpa.items', ['id'], [(i,) for i in range(5)],
+                                                 method='values', chunk_size=3, page_size=2)
+        self.assertTrue(success)
+        self.assertEqual([len(c.args[2]) for c in execute_values.call_args_list], [3, 2])
+        self.assertEqual(execute_values.call_args.kwargs['page_size'], 2)
+
+    def test_copy_from_dataframe_converts_nan_to_null(self):
+        manager = make_manager(self, [])
+        df = pd.DataFrame({'id': [1, 2], 'amount': [1.5, math.nan]})
+        success, stats = manager.copy_from_dataframe(df, 'rpa.items')
+        self.assertTrue(success)
+        self.assertEqual(manager.fake_connection.copies[0],
+                         ("COPY rpa.items (id, amount) FROM STDIN", "1\t1.5\n2\t\\N\n"))
+
+
+class TestTransaction(unittest.TestCase):
+    def test_statements_share_a_single_commit(self):
+        manager = make_manager(self, [(1, 'a')])
+        manager.execute_query("SELECT * FROM rpa.items", cache=True)
+        with manager.transaction() as tx:
+            for i in range(3):
+                manager.execute_query("INSERT INTO rpa.items VALUES (%s)", (i,), commit=True)
+            self.assertEqual(manager.get_cache_stats()['size'], 1)  # Invalida só no commit
+        self.assertEqual(manager.fake_connection.commits, 1)
+        self.assertEqual(tx.stats()['statements'], 3)
+        self.assertEqual(manager.get_cache_stats()['size'], 0)
+
+    def test_exception_rolls_back_everything(self):
+        manager = make_manager(self, [])
+        with self.assertRaises(ValueError):
+            with manager.transaction() as tx:
+                tx.execute("INSERT INTO rpa.items VALUES (1)")
+                raise ValueError("falha no passo")
+        self.assertEqual(manager.fake_connection.commits, 0)
+        self.assertGreaterEqual(manager.fake_connection.rollbacks, 1)
+
+    def test_savepoint_isolates_failed_items(self):
+        manager = make_manager(self, [])
+        with manager.transaction() as tx:
+            for item in (1, 2):
+                try:
+                    with tx.savepoint():
+                        tx.execute("INSERT INTO rpa.items VALUES (%s)", (item,))
+                        if item == 2:
+                            raise ValueError("item inválido")
+                except ValueError:
+                    pass
+        executed = manager.fake_connection.executed
+        self.assertIn("RELEASE SAVEPOINT sp_1", executed)
+        self.assertIn("ROLLBACK TO SAVEPOINT sp_1", executed)
+        self.assertEqual(tx.stats()['rolled_back_savepoints'], 1)
+        self.assertEqual(manager.fake_connection.commits, 1)
+
+    def test_commit_every_and_nested_transaction(self):
+        manager = make_manager(self, [])
+        with manager.transaction(commit_every=2) as tx:
+            for i in range(5):
+                tx.execute("INSERT INTO rpa.items VALUES (%s)", (i,))
+            with manager.transaction() as inner:
+                self.assertIs(inner, tx)
+        self.assertEqual(manager.fake_connection.commits, 3)
+        self.assertIn("SAVEPOINT sp_1", manager.fake_connection.executed)
+
+
+class TestBackgroundConnect(unittest.TestCase):
+    def test_concurrent_connect_waits_for_background_one(self):
+        manager = make_manager(self, [])
+        calls = []
+
+        def slow_connect(timer):
+            start = time.perf_counter()
+            time.sleep(0.05)
+            calls.append((start, time.perf_counter()))
+            return True
+
+        timer = StartupTimer()
+        with mock.patch.object(manager, '_connect', side_effect=slow_connect):
+            future = manager.connect_in_background(timer)
+            time.sleep(0.01)
+            self.assertTrue(manager.connect())
+            self.assertTrue(future.result(timeout=5))
+        self.assertEqual(len(calls), 2)
+        self.assertGreaterEqual(calls[1][0], calls[0][1])  # Sem sobreposição
+
+
+if __name__ == '__main__':
+    unittest.main()
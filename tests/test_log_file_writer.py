@@ -0,0 +1,50 @@
+# Tests for log_file_writer module
+
+import gzip
+import os
+import tempfile
+import unittest
+
+from src.utils.log_file_writer import RotatingLogFileWriter
+
+HEADER = "+----+\n| HD |\n+----+\n"
+
+
+class TestRotatingLogFileWriter(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def make_writer(self, **options):
+        writer = RotatingLogFileWriter(self.tmp.name, 'rpa_test', header_factory=lambda: HEADER,
+                                       footer_factory=lambda: "+----+\n", **options)
+        self.addCleanup(writer.close)
+        return writer
+
+    def test_force_flush_reaches_disk(self):
+        writer = self.make_writer(flush_interval=0, flush_bytes=10 ** 6)
+        writer.write("| buffered |\n")
+        writer.write("| critical |\n", force_flush=True)
+        with open(writer.path, encoding='utf-8') as f:
+            self.assertEqual(f.read(), HEADER + "| buffered |\n| critical |\n")
+
+    def test_rotation_by_size_compresses_segments_with_header(self):
+        writer = self.make_writer(flush_interval=0, max_bytes=len(HEADER) + 40)
+        for i in range(10):
+            writer.write(f"| line {i:02d} |\n")
+        writer.close()
+
+        compressed = sorted(name for name in os.listdir(self.tmp.name) if name.endswith('.gz'))
+        self.assertTrue(compressed)
+        for name in compressed:
+            with gzip.open(os.path.join(self.tmp.name, name), 'rt', encoding='utf-8') as f:
+                content = f.read()
+            self.assertTrue(content.startswith(HEADER))
+            self.assertTrue(content.endswith("+----+\n"))
+
+        with open(writer.path, encoding='utf-8') as f:
+            self.assertTrue(f.read().startswith(HEADER))
+
+
+if __name__ == '__main__':
+    unittest.main()
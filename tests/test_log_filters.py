@@ -0,0 +1,40 @@
+# Tests for log_filters module
+
+import logging
+import unittest
+
+from src.utils.log_filters import LogSampler, parse_level
+
+
+class TestParseLevel(unittest.TestCase):
+    def test_names_and_numbers(self):
+        self.assertEqual(parse_level('warning'), logging.WARNING)
+        self.assertEqual(parse_level(logging.ERROR), logging.ERROR)
+        with self.assertRaises(ValueError):
+            parse_level('verbose')
+
+
+class TestLogSampler(unittest.TestCase):
+    def test_every_n_per_call_site(self):
+        sampler = LogSampler(every_n=10, summary_interval=3600)
+        allowed = [sampler.allow(('site', 1), 'f')[0] for _ in range(100)]
+        self.assertEqual(sum(allowed), 10)
+        # Outro ponto de chamada tem contagem própria
+        self.assertTrue(sampler.allow(('site', 2), 'f')[0])
+
+    def test_rate_limit_and_forced_summary(self):
+        sampler = LogSampler(max_per_interval=5, interval=3600)
+        allowed = [sampler.allow('key', 'loop')[0] for _ in range(50)]
+        self.assertEqual(sum(allowed), 5)
+        self.assertEqual(sampler.due_summaries(force=True), [('key', 'loop', 45)])
+        self.assertEqual(sampler.due_summaries(force=True), [])
+
+    def test_summary_reported_with_next_emitted_record(self):
+        sampler = LogSampler(every_n=2, summary_interval=0)
+        self.assertEqual(sampler.allow('key', 'f'), (True, 0))
+        self.assertEqual(sampler.allow('key', 'f'), (False, 0))
+        self.assertEqual(sampler.allow('key', 'f'), (True, 1))
+
+
+if __name__ == '__main__':
+    unittest.main()
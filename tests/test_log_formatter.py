@@ -0,0 +1,83 @@
+# Tests for log_formatter module
+
+import textwrap
+import unittest
+
+from src.utils.log_formatter import LogTableFormatter
+
+COL_WIDTHS = {
+    'timestamp': 25,
+    'task': 15,
+    'function': 30,
+    'file': 25,
+    'message': 50,
+    'process_type': 15,
+    'status': 15
+}
+PADDING = 1
+
+
+def legacy_entry(values, critical):
+    """Montagem coluna a coluna usada anteriormente em EnhancedLogger.log_entry"""
+    message_lines = textwrap.wrap(values[4], width=COL_WIDTHS['message']) or [""]
+    names = list(COL_WIDTHS)
+    contents = {name: values[i][:COL_WIDTHS[name]] for i, name in enumerate(names)}
+    contents['message'] = message_lines[0]
+
+    log_line = "|"
+    for name, width in COL_WIDTHS.items():
+        content = contents[name]
+        log_line += " " * PADDING + content + " " * (width - len(content) + PADDING) + "|"
+    lines = [log_line]
+    for i in range(1, len(message_lines)):
+        cont_line = "|"
+        for name, width in COL_WIDTHS.items():
+            if name == 'message':
+                content = message_lines[i]
+                cont_line += " " * PADDING + content + " " * (width - len(content) + PADDING) + "|"
+            else:
+                cont_line += " " * (width + PADDING * 2) + "|"
+        lines.append(cont_line)
+    if critical:
+        lines.append("+" + "+".join("-" * (w + PADDING * 2) for w in COL_WIDTHS.values()) + "+")
+    return "\n".join(lines) + "\n"
+
+
+MESSAGES = [
+    "",
+    "   ",
+    "short message",
+    "  leading spaces kept",
+    "trailing spaces dropped    ",
+    "x" * 50,
+    "x" * 51,
+    "Conexão estabelecida com sucesso ao banco de dados PostgreSQL remoto",
+    "tab\tseparated\tvalues",
+    "line one\nline two",
+    "Traceback (most recent call last):\n  File \"main.py\", line 10, in <module>\n    raise ValueError('x')",
+    "word " * 40,
+    "{braces} and %s placeholders",
+]
+
+
+class TestLogTableFormatter(unittest.TestCase):
+    def setUp(self):
+        self.formatter = LogTableFormatter(COL_WIDTHS, PADDING)
+
+    def test_output_matches_legacy_format(self):
+        for message in MESSAGES:
+            for critical in (False, True):
+                values = ("2024-01-01 12:00:00", "A very long task name", "function_name",
+                          "some_really_long_file_name_here.py", message, "business", "information")
+                self.assertEqual(self.formatter.format_entry(values, critical), legacy_entry(values, critical),
+                                 repr(message))
+
+    def test_header_matches_legacy_titles(self):
+        lines = self.formatter.header.splitlines()
+        self.assertEqual(lines[0], self.formatter.separator)
+        self.assertEqual(lines[1][:29], "|         TIMESTAMP         |")
+        self.assertEqual(len(lines[1]), len(self.formatter.separator))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,52 @@
+# Tests for log_multiprocess module
+
+import glob
+import multiprocessing
+import os
+import tempfile
+import unittest
+
+from src.utils.log_multiprocess import WRITER_ADDRESS_ENV, LogWriterProcess, get_writer_address
+from src.utils.log_reader import iter_log_records
+from src.utils.logger import EnhancedLogger
+
+
+def worker(index):
+    """Worker do pool: encontra o escritor pelo ambiente herdado"""
+    logger = EnhancedLogger('mp', forward_to=get_writer_address(), metrics_options={'enabled': False})
+    for i in range(20):
+        logger.log_info('worker', f'worker {index} item {i}')
+    logger._add_closing_line()
+
+
+class TestLogWriterProcess(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        cwd = os.getcwd()
+        os.chdir(self.tmp.name)
+        self.addCleanup(self.tmp.cleanup)
+        self.addCleanup(os.chdir, cwd)
+
+    def test_workers_share_single_writer(self):
+        writer = LogWriterProcess('mp', logger_options={
+            'file_format': 'jsonl',
+            'file_options': {'flush_interval': 0},
+            'metrics_options': {'enabled': False}
+        })
+        writer.start()
+        try:
+            self.assertEqual(os.environ[WRITER_ADDRESS_ENV], writer.address)
+            with multiprocessing.get_context('spawn').Pool(3) as pool:
+                pool.map(worker, range(3))
+            self.assertTrue(writer.flush())
+        finally:
+            writer.stop()
+
+        self.assertNotIn(WRITER_ADDRESS_ENV, os.environ)
+        files = glob.glob(os.path.join('logs', '*.jsonl'))
+        self.assertEqual(len(files), 1)
+        self.assertEqual(len(list(iter_log_records('logs', task='Default Bot'))), 60)
+
+
+if __name__ == '__main__':
+    unittest.main()
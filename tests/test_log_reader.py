@@ -0,0 +1,50 @@
+# Tests for log_reader module
+
+import datetime
+import gzip
+import os
+import tempfile
+import unittest
+
+from src.utils.log_reader import iter_log_records, main
+from src.utils.log_record import LogRecord, format_jsonl
+
+
+def make_record(status, task='bot', message='msg'):
+    return LogRecord(task, 'main', 'main.py', 1.0, 2.0, '2024-01-01', '08:00:00', message, 'business', status)
+
+
+class TestLogReader(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        base = datetime.datetime(2024, 1, 1, 8, 0, 0)
+
+        # Segmento antigo rotacionado e compactado
+        with gzip.open(os.path.join(self.tmp.name, 'rpa_p_20240101_080000.jsonl.gz'), 'wt', encoding='utf-8') as f:
+            for i in range(3):
+                f.write(format_jsonl(make_record('information', message=f'old {i}'), base + datetime.timedelta(minutes=i)))
+
+        # Segmento atual, com uma linha truncada no final
+        with open(os.path.join(self.tmp.name, 'rpa_p_20240101_090000.jsonl'), 'w', encoding='utf-8') as f:
+            f.write(format_jsonl(make_record('failure', task='other'), base + datetime.timedelta(hours=1)))
+            f.write(format_jsonl(make_record('success'), base + datetime.timedelta(hours=1, minutes=1)))
+            f.write('{"task_name": "tru')
+
+    def test_reads_all_segments_in_order(self):
+        messages = [r['log_message'] for r in iter_log_records(self.tmp.name)]
+        self.assertEqual(messages, ['old 0', 'old 1', 'old 2', 'msg', 'msg'])
+
+    def test_filters(self):
+        records = list(iter_log_records(self.tmp.name, start='2024-01-01 08:01', end='2024-01-01 09:00'))
+        self.assertEqual([r['log_message'] for r in records], ['old 1', 'old 2'])
+        self.assertEqual(len(list(iter_log_records(self.tmp.name, status=['failure', 'success']))), 2)
+        self.assertEqual(len(list(iter_log_records(self.tmp.name, task='other'))), 1)
+        self.assertEqual(len(list(iter_log_records(self.tmp.name, process_type='system'))), 0)
+
+    def test_cli_count(self):
+        self.assertEqual(main([self.tmp.name, '--status', 'failure', '--count']), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
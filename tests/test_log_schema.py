@@ -0,0 +1,122 @@
+# Tests for log_schema module
+
+import datetime
+import unittest
+
+from src.infra.db import log_schema
+
+
+class FakeCursor:
+    def __init__(self, connection):
+        self.connection = connection
+        self.rowcount = 0
+
+    def execute(self, sql, params=None):
+        self.connection.statements.append(" ".join(sql.split()))
+
+    def fetchone(self):
+        return self.connection.fetchone_results.pop(0) if self.connection.fetchone_results else None
+
+    def fetchall(self):
+        return self.connection.fetchall_results.pop(0) if self.connection.fetchall_results else []
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    def __init__(self, fetchone_results=(), fetchall_results=()):
+        self.statements = []
+        self.fetchone_results = list(fetchone_results)
+        self.fetchall_results = list(fetchall_results)
+        self.commits = 0
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        pass
+
+
+class TestPartitionHelpers(unittest.TestCase):
+    def test_month_arithmetic(self):
+        self.assertEqual(log_schema.add_months(datetime.date(2024, 11, 1), 3), datetime.date(2025, 2, 1))
+        self.assertEqual(log_schema.add_months(datetime.date(2024, 1, 1), -1), datetime.date(2023, 12, 1))
+        self.assertEqual(log_schema.partition_name(datetime.date(2024, 3, 15)), 'logs_2024_03')
+        self.assertEqual(log_schema.partition_range('logs_2024_12'),
+                         (datetime.date(2024, 12, 1), datetime.date(2025, 1, 1)))
+        self.assertIsNone(log_schema.partition_range('logs_default'))
+
+
+class TestBootstrap(unittest.TestCase):
+    def test_new_table_is_partitioned_with_indexes(self):
+        connection = FakeConnection(fetchone_results=[None])
+        self.assertEqual(log_schema.bootstrap_log_table(connection, 'rpa'), 'partitioned')
+        sql = "\n".join(connection.statements)
+        self.assertIn("PARTITION BY RANGE (log_date)", sql)
+        self.assertIn("rpa.logs_default PARTITION OF rpa.logs DEFAULT", sql)
+        self.assertIn("USING brin (created_at)", sql)
+        self.assertIn("USING btree (task_name, status, log_date)", sql)
+        self.assertIn(log_schema.partition_name(datetime.date.today()), sql)
+        self.assertEqual(connection.commits, 1)
+
+    def test_existing_heap_table_is_left_untouched(self):
+        connection = FakeConnection(fetchone_results=[('r',)])
+        self.assertEqual(log_schema.bootstrap_log_table(connection, 'rpa'), 'heap')
+        self.assertFalse([s for s in connection.statements if s.startswith('CREATE TABLE')])
+
+    def test_existing_table_gets_span_columns(self):
+        connection = FakeConnection(fetchone_results=[('p',)])
+        log_schema.bootstrap_log_table(connection, 'rpa')
+        self.assertIn("ALTER TABLE rpa.logs ADD COLUMN IF NOT EXISTS duration_ms DOUBLE PRECISION",
+                      connection.statements)
+        self.assertIn("ALTER TABLE rpa.logs ADD COLUMN IF NOT EXISTS span_id VARCHAR(32)", connection.statements)
+
+
+class TestEnsurePartitions(unittest.TestCase):
+    def test_creates_only_missing_partitions(self):
+        connection = FakeConnection(fetchall_results=[[('logs_2024_03',), ('logs_default',)]],
+                                    fetchone_results=[(False,)])
+        names = log_schema.ensure_partitions(connection.cursor(), 'rpa', start=datetime.date(2024, 3, 10))
+        self.assertEqual(names, ['logs_2024_03', 'logs_2024_04'])
+        created = [s for s in connection.statements if s.startswith('CREATE TABLE')]
+        self.assertEqual(created, ["CREATE TABLE IF NOT EXISTS rpa.logs_2024_04 PARTITION OF rpa.logs "
+                                   "FOR VALUES FROM ('2024-04-01') TO ('2024-05-01')"])
+        self.assertFalse([s for s in connection.statements if 'DETACH' in s])
+
+    def test_rows_in_default_partition_are_moved_to_new_partition(self):
+        # Uma linha de abril já caiu em logs_default antes de a partição existir
+        connection = FakeConnection(fetchall_results=[[('logs_2024_03',), ('logs_default',)]],
+                                    fetchone_results=[(True,)])
+        log_schema.ensure_partitions(connection.cursor(), 'rpa', start=datetime.date(2024, 3, 10))
+        statements = connection.statements[2:]
+        self.assertEqual(statements[0], "ALTER TABLE rpa.logs DETACH PARTITION rpa.logs_default")
+        self.assertTrue(statements[1].startswith("CREATE TABLE IF NOT EXISTS rpa.logs_2024_04 PARTITION OF rpa.logs"))
+        self.assertIn("DELETE FROM rpa.logs_default WHERE log_date >= %s AND log_date < %s", statements[2])
+        self.assertIn("INSERT INTO rpa.logs (id, task_name,", statements[2])
+        self.assertEqual(statements[3], "ALTER TABLE rpa.logs ATTACH PARTITION rpa.logs_default DEFAULT")
+
+
+class TestRetention(unittest.TestCase):
+    def test_drops_only_partitions_older_than_cutoff(self):
+        partitions = ['logs_2023_12', 'logs_2024_01', 'logs_2024_02', 'logs_2024_03', 'logs_default']
+        connection = FakeConnection(fetchall_results=[[(name,) for name in partitions]])
+        actions = log_schema.apply_retention(connection, 'rpa', keep_months=2, today=datetime.date(2024, 3, 10))
+        # Mantém o mês atual e os 2 anteriores (jan-mar)
+        self.assertEqual(actions, [('logs_2023_12', 'dropped')])
+        self.assertIn("DROP TABLE rpa.logs_2023_12", connection.statements)
+        self.assertFalse([s for s in connection.statements if 'DELETE' in s])
+
+    def test_archive_moves_partitions(self):
+        connection = FakeConnection(fetchall_results=[[('logs_2023_01',)]])
+        actions = log_schema.apply_retention(connection, 'rpa', 1, archive_schema='archive',
+                                             today=datetime.date(2024, 3, 10))
+        self.assertEqual(actions, [('logs_2023_01', 'archived')])
+        self.assertIn("ALTER TABLE rpa.logs_2023_01 SET SCHEMA archive", connection.statements)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,78 @@
+# Tests for log_sinks module
+
+import queue
+import tempfile
+import unittest
+from unittest import mock
+
+from src.utils.log_record import LogRecord
+from src.utils.log_sinks import DatabaseLogSink, OverflowPolicy
+
+
+class FakeConnection:
+    def __init__(self):
+        self.commits = 0
+
+    def cursor(self):
+        return mock.MagicMock()
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        pass
+
+
+def make_record(i):
+    return LogRecord('task', 'func', 'file.py', 1.0, 2.0, '2024-01-01', '00:00:00',
+                     f'message {i}', 'system', 'information')
+
+
+class TestDatabaseLogSink(unittest.TestCase):
+    def setUp(self):
+        self.written = []
+        patcher = mock.patch('src.utils.log_sinks.execute_values',
+                             side_effect=lambda cursor, sql, rows, page_size: self.written.append(list(rows)))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_flush_writes_multi_row_batches(self):
+        connection = FakeConnection()
+        sink = DatabaseLogSink(connection, 'schema', batch_size=3, flush_interval=60)
+        for i in range(7):
+            sink.submit(make_record(i))
+        self.assertTrue(sink.flush(timeout=5))
+        sink.close()
+
+        self.assertEqual([len(batch) for batch in self.written], [3, 3, 1])
+        stats = sink.stats()
+        self.assertEqual(stats['queued'], 7)
+        self.assertEqual(stats['written'], 7)
+        self.assertEqual(stats['dropped'], 0)
+
+    def test_drop_policy_counts_overflow(self):
+        sink = DatabaseLogSink(FakeConnection(), 'schema', max_queue_size=1, flush_interval=60,
+                               overflow_policy=OverflowPolicy.DROP)
+        # Simula a fila cheia para forçar o estouro
+        with mock.patch.object(sink._queue, 'put_nowait', side_effect=queue.Full):
+            self.assertFalse(sink.submit(make_record(0)))
+        sink.close()
+        self.assertEqual(sink.stats()['dropped'], 1)
+
+    def test_spill_policy_replays_from_disk(self):
+        with tempfile.TemporaryDirectory() as spill_dir:
+            sink = DatabaseLogSink(FakeConnection(), 'schema', flush_interval=60,
+                                   overflow_policy=OverflowPolicy.SPILL, spill_dir=spill_dir)
+            with mock.patch.object(sink._queue, 'put_nowait', side_effect=queue.Full):
+                self.assertTrue(sink.submit(make_record(0)))
+            self.assertTrue(sink.flush(timeout=5))
+            sink.close()
+
+        stats = sink.stats()
+        self.assertEqual(stats['spilled'], 1)
+        self.assertEqual(stats['written'], 1)
+        self.assertEqual(self.written[0][0].log_message, 'message 0')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,64 @@
+# Tests for log_spans module
+
+import asyncio
+import unittest
+from unittest import mock
+
+from src.utils.log_spans import current_span
+from tests.test_logger import make_logger
+
+
+class TestLogSpan(unittest.TestCase):
+    def setUp(self):
+        self.logger = make_logger(self)
+        self.records = []
+        emit = lambda record, *args: self.records.append(record)
+        patcher = mock.patch.object(self.logger, '_emit', side_effect=emit)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_nested_spans_record_duration_and_parent(self):
+        with self.logger.span('outer') as outer:
+            self.logger.log_info('inside', 'working')
+            with self.logger.span('inner') as inner:
+                pass
+        self.assertIsNone(current_span())
+
+        inside, inner_end, outer_end = self.records
+        self.assertEqual(inside.span_id, outer.span_id)
+        self.assertIsNone(inside.duration_ms)
+        self.assertEqual((inner_end.function_name, inner_end.span_id, inner_end.parent_span_id),
+                         ('inner', inner.span_id, outer.span_id))
+        self.assertEqual((outer_end.span_id, outer_end.parent_span_id), (outer.span_id, None))
+        self.assertGreaterEqual(outer_end.duration_ms, inner_end.duration_ms)
+        self.assertEqual(outer_end.status, 'success')
+        self.assertEqual(outer_end.source_file, 'test_log_spans.py')
+
+    def test_failure_is_logged_and_reraised(self):
+        with self.assertRaises(ZeroDivisionError):
+            with self.logger.span('step'):
+                1 / 0
+        self.assertEqual(self.records[-1].status, 'failure')
+        self.assertIsNotNone(self.records[-1].duration_ms)
+
+    def test_decorator_creates_one_span_per_call(self):
+        @self.logger.span()
+        def extract(value):
+            return value * 2
+
+        self.assertEqual(extract(2), 4)
+        self.assertEqual(extract(3), 6)
+        self.assertEqual([r.function_name for r in self.records], ['extract', 'extract'])
+        self.assertNotEqual(self.records[0].span_id, self.records[1].span_id)
+
+    def test_async_decorator(self):
+        @self.logger.span('fetch')
+        async def fetch():
+            return current_span().name
+
+        self.assertEqual(asyncio.run(fetch()), 'fetch')
+        self.assertEqual(self.records[-1].function_name, 'fetch')
+
+
+if __name__ == '__main__':
+    unittest.main()
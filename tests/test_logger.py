@@ -0,0 +1,153 @@
+# Tests for logger module
+
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from src.utils.logger import EnhancedLogger, ProcessType
+
+
+def make_logger(test):
+    """Cria um logger gravando em um diretório temporário"""
+    tmp = tempfile.TemporaryDirectory()
+    cwd = os.getcwd()
+    os.chdir(tmp.name)
+    test.addCleanup(tmp.cleanup)
+    test.addCleanup(os.chdir, cwd)
+    logger = EnhancedLogger('test', file_options={'flush_interval': 0}, metrics_options={'enabled': False})
+    test.addCleanup(logger._add_closing_line)
+    return logger
+
+
+class TestCallerInfo(unittest.TestCase):
+    def setUp(self):
+        # _get_caller_info não depende do setup de arquivos do logger
+        self.logger = object.__new__(EnhancedLogger)
+
+    def log_info(self):
+        return self.log_entry()
+
+    def log_entry(self):
+        return self.logger._get_caller_info(depth=3)
+
+    def test_resolves_caller_of_logging_method(self):
+        self.assertEqual(self.log_info(), ('test_logger.py', 'test_resolves_caller_of_logging_method'))
+
+    def test_depth_beyond_stack_returns_outermost_frame(self):
+        filename, _ = self.logger._get_caller_info(depth=10 ** 6)
+        self.assertTrue(filename)
+
+
+class TestLevelsAndSampling(unittest.TestCase):
+    def setUp(self):
+        self.logger = make_logger(self)
+
+    def test_entry_below_all_thresholds_does_no_work(self):
+        self.logger.set_levels(file='WARNING', console='WARNING', db='WARNING')
+        with mock.patch.object(self.logger.file_writer, 'write') as write, \
+                mock.patch.object(self.logger, '_get_caller_info') as caller:
+            self.logger.log_info('f', 'ignored')
+        write.assert_not_called()
+        caller.assert_not_called()
+
+    def test_per_destination_threshold(self):
+        self.logger.set_levels(file='ERROR', console='DEBUG')
+        with mock.patch.object(self.logger.file_writer, 'write') as write:
+            self.logger.log_info('f', 'console only')
+            self.logger.log_error('f', 'both')
+        self.assertEqual(write.call_count, 1)
+
+    def test_sampling_emits_summary(self):
+        self.logger.set_levels(console='CRITICAL')
+        self.logger.enable_sampling(every_n=10, summary_interval=3600)
+        with mock.patch.object(self.logger.file_writer, 'write') as write:
+            for i in range(100):
+                self.logger.log_info('loop', f'item {i}')
+            self.logger._flush_suppressed_summaries(force=True)
+        entries = [call.args[0] for call in write.call_args_list]
+        self.assertEqual(len(entries), 11)
+        self.assertIn('90 mensagens semelhantes suprimidas', entries[-1])
+        self.assertIn('test_logger.py', entries[-1])
+
+
+class TestDeferredMessages(unittest.TestCase):
+    def setUp(self):
+        self.logger = make_logger(self)
+        self.logger.set_levels(console='CRITICAL')
+
+    def written(self, call):
+        with mock.patch.object(self.logger.file_writer, 'write') as write:
+            call()
+        return "".join(c.args[0] for c in write.call_args_list)
+
+    def test_percent_args_rendered(self):
+        text = self.written(lambda: self.logger.log_info('f', 'processed %d of %s', 3, 'input', process_type='business'))
+        self.assertIn('processed 3 of input', text)
+        self.assertIn('business', text)
+
+    def test_args_without_process_type(self):
+        # Argumentos posicionais são sempre valores da mensagem, nunca o process_type
+        text = self.written(lambda: self.logger.log_info('f', 'Processed %d', 5))
+        self.assertIn('Processed 5', text)
+        self.assertIn('system', text)
+
+    def test_positional_process_type_still_works(self):
+        # Assinatura antiga: log_info(nome, mensagem, process_type)
+        with self.assertWarns(DeprecationWarning):
+            text = self.written(lambda: self.logger.log_info('f', 'legacy call', ProcessType.BUSINESS))
+        self.assertIn('legacy call', text)
+        self.assertNotIn('ProcessType', text)
+        self.assertIn('business', text)
+        with self.assertWarns(DeprecationWarning):
+            text = self.written(lambda: self.logger.log_error('f', 'legacy string', 'robotic'))
+        self.assertIn('robotic', text)
+        # Com placeholder o argumento é valor da mensagem
+        text = self.written(lambda: self.logger.log_info('f', 'type %s', ProcessType.BUSINESS))
+        self.assertIn('system', text)
+
+    def test_invalid_format_does_not_raise(self):
+        text = self.written(lambda: self.logger.log_info('f', 'value %d', 'abc', process_type='system'))
+        self.assertIn("value %d ('abc',)", text)
+
+    def test_callable_not_invoked_when_filtered(self):
+        build = mock.Mock(return_value='expensive')
+        self.logger.set_levels(file='ERROR', console='ERROR', db='ERROR')
+        self.logger.log_info('f', build)
+        build.assert_not_called()
+
+        text = self.written(lambda: self.logger.log_error('f', build))
+        build.assert_called_once_with()
+        self.assertIn('expensive', text)
+
+
+class TestHeldDatabaseRecords(unittest.TestCase):
+    def setUp(self):
+        self.logger = make_logger(self)
+        self.logger.set_levels(console='CRITICAL')
+
+    def test_records_are_held_until_connection_then_batched(self):
+        self.logger.hold_db_records()
+        self.logger.log_info('step', 'antes da conexão')
+        self.logger.log_error('step', 'erro antes da conexão')
+        connection = mock.Mock()
+        self.logger.db_connection = connection
+        with mock.patch('src.utils.logger.execute_values') as execute_values:
+            self.assertEqual(self.logger.release_db_records(), 2)
+        rows = execute_values.call_args.args[2]
+        self.assertEqual([row.log_message for row in rows], ['antes da conexão', 'erro antes da conexão'])
+        connection.commit.assert_called_once()
+        self.assertEqual(self.logger.release_db_records(), 0)
+
+    def test_held_records_go_to_outbox_without_connection(self):
+        outbox = mock.Mock()
+        self.logger.hold_db_records(max_records=1)
+        self.logger.log_info('step', 'primeiro')
+        self.logger.log_info('step', 'descartado')
+        self.logger.enable_outbox(outbox)
+        self.logger.release_db_records()
+        self.assertEqual([row.log_message for row in outbox.add_logs.call_args.args[0]], ['primeiro'])
+
+
+if __name__ == '__main__':
+    unittest.main()
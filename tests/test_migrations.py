@@ -0,0 +1,79 @@
+# Tests for migrations module
+
+import datetime
+import unittest
+
+from psycopg2 import errors
+
+from src.infra.db import log_schema, migrations
+from tests.test_log_schema import FakeConnection, FakeCursor
+
+
+class MissingTableCursor(FakeCursor):
+    """Simula o primeiro start: schema_migrations ainda não existe"""
+
+    def execute(self, sql, params=None):
+        super().execute(sql, params)
+        if sql.lstrip().startswith('SELECT MAX(version)'):
+            raise errors.UndefinedTable("relation does not exist")
+
+
+class FreshConnection(FakeConnection):
+    def cursor(self):
+        return MissingTableCursor(self)
+
+
+TODAY = datetime.date(2024, 3, 10)
+
+
+class TestEnsureSchema(unittest.TestCase):
+    def test_warm_start_runs_a_single_read(self):
+        connection = FakeConnection(fetchone_results=[(migrations.LATEST_VERSION, 'p', True)])
+        self.assertEqual(migrations.ensure_schema(connection, 'rpa', today=TODAY), migrations.LATEST_VERSION)
+        self.assertEqual(len(connection.statements), 1)
+        self.assertIn("FROM rpa.schema_migrations", connection.statements[0])
+        self.assertEqual(connection.commits, 1)
+
+    def test_missing_partition_creates_it_without_migrating(self):
+        connection = FakeConnection(fetchone_results=[(migrations.LATEST_VERSION, 'p', False), ('p',)])
+        migrations.ensure_schema(connection, 'rpa', today=TODAY)
+        self.assertFalse([s for s in connection.statements if 'schema_migrations (version' in s])
+        self.assertTrue([s for s in connection.statements if 'rpa.logs_2024_04 PARTITION OF' in s])
+        # DDL das partições sob o advisory lock das migrações, em transação nova após a leitura
+        lock = next(i for i, s in enumerate(connection.statements) if 'pg_advisory_xact_lock' in s)
+        create = next(i for i, s in enumerate(connection.statements) if 'PARTITION OF' in s)
+        self.assertLess(lock, create)
+        self.assertEqual(connection.commits, 2)
+
+    def test_first_start_applies_all_migrations(self):
+        # COALESCE(MAX(version)), kind da tabela (migração 1), kind para as partições
+        connection = FreshConnection(fetchone_results=[(0,), None, ('p',)])
+        self.assertEqual(migrations.ensure_schema(connection, 'rpa', today=TODAY), migrations.LATEST_VERSION)
+        sql = "\n".join(connection.statements)
+        self.assertIn("pg_advisory_xact_lock", sql)
+        self.assertIn("CREATE TABLE IF NOT EXISTS rpa.schema_migrations", sql)
+        self.assertIn("PARTITION BY RANGE (log_date)", sql)
+        inserted = [s for s in connection.statements if s.startswith('INSERT INTO rpa.schema_migrations')]
+        self.assertEqual(len(inserted), len(migrations.MIGRATIONS))
+
+    def test_only_pending_migrations_are_applied(self):
+        connection = FakeConnection(fetchone_results=[(1, 'r', False), (1,), ('r',)])
+        migrations.ensure_schema(connection, 'rpa', partitioned=False, today=TODAY)
+        self.assertTrue([s for s in connection.statements if 'ADD COLUMN IF NOT EXISTS duration_ms' in s])
+        self.assertFalse([s for s in connection.statements if s.startswith('CREATE TABLE IF NOT EXISTS rpa.logs')])
+
+
+    def test_legacy_heap_table_gets_the_indexes(self):
+        # COALESCE(MAX(version)), kind da tabela (heap antiga), kind para as partições
+        connection = FreshConnection(fetchone_results=[(0,), ('r',), ('r',)])
+        with self.assertLogs(level='WARNING'):
+            migrations.ensure_schema(connection, 'rpa', today=TODAY)
+        sql = "\n".join(connection.statements)
+        for name, _, _ in log_schema.LOG_TABLE_INDEXES:
+            self.assertIn(f"CREATE INDEX IF NOT EXISTS {name} ON rpa.logs", sql)
+        self.assertLess(sql.index("ADD COLUMN IF NOT EXISTS duration_ms"), sql.index("logs_span_duration_idx"))
+        self.assertNotIn("CREATE TABLE IF NOT EXISTS rpa.logs ", sql)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,159 @@
+# Tests for outbox module
+
+import datetime
+import decimal
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import psycopg2
+
+from src.infra.db.outbox import LocalOutbox
+from src.utils.log_record import LogRecord
+from tests.test_db_manager import make_manager
+
+
+def make_record(message):
+    return LogRecord('task', 'step', 'bot.py', 1.0, 2.0, datetime.date(2024, 3, 10), '10:00:00',
+                     message, 'system', 'info')
+
+
+def make_outbox(test):
+    tmp = tempfile.TemporaryDirectory()
+    test.addCleanup(tmp.cleanup)
+    outbox = LocalOutbox(os.path.join(tmp.name, 'temp', 'outbox.sqlite3'), batch_size=2)
+    test.addCleanup(outbox.close)
+    return outbox
+
+
+class FakeExecuteValues:
+    """execute_values que simula outbox_applied: só devolve os entry_id ainda não vistos"""
+
+    def __init__(self, applied=()):
+        self.applied = set(applied)
+        self.inserted_logs = []
+
+    def __call__(self, cursor, sql, rows, page_size=100, fetch=False):
+        if 'outbox_applied' in sql:
+            new = [row for row in rows if row[0] not in self.applied]
+            self.applied.update(row[0] for row in new)
+            return new
+        self.inserted_logs.extend(rows)
+
+
+class TestLocalOutbox(unittest.TestCase):
+    def test_file_is_created_lazily_and_survives_reopen(self):
+        outbox = make_outbox(self)
+        self.assertEqual(outbox.pending(), 0)
+        self.assertFalse(os.path.exists(outbox.path))
+        self.assertTrue(outbox.add_log(make_record("sem banco")))
+        self.assertTrue(outbox.add_write("UPDATE rpa.items SET status = %s WHERE id = %s", ['ok', 1]))
+        outbox.close()
+        reopened = LocalOutbox(outbox.path)
+        self.addCleanup(reopened.close)
+        self.assertEqual(reopened.stats(), {'pending': 2, 'failed': 0})
+
+    def test_replay_applies_in_batches_and_empties_the_file(self):
+        outbox = make_outbox(self)
+        outbox.add_logs([make_record(f"log {i}") for i in range(3)])
+        outbox.add_write("UPDATE rpa.items SET status = %s WHERE id = %s", ['ok', 1])
+        manager = make_manager(self, [])
+        fake = FakeExecuteValues()
+        with mock.patch('src.infra.db.outbox.execute_values', fake):
+            totals = outbox.replay(manager, 'rpa')
+        self.assertEqual(totals, {'applied': 4, 'duplicates': 0, 'failed': 0})
+        self.assertEqual([record.log_message for record in fake.inserted_logs], ['log 0', 'log 1', 'log 2'])
+        self.assertIn("UPDATE rpa.items SET status = %s WHERE id = %s", manager.fake_connection.executed)
+        self.assertEqual(manager.fake_connection.commits, 2)  # Um commit por lote de 2
+        self.assertEqual(outbox.pending(), 0)
+
+    def test_entries_already_applied_are_not_duplicated(self):
+        outbox = make_outbox(self)
+        outbox.add_logs([make_record("a"), make_record("b")])
+        entry_ids = [row[1] for row in outbox._next_batch(10, 0)]
+        fake = FakeExecuteValues(applied=entry_ids[:1])  # Primeiro lote já confirmado antes de uma queda
+        with mock.patch('src.infra.db.outbox.execute_values', fake):
+            totals = outbox.replay(make_manager(self, []), 'rpa')
+        self.assertEqual(totals, {'applied': 1, 'duplicates': 1, 'failed': 0})
+        self.assertEqual([record.log_message for record in fake.inserted_logs], ['b'])
+        self.assertEqual(outbox.pending(), 0)
+
+    def test_replayed_params_keep_their_types(self):
+        outbox = make_outbox(self)
+        since = datetime.datetime(2024, 3, 10, 8, 30, tzinfo=datetime.timezone.utc)
+        params = [(1, 2, 3), since, b'\x00\xff', decimal.Decimal('10.50'), {'nome': ('a', 'b')}]
+        query = "UPDATE rpa.items SET raw = %s WHERE id IN %s AND updated_at < %s"
+        self.assertTrue(outbox.add_write(query, params))
+        self.assertFalse(outbox.add_write(query, [object()]))  # Tipo sem representação: rejeitado
+
+        manager = make_manager(self, [])
+        executed = []
+        original_cursor = manager.fake_connection.cursor
+
+        def cursor(name=None):
+            cur = original_cursor(name)
+            execute = cur.execute
+
+            def recording_execute(sql, params=None):
+                executed.append((sql, params))
+                execute(sql, params)
+            cur.execute = recording_execute
+            return cur
+
+        manager.fake_connection.cursor = cursor
+        with mock.patch('src.infra.db.outbox.execute_values', FakeExecuteValues()):
+            totals = outbox.replay(manager, 'rpa')
+        self.assertEqual(totals, {'applied': 1, 'duplicates': 0, 'failed': 0})
+        replayed = next(params for sql, params in executed if sql == query)
+        self.assertEqual(replayed, params)
+        self.assertEqual([type(value) for value in replayed], [type(value) for value in params])
+        self.assertIsInstance(replayed[4]['nome'], tuple)
+
+    def test_failed_write_is_kept_with_error(self):
+        outbox = make_outbox(self)
+        outbox.add_write("INSERT INTO rpa.items VALUES (%s)", [1])
+        manager = make_manager(self, [])
+        original_cursor = manager.fake_connection.cursor
+
+        def cursor(name=None):
+            cur = original_cursor(name)
+            execute = cur.execute
+
+            def failing_execute(sql, params=None):
+                execute(sql, params)
+                if sql.startswith("INSERT INTO rpa.items"):
+                    raise psycopg2.IntegrityError("duplicate key")
+            cur.execute = failing_execute
+            return cur
+
+        manager.fake_connection.cursor = cursor
+        with mock.patch('src.infra.db.outbox.execute_values', FakeExecuteValues()):
+            totals = outbox.replay(manager, 'rpa')
+        self.assertEqual(totals, {'applied': 0, 'duplicates': 0, 'failed': 1})
+        self.assertEqual(outbox.stats(), {'pending': 0, 'failed': 1})
+        self.assertIn("ROLLBACK TO SAVEPOINT sp_1", manager.fake_connection.executed)
+
+
+class TestOutboxIntegration(unittest.TestCase):
+    def test_logger_without_database_writes_to_outbox(self):
+        from tests.test_logger import make_logger
+        outbox = make_outbox(self)
+        logger = make_logger(self)
+        logger.enable_outbox(outbox)
+        logger.log_info("step", "registro offline")
+        self.assertEqual(outbox.pending(), 1)
+
+    def test_execute_query_defers_marked_writes_while_database_is_down(self):
+        manager = make_manager(self, [])
+        manager.outbox = make_outbox(self)
+        manager._breaker.trip()
+        self.assertEqual(manager.execute_query("UPDATE rpa.items SET status = 'ok'", commit=True, outbox=True),
+                         (True, None))
+        success, _ = manager.execute_query("UPDATE rpa.items SET status = 'ok'", commit=True)
+        self.assertFalse(success)
+        self.assertEqual(manager.outbox.pending(), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
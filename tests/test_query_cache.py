@@ -0,0 +1,60 @@
+# Tests for query_cache module
+
+import time
+import unittest
+
+from src.infra.db.query_cache import QueryCache, extract_tables, normalize_sql
+
+
+class TestExtractTables(unittest.TestCase):
+    def test_reads_and_writes(self):
+        self.assertEqual(extract_tables('SELECT * FROM rpa.a x, "B" y JOIN c ON x.id = c.id'), {'a', 'b', 'c'})
+        self.assertEqual(extract_tables("UPDATE rpa.status_codes SET label = %s"), {'status_codes'})
+        self.assertEqual(extract_tables("INSERT INTO accounts (id) VALUES (%s)"), {'accounts'})
+        self.assertEqual(extract_tables("DELETE FROM accounts WHERE id = %s"), {'accounts'})
+
+
+class TestQueryCache(unittest.TestCase):
+    def test_key_normalizes_whitespace_and_params(self):
+        self.assertEqual(QueryCache.make_key("SELECT *\n  FROM t WHERE id = %s;", [1]),
+                         QueryCache.make_key("SELECT * FROM t WHERE id = %s", (1,)))
+
+    def test_key_keeps_whitespace_inside_literals(self):
+        self.assertNotEqual(QueryCache.make_key("SELECT * FROM t WHERE name = 'a  b'"),
+                            QueryCache.make_key("SELECT * FROM t WHERE name = 'a b'"))
+        self.assertNotEqual(QueryCache.make_key("SELECT $$x\ty$$, E'it''s  \\' FROM t"),
+                            QueryCache.make_key("SELECT $$x y$$, E'it''s \\' FROM t"))
+        self.assertEqual(normalize_sql("SELECT  'a  b',\n  \"Col  X\"  FROM t ;"),
+                         "SELECT 'a  b', \"Col  X\" FROM t")
+
+    def test_ttl_lru_and_stats(self):
+        cache = QueryCache(max_entries=2, default_ttl=60)
+        for name in ('a', 'b'):
+            cache.set(QueryCache.make_key(f"SELECT * FROM {name}"), name)
+        cache.get(QueryCache.make_key("SELECT * FROM a"))  # 'a' passa a ser o mais recente
+        cache.set(QueryCache.make_key("SELECT * FROM c"), 'c')
+        self.assertEqual(cache.get(QueryCache.make_key("SELECT * FROM b")), (False, None))
+
+        key = QueryCache.make_key("SELECT * FROM d")
+        cache.set(key, 'd', ttl=0.01)
+        time.sleep(0.02)
+        self.assertEqual(cache.get(key), (False, None))
+
+        stats = cache.stats()
+        self.assertEqual((stats['hits'], stats['misses'], stats['evictions'], stats['expired']), (1, 2, 2, 1))
+
+    def test_invalidate_by_table(self):
+        cache = QueryCache()
+        join_key = QueryCache.make_key("SELECT * FROM rpa.customers c JOIN rpa.accounts a ON a.id = c.account_id")
+        other_key = QueryCache.make_key("SELECT * FROM rpa.status_codes")
+        cache.set(join_key, [1])
+        cache.set(other_key, [2])
+        self.assertEqual(cache.invalidate('rpa.accounts'), 1)
+        self.assertEqual(cache.get(join_key), (False, None))
+        self.assertEqual(cache.get(other_key), (True, [2]))
+        self.assertEqual(cache.invalidate_query("UPDATE status_codes SET x = 1"), 1)
+        self.assertEqual(cache.stats()['size'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
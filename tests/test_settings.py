@@ -0,0 +1,40 @@
+# Tests for settings module
+
+import os
+import subprocess
+import sys
+import unittest
+
+from src.config.settings import Settings, get_settings
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class TestGetSettings(unittest.TestCase):
+    def test_single_read_only_instance(self):
+        from src.config import settings as package_settings
+        settings = get_settings()
+        self.assertIs(get_settings(), settings)
+        self.assertIs(package_settings, settings)
+        with self.assertRaises(TypeError):
+            settings.DB_CONFIG['enabled'] = True
+        with self.assertRaises(AttributeError):
+            settings.BOT_NAME = 'outro'
+
+    def test_settings_copy_is_mutable(self):
+        settings = Settings()
+        settings.DB_POOL_CONFIG['max_size'] = 1
+        self.assertEqual(settings.DB_POOL_CONFIG['max_size'], 1)
+        self.assertNotEqual(get_settings().DB_POOL_CONFIG['max_size'], 1)
+
+
+class TestLazyImports(unittest.TestCase):
+    def test_importing_package_and_logger_skips_heavy_dependencies(self):
+        code = ("import sys, src, src.config, src.utils.logger; "
+                "print(sorted(m for m in ('psycopg2', 'psutil', 'pandas', 'asyncio', 'dotenv') if m in sys.modules))")
+        result = subprocess.run([sys.executable, '-c', code], cwd=ROOT, capture_output=True, text=True, check=True)
+        self.assertEqual(result.stdout.strip().splitlines()[-1], '[]')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,31 @@
+# Tests for startup_timer module
+
+import threading
+import unittest
+from unittest import mock
+
+from src.utils.startup_timer import StartupTimer
+
+
+class TestStartupTimer(unittest.TestCase):
+    def test_phases_from_several_threads(self):
+        timer = StartupTimer()
+        with timer.phase("logger"):
+            pass
+        thread = threading.Thread(target=lambda: timer.record("db_connect", timer.started, timer.started + 0.25))
+        thread.start()
+        thread.join()
+        self.assertEqual([name for name, _, _ in timer.phases()], ["logger", "db_connect"])
+        self.assertEqual(timer.phases("db_"), [("db_connect", 0.0, 250.0)])
+
+    def test_format_filters_by_prefix(self):
+        timer = StartupTimer()
+        timer.record("logger", timer.started, timer.started + 0.012)
+        timer.record("db_check", timer.started, timer.started + 0.003)
+        with mock.patch.object(timer, 'elapsed_ms', return_value=20.0):
+            self.assertEqual(timer.format(exclude="db_"), "logger 12.0 ms | total 20.0 ms")
+            self.assertEqual(timer.format("db_"), "db_check 3.0 ms | total 20.0 ms")
+
+
+if __name__ == '__main__':
+    unittest.main()
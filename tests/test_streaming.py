@@ -0,0 +1,136 @@
+# Tests for streaming module
+
+import threading
+import time
+import unittest
+
+from src.modules.streaming import StreamingPipeline, chunked
+from src.modules.workflow import Workflow, WorkflowError
+
+
+class TestChunked(unittest.TestCase):
+    def test_groups_items(self):
+        self.assertEqual(list(chunked(range(5), 2)), [[0, 1], [2, 3], [4]])
+        self.assertEqual(list(chunked([], 3)), [])
+
+
+class TestStreamingPipeline(unittest.TestCase):
+    def run_pipeline(self, queue_size):
+        loaded = []
+        pipeline = StreamingPipeline(chunked(range(10), 3), queue_size=queue_size)
+        pipeline.add_stage('transform', lambda chunk: [value * 2 for value in chunk if value not in (4, 9)] or None)
+        pipeline.add_stage('load', loaded.extend)
+        stats = pipeline.run()
+        return loaded, stats
+
+    def test_inline_and_threaded_modes_process_every_chunk(self):
+        for queue_size in (0, 2):
+            loaded, stats = self.run_pipeline(queue_size)
+            self.assertEqual(loaded, [0, 2, 4, 6, 10, 12, 14, 16])
+            # O último bloco ([9]) fica vazio na transformação e é descartado
+            self.assertEqual([stats[name]['chunks'] for name in ('extract', 'transform', 'load')], [4, 4, 3])
+            self.assertEqual(stats['extract']['items'], 10)
+            self.assertEqual(stats['load']['items'], 8)
+
+    def test_backpressure_limits_chunks_in_flight(self):
+        produced = []
+        consumed = []
+        max_in_flight = []
+
+        def source():
+            for index in range(20):
+                produced.append(index)
+                max_in_flight.append(len(produced) - len(consumed))
+                yield [index]
+
+        def slow_load(chunk):
+            time.sleep(0.002)
+            consumed.append(chunk)
+
+        pipeline = StreamingPipeline(source(), queue_size=2)
+        pipeline.add_stage('transform', lambda chunk: chunk)
+        pipeline.add_stage('load', slow_load)
+        pipeline.run()
+        self.assertEqual(len(consumed), 20)
+        # 2 filas de 2 blocos + 1 bloco em cada etapa + o que a fonte acabou de gerar
+        self.assertLessEqual(max(max_in_flight), 2 * 2 + 2 + 1)
+        self.assertEqual(pipeline.bottleneck(), 'load')
+        self.assertGreater(pipeline.stats()['extract']['wait_output_ms'], 0)
+        self.assertIn('gargalo: load', pipeline.format_stats())
+
+    def test_stage_with_several_workers(self):
+        threads = set()
+        lock = threading.Lock()
+
+        def transform(chunk):
+            with lock:
+                threads.add(threading.current_thread().name)
+            time.sleep(0.005)
+            return chunk
+
+        loaded = []
+        pipeline = StreamingPipeline(chunked(range(40), 2), queue_size=4)
+        pipeline.add_stage('transform', transform, workers=3)
+        pipeline.add_stage('load', loaded.extend)
+        pipeline.run()
+        self.assertEqual(sorted(loaded), list(range(40)))
+        self.assertGreater(len(threads), 1)
+
+    def test_failure_stops_pipeline_and_closes_source(self):
+        closed = []
+
+        def source():
+            try:
+                for index in range(1000):
+                    yield [index]
+            finally:
+                closed.append(True)
+
+        def load(chunk):
+            if chunk == [3]:
+                raise RuntimeError("destino fora do ar")
+
+        for queue_size in (0, 2):
+            closed.clear()
+            pipeline = StreamingPipeline(source(), queue_size=queue_size)
+            pipeline.add_stage('load', load)
+            with self.assertRaises(WorkflowError) as raised:
+                pipeline.run()
+            self.assertEqual(raised.exception.step, 'load')
+            self.assertEqual(closed, [True])
+            self.assertLess(pipeline.stats()['extract']['chunks'], 1000)
+
+    def test_source_failure(self):
+        def source():
+            yield [1]
+            raise ValueError("arquivo truncado")
+
+        pipeline = StreamingPipeline(source(), queue_size=1)
+        pipeline.add_stage('load', lambda chunk: None)
+        with self.assertRaises(WorkflowError) as raised:
+            pipeline.run()
+        self.assertEqual(raised.exception.step, 'extract')
+
+
+class TestWorkflowStreaming(unittest.TestCase):
+    def test_execute_streaming_uses_template_chunk_steps(self):
+        loaded = []
+
+        class Pipeline(Workflow):
+            def extract_chunks(self):
+                return chunked(range(6), 2)
+
+            def transform_chunk(self, chunk):
+                return [value + 1 for value in chunk]
+
+            def load_chunk(self, chunk):
+                loaded.extend(chunk)
+
+        result = Pipeline().execute_streaming(queue_size=1)
+        self.assertEqual(result['status'], 'completed')
+        self.assertEqual(loaded, [1, 2, 3, 4, 5, 6])
+        self.assertEqual(list(result['stages']), ['data_extraction', 'data_transformation', 'data_loading'])
+
+
+if __name__ == '__main__':
+    unittest.main()
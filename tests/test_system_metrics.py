@@ -0,0 +1,24 @@
+# Tests for system_metrics module
+
+import unittest
+
+from src.utils.system_metrics import EMPTY_SNAPSHOT, SystemMetricsSampler
+
+
+class TestSystemMetricsSampler(unittest.TestCase):
+    def test_disabled_sampler_has_no_thread(self):
+        sampler = SystemMetricsSampler(enabled=False)
+        self.assertIsNone(sampler._thread)
+        self.assertEqual(sampler.snapshot, EMPTY_SNAPSHOT)
+
+    def test_enabled_sampler_records_process_metrics(self):
+        sampler = SystemMetricsSampler(interval=60)
+        self.addCleanup(sampler.stop)
+        snapshot = sampler.snapshot
+        self.assertGreater(snapshot.process_rss, 0)
+        self.assertGreater(snapshot.memory_usage, 0)
+        self.assertGreater(snapshot.sampled_at, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,15 +1,241 @@
 # Tests for workflow module
 
+import tempfile
+import threading
 import unittest
-from src.modules.workflow import Workflow
+from unittest import mock
+
+from src.modules.workflow import Workflow, WorkflowError, step
+
+
+def answer():
+    return 21
+
+
+def double(value):
+    return value * 2
+
+
+class ProcessPipeline(Workflow):
+    """Etapas declaradas como métodos: vão para o processo filho junto com o workflow"""
+
+    @step('numbers')
+    def numbers(self):
+        return [1, 2, 3]
+
+    @step('total', depends_on=['numbers'])
+    def total(self, numbers):
+        return sum(numbers) + (self.logger is None)  # No processo filho o logger não é enviado
+
 
 class TestWorkflow(unittest.TestCase):
     def setUp(self):
         self.workflow = Workflow()
-        
+
     def test_workflow_execution(self):
         result = self.workflow.execute_workflow()
         self.assertEqual(result['status'], 'completed')
 
+    def test_default_steps_run_once_in_order(self):
+        calls = []
+
+        class CountingWorkflow(Workflow):
+            def step1_data_extraction(self):
+                calls.append('extract')
+                return [1, 2]
+
+            def step2_data_transformation(self, extracted=None):
+                calls.append('transform')
+                return [value * 10 for value in extracted]
+
+            def step3_data_loading(self, transformed=None):
+                calls.append('load')
+                return len(transformed)
+
+        result = CountingWorkflow(max_workers=4).execute_workflow()
+        self.assertEqual(calls, ['extract', 'transform', 'load'])
+        self.assertEqual(result['results']['data_loading'], 2)
+        self.assertEqual(set(result['durations_ms']), {'data_extraction', 'data_transformation', 'data_loading'})
+
+
+class TestWorkflowGraph(unittest.TestCase):
+    def make_workflow(self, **kwargs):
+        workflow = Workflow(**kwargs)
+        for name in list(workflow.steps):
+            workflow.remove_step(name)
+        return workflow
+
+    def test_independent_steps_run_concurrently(self):
+        barrier = threading.Barrier(2, timeout=5)
+
+        def extract(source):
+            def run():
+                barrier.wait()  # Só passa se as duas extrações estiverem rodando juntas
+                return source
+            return run
+
+        workflow = self.make_workflow(max_workers=2)
+        workflow.add_step('extract_a', extract('a'))
+        workflow.add_step('extract_b', extract('b'))
+        workflow.add_step('merge', lambda a, b: a + b, depends_on=['extract_a', 'extract_b'])
+        self.assertEqual(workflow.run()['merge'], 'ab')
+
+    def test_declared_steps_receive_dependency_outputs(self):
+        class Pipeline(Workflow):
+            @step('numbers')
+            def numbers(self):
+                return [1, 2, 3]
+
+            @step('total', depends_on=['numbers'])
+            def total(self, numbers):
+                return sum(numbers)
+
+        workflow = Pipeline(max_workers=1)
+        self.assertEqual(workflow.topological_order(),
+                         ['data_extraction', 'numbers', 'data_transformation', 'total', 'data_loading'])
+        self.assertEqual(workflow.run()['total'], 6)
+
+    def test_cycle_and_unknown_dependency_are_rejected(self):
+        workflow = self.make_workflow()
+        workflow.add_step('a', lambda b: b, depends_on='b')
+        workflow.add_step('b', lambda a: a, depends_on='a')
+        with self.assertRaisesRegex(ValueError, 'Ciclo'):
+            workflow.run()
+        workflow.add_step('b', lambda missing: missing, depends_on='missing')
+        with self.assertRaisesRegex(ValueError, 'missing'):
+            workflow.run()
+
+    def test_failure_stops_dependent_steps(self):
+        executed = []
+
+        def fail():
+            raise RuntimeError("origem indisponível")
+
+        for workers in (1, 3):
+            executed.clear()
+            workflow = self.make_workflow(max_workers=workers)
+            workflow.add_step('extract', fail)
+            workflow.add_step('load', lambda data: executed.append('load'), depends_on='extract')
+            with self.assertRaises(WorkflowError) as raised:
+                workflow.execute_workflow()
+            self.assertEqual(raised.exception.step, 'extract')
+            self.assertIsInstance(raised.exception.__cause__, RuntimeError)
+            self.assertEqual(workflow.status, 'failed')
+            self.assertEqual(executed, [])
+
+    def test_process_executor(self):
+        workflow = self.make_workflow(max_workers=2, executor='process')
+        workflow.add_step('value', answer)
+        workflow.add_step('doubled', double, depends_on='value')
+        self.assertEqual(workflow.run(), {'value': 21, 'doubled': 42})
+
+    def test_process_executor_with_logger(self):
+        from tests.test_logger import make_logger
+        logger = make_logger(self)
+        logger.set_levels(console='CRITICAL')
+        workflow = ProcessPipeline(max_workers=2, executor='process', logger=logger)
+        results = workflow.run()
+        self.assertEqual((results['numbers'], results['total']), ([1, 2, 3], 7))
+        self.assertIs(workflow.logger, logger)
+        self.assertIn('total', workflow.durations)
+
+    def test_process_executor_rejects_unpicklable_step_before_running(self):
+        executed = []
+        workflow = self.make_workflow(executor='process')
+        workflow.add_step('value', answer)
+        workflow.add_step('local', lambda value: executed.append(value), depends_on='value')
+        with self.assertRaisesRegex(ValueError, "'local'.*executor='process'"):
+            workflow.run()
+        self.assertEqual(workflow.durations, {})
+
+    def test_invalid_executor(self):
+        with self.assertRaises(ValueError):
+            Workflow(executor='fiber')
+
+    def test_steps_run_inside_logger_spans(self):
+        logger = mock.MagicMock()
+        workflow = Workflow(max_workers=2, logger=logger)
+        workflow.run()
+        self.assertEqual([call.args[0] for call in logger.span.call_args_list],
+                         ['data_extraction', 'data_transformation', 'data_loading'])
+
+
+class TestWorkflowCheckpoints(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.directory = tmp.name
+        self.calls = []
+        self.fail_on = None
+
+    def make_workflow(self, run_id='run-1', **kwargs):
+        calls = self.calls
+        test = self
+
+        class Pipeline(Workflow):
+            def step1_data_extraction(self):
+                calls.append('extract')
+                return list(range(5))
+
+            def step2_data_transformation(self, extracted=None):
+                calls.append('transform')
+                return [value * 2 for value in extracted]
+
+            def step3_data_loading(self, transformed=None):
+                calls.append('load')
+                if test.fail_on == 'load':
+                    raise RuntimeError("destino fora do ar")
+                return sum(transformed)
+
+        return Pipeline(max_workers=1, run_id=run_id, checkpoint_dir=self.directory, **kwargs)
+
+    def test_restart_skips_completed_steps_and_reloads_outputs(self):
+        self.fail_on = 'load'
+        with self.assertRaises(WorkflowError):
+            self.make_workflow().execute_workflow()
+        self.assertEqual(self.make_workflow().checkpoints.status, 'failed')
+
+        self.fail_on = None
+        self.calls.clear()
+        result = self.make_workflow().execute_workflow()
+        self.assertEqual(self.calls, ['load'])
+        self.assertEqual(result['restored'], ['data_extraction', 'data_transformation'])
+        self.assertEqual(result['results']['data_loading'], 20)
+        self.assertEqual(self.make_workflow().checkpoints.status, 'completed')
+
+    def test_other_run_id_starts_from_scratch(self):
+        self.make_workflow().execute_workflow()
+        self.calls.clear()
+        self.make_workflow(run_id='run-2').execute_workflow()
+        self.assertEqual(self.calls, ['extract', 'transform', 'load'])
+
+    def test_invalidate_reruns_step_and_dependents(self):
+        self.make_workflow().execute_workflow()
+        workflow = self.make_workflow()
+        self.assertEqual(workflow.invalidate('data_transformation'), ['data_transformation', 'data_loading'])
+        self.calls.clear()
+        workflow.execute_workflow()
+        self.assertEqual(self.calls, ['transform', 'load'])
+
+        self.calls.clear()
+        self.make_workflow().invalidate('data_transformation', dependents=False)
+        self.make_workflow().execute_workflow()
+        self.assertEqual(self.calls, ['transform', 'load'])  # Dependente de etapa reexecutada também roda
+
+    def test_changed_dependencies_invalidate_checkpoint(self):
+        self.make_workflow().execute_workflow()
+        workflow = self.make_workflow()
+        workflow.add_step('data_loading', lambda extracted: len(extracted), depends_on='data_extraction')
+        self.calls.clear()
+        self.assertEqual(workflow.run()['data_loading'], 5)
+        self.assertEqual(workflow.restored, ['data_extraction', 'data_transformation'])
+
+    def test_invalid_run_id_and_disabled_checkpoints(self):
+        with self.assertRaises(ValueError):
+            self.make_workflow(run_id='../fora')
+        with self.assertRaises(ValueError):
+            Workflow().invalidate('data_loading')
+
+
 if __name__ == '__main__':
     unittest.main()